@@ -58,14 +58,49 @@ st.markdown("""
 
 @st.cache_resource
 def load_recommendation_system():
-    """Load the recommendation system with caching"""
+    """Start building the recommendation system in the background, once per server"""
     try:
-        recommender = MovieRecommendationSystem()
+        recommender = MovieRecommendationSystem(background=True)
         return recommender
     except Exception as e:
         st.error(f"Error loading recommendation system: {e}")
         return None
 
+# Human-readable names of the model components
+COMPONENT_LABELS = {
+    'catalogue': 'Catalogue & search',
+    'popularity': 'Popularity',
+    'content': 'Content-based model',
+    'collaborative': 'Collaborative model'
+}
+
+def require_components(recommender, *components):
+    """
+    Check that model components are built, telling the user when they are not
+    
+    Waits briefly so that fast components (catalogue, popularity) are usually
+    ready by the first render.
+    
+    Returns:
+        bool: True if every component is ready
+    """
+    missing = []
+    for component in components:
+        if not recommender.wait_until_ready(component, timeout=2):
+            missing.append(COMPONENT_LABELS[component])
+    if missing:
+        st.info(f"⏳ Still being built: {', '.join(missing)}. Refresh in a moment.")
+    return not missing
+
+def show_model_status(recommender):
+    """Show per-component readiness in the sidebar until everything is built"""
+    status = recommender.readiness()
+    if status['ready']:
+        return
+    st.sidebar.markdown("### ⏳ Model Status")
+    for component, label in COMPONENT_LABELS.items():
+        st.sidebar.markdown(f"{'✅' if status[component] else '⏳'} {label}")
+
 def main():
     # Header
     st.markdown('<h1 class="main-header">🎬 Movie Recommendation System</h1>', unsafe_allow_html=True)
@@ -75,6 +110,9 @@ def main():
     if recommender is None:
         st.error("Failed to load recommendation system. Please check your data files.")
         return
+    if recommender.init_error is not None:
+        st.error(f"Failed to load recommendation system: {recommender.init_error}")
+        return
     
     # Sidebar
     st.sidebar.title("🎯 Navigation")
@@ -82,6 +120,7 @@ def main():
         "Choose a page:",
         ["🏠 Home", "🔍 Search Movies", "⭐ Get Recommendations", "📊 Analytics", "📈 Popular Movies"]
     )
+    show_model_status(recommender)
     
     if page == "🏠 Home":
         show_home_page(recommender)
@@ -138,7 +177,9 @@ def show_home_page(recommender):
     
     # Recent popular movies
     st.markdown("## 🔥 Recently Popular Movies")
-    popular_movies = recommender.get_popular_movies(6)
+    popular_movies = []
+    if require_components(recommender, 'popularity'):
+        popular_movies = recommender.get_popular_movies(6)
     
     cols = st.columns(3)
     for i, movie in enumerate(popular_movies):
@@ -172,6 +213,8 @@ def show_home_page(recommender):
 def show_search_page(recommender):
     """Display the search page"""
     st.markdown("## 🔍 Search Movies")
+    if not require_components(recommender, 'catalogue'):
+        return
     
     # Search input
     search_query = st.text_input("Enter movie title or genre:", placeholder="e.g., Action, Comedy, The Matrix")
@@ -188,7 +231,8 @@ def show_search_page(recommender):
                     st.markdown(f"**Genres:** {movie['genres']}")
                     st.markdown(f"**Movie ID:** {movie['movieId']}")
                     
-                    if st.button(f"Get Similar Movies", key=f"similar_{movie['movieId']}"):
+                    if (st.button(f"Get Similar Movies", key=f"similar_{movie['movieId']}")
+                            and require_components(recommender, 'content')):
                         similar_movies = recommender.content_based_recommendations(movie['movieId'], 5)
                         st.markdown("#### Similar Movies:")
                         for similar in similar_movies:
@@ -200,24 +244,32 @@ def show_search_page(recommender):
     st.markdown("---")
     st.markdown("### 🏷️ Browse by Genre")
     
-    # Get all unique genres
-    movies_df = recommender.movies_df
-    all_genres = set()
-    for genres in movies_df['genres']:
-        all_genres.update(genres.split('|'))
+    # Genres are parsed once into the catalogue's genre vocabulary
+    catalogue = recommender.catalogue
+    selected_genre = st.selectbox("Select a genre:", catalogue.genre_vocabulary)
     
-    selected_genre = st.selectbox("Select a genre:", sorted(all_genres))
+    # Movies without a year are only left out once the range is narrowed
+    years = catalogue.years[~pd.isna(catalogue.years)]
+    year_min = year_max = None
+    if len(years) and years.min() < years.max():
+        full_range = (int(years.min()), int(years.max()))
+        year_range = st.slider("Release years:", full_range[0], full_range[1], full_range)
+        if tuple(year_range) != full_range:
+            year_min, year_max = year_range
     
     if selected_genre:
-        genre_movies = movies_df[movies_df['genres'].str.contains(selected_genre, na=False)]
+        genre_movies = recommender.filter_movies(any_genres=[selected_genre], year_min=year_min,
+                                                 year_max=year_max, n_results=10)
         st.markdown(f"### Movies in {selected_genre}:")
         
-        for _, movie in genre_movies.head(10).iterrows():
+        for movie in genre_movies:
             st.markdown(f"- **{movie['title']}** ({movie['year']})")
 
 def show_recommendations_page(recommender):
     """Display the recommendations page"""
     st.markdown("## ⭐ Get Movie Recommendations")
+    if not require_components(recommender, 'catalogue'):
+        return
     
     # Tabs for different recommendation types
     tab1, tab2, tab3, tab4 = st.tabs(["🎯 Content-Based", "👥 Collaborative", "🧬 Hybrid", "📊 Compare All"])
@@ -233,7 +285,7 @@ def show_recommendations_page(recommender):
         
         selected_movie = st.selectbox("Choose a movie:", list(movie_options.keys()))
         
-        if st.button("Get Similar Movies", key="content_based"):
+        if st.button("Get Similar Movies", key="content_based") and require_components(recommender, 'content'):
             movie_id = movie_options[selected_movie]
             with st.spinner("Finding similar movies..."):
                 recommendations = recommender.content_based_recommendations(movie_id, 10)
@@ -255,7 +307,7 @@ def show_recommendations_page(recommender):
         
         user_id = st.number_input("Enter User ID (1-20):", min_value=1, max_value=20, value=1)
         
-        if st.button("Get Recommendations", key="collaborative"):
+        if st.button("Get Recommendations", key="collaborative") and require_components(recommender, 'collaborative'):
             with st.spinner("Finding recommendations..."):
                 recommendations = recommender.collaborative_filtering_recommendations(user_id, 10)
             
@@ -285,7 +337,8 @@ def show_recommendations_page(recommender):
             selected_movie_hybrid = st.selectbox("Choose a movie (optional):", 
                                                ["None"] + list(movie_options.keys()), key="hybrid_movie")
         
-        if st.button("Get Hybrid Recommendations", key="hybrid"):
+        if (st.button("Get Hybrid Recommendations", key="hybrid")
+                and require_components(recommender, 'content', 'collaborative')):
             with st.spinner("Generating hybrid recommendations..."):
                 movie_id = None
                 if selected_movie_hybrid != "None":
@@ -315,7 +368,8 @@ def show_recommendations_page(recommender):
         user_id_compare = st.number_input("Enter User ID (1-20):", min_value=1, max_value=20, value=1, key="compare_user")
         movie_id_compare = st.selectbox("Choose a movie:", list(movie_options.keys()), key="compare_movie")
         
-        if st.button("Compare All Algorithms", key="compare"):
+        if (st.button("Compare All Algorithms", key="compare")
+                and require_components(recommender, 'content', 'collaborative')):
             movie_id = movie_options[movie_id_compare]
             
             with st.spinner("Generating recommendations..."):
@@ -343,6 +397,8 @@ def show_recommendations_page(recommender):
 def show_analytics_page(recommender):
     """Display analytics and insights"""
     st.markdown("## 📊 Analytics & Insights")
+    if not require_components(recommender, 'popularity'):
+        return
     
     # Load data
     movies_df = recommender.movies_df
@@ -362,11 +418,7 @@ def show_analytics_page(recommender):
     
     # Genre distribution
     st.markdown("### 🏷️ Genre Distribution")
-    all_genres = []
-    for genres in movies_df['genres']:
-        all_genres.extend(genres.split('|'))
-    
-    genre_counts = pd.Series(all_genres).value_counts().head(10)
+    genre_counts = pd.Series(recommender.get_genre_counts()).head(10)
     
     fig = px.bar(
         x=genre_counts.values,
@@ -420,6 +472,8 @@ def show_analytics_page(recommender):
 def show_popular_movies_page(recommender):
     """Display popular movies with detailed information"""
     st.markdown("## 📈 Popular Movies")
+    if not require_components(recommender, 'popularity'):
+        return
     
     # Number of movies to show
     n_movies = st.slider("Number of movies to display:", min_value=5, max_value=50, value=20)
@@ -0,0 +1,182 @@
+import numpy as np
+from scipy.sparse import issparse
+
+from ranking import top_k
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index for inner-product search
+
+    Vectors are clustered with k-means into n_lists cells and stored grouped
+    by cell. A query is scored against the cell centroids first and only the
+    vectors of the n_probe best cells are scored exactly, so a search touches
+    roughly n_probe / n_lists of the catalogue. n_probe is the recall/latency
+    knob: n_probe == n_lists is an exact search. Small collections are always
+    searched by brute force, where the cell lookup would only add overhead.
+    """
+
+    def __init__(self, n_lists=None, n_probe=8, n_iter=20, brute_force_below=2048,
+                 random_state=42):
+        """
+        Initialize the index
+
+        Args:
+            n_lists (int): Number of k-means cells (default: about sqrt(N))
+            n_probe (int): Number of cells scored per query
+            n_iter (int): k-means iterations
+            brute_force_below (int): Collections smaller than this are searched exactly
+            random_state (int): Seed for the k-means initialisation
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.brute_force_below = brute_force_below
+        self.random_state = random_state
+
+    def fit(self, vectors):
+        """
+        Cluster the vectors and build the inverted lists
+
+        Args:
+            vectors (array-like): One row per item (dense or sparse)
+
+        Returns:
+            IVFIndex: The fitted index
+        """
+        if issparse(vectors):
+            vectors = vectors.toarray()
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        n_items = self.vectors.shape[0]
+
+        if n_items < self.brute_force_below:
+            self.centroids = None
+            return self
+
+        n_lists = self.n_lists or int(np.sqrt(n_items))
+        n_lists = max(1, min(n_lists, n_items))
+        self.centroids = self._kmeans(self.vectors, n_lists)
+        self.assignments = self._assign(self.vectors, self.centroids)
+        self._build_lists()
+        return self
+
+    def add(self, vectors):
+        """
+        Append items to the index without re-clustering
+
+        The new items are assigned to their nearest existing cell and get the
+        next positions, so positions keep matching the caller's item order.
+
+        Args:
+            vectors (array-like): One row per new item (dense or sparse)
+
+        Returns:
+            IVFIndex: The updated index
+        """
+        if issparse(vectors):
+            vectors = vectors.toarray()
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.vectors.shape[1])
+        self.vectors = np.vstack([self.vectors, vectors])
+
+        if self.centroids is not None:
+            self.assignments = np.concatenate([
+                self.assignments, self._assign(vectors, self.centroids)
+            ])
+            self._build_lists()
+        return self
+
+    def _build_lists(self):
+        """Store the items grouped by cell so each list is a contiguous slice"""
+        self.order = np.argsort(self.assignments, kind='stable')
+        self.list_vectors = self.vectors[self.order]
+        counts = np.bincount(self.assignments, minlength=len(self.centroids))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def _valid_exclude(self, exclude):
+        """Exclusions as unique positions, ignoring any outside the index"""
+        if exclude is None:
+            return np.empty(0, dtype=np.intp)
+        exclude = np.unique(np.asarray(exclude, dtype=np.intp))
+        return exclude[(exclude >= 0) & (exclude < len(self.vectors))]
+
+    def _kmeans(self, vectors, n_lists):
+        """Lloyd's k-means on a sample of the vectors"""
+        rng = np.random.default_rng(self.random_state)
+        sample_size = min(len(vectors), n_lists * 64)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assignments = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=n_lists)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+
+        return centroids
+
+    @staticmethod
+    def _assign(vectors, centroids, block_size=8192):
+        """Nearest centroid (Euclidean) of every vector, computed in blocks"""
+        centroid_norms = (centroids ** 2).sum(axis=1)
+        assignments = np.empty(len(vectors), dtype=np.intp)
+        for start in range(0, len(vectors), block_size):
+            block = vectors[start:start + block_size]
+            distances = centroid_norms - 2 * block @ centroids.T
+            assignments[start:start + block_size] = distances.argmin(axis=1)
+        return assignments
+
+    def search(self, query, k, n_probe=None, exclude=None):
+        """
+        Find the items with the largest inner product with the query
+
+        Args:
+            query (array-like): Query vector
+            k (int): Number of items to return
+            n_probe (int): Cells to score (defaults to the index setting)
+            exclude (array-like): Item positions that must not be returned
+
+        Returns:
+            tuple: (positions, scores) ordered by decreasing score
+        """
+        query = np.asarray(query, dtype=np.float32).ravel()
+        n_probe = n_probe or self.n_probe
+        if self.centroids is None or n_probe >= len(self.centroids):
+            return self.search_exact(query, k, exclude)
+
+        # Pick the most promising cells, then score only their members
+        cells = top_k(self.centroids @ query, n_probe)
+        candidates = np.concatenate([
+            np.arange(self.offsets[cell], self.offsets[cell + 1]) for cell in cells
+        ])
+        scores = self.list_vectors[candidates] @ query
+        positions = self.order[candidates]
+
+        exclude = self._valid_exclude(exclude)
+        if len(exclude):
+            keep = ~np.isin(positions, exclude)
+            positions, scores = positions[keep], scores[keep]
+
+        top = top_k(scores, k)
+        return positions[top], scores[top]
+
+    def search_exact(self, query, k, exclude=None):
+        """
+        Brute-force search over every item
+
+        Args:
+            query (array-like): Query vector
+            k (int): Number of items to return
+            exclude (array-like): Item positions that must not be returned
+
+        Returns:
+            tuple: (positions, scores) ordered by decreasing score
+        """
+        scores = self.vectors @ np.asarray(query, dtype=np.float32).ravel()
+        exclude = self._valid_exclude(exclude)
+        scores[exclude] = -np.inf
+        n_available = len(scores) - len(exclude)
+
+        top = top_k(scores, min(k, n_available))
+        return top, scores[top]
@@ -0,0 +1,237 @@
+"""
+Async (ASGI) serving mode for the Movie Recommendation System
+
+The ASGI front end accepts connections on an event loop and dispatches each
+request to the Flask app (streamlit_app.py) in a bounded thread or process
+pool, so every Flask endpoint is available unchanged. A slow hybrid request
+only occupies one pool worker; when all workers and the wait queue are busy,
+new requests are rejected with 503 instead of piling up, and requests that
+exceed the timeout get 504.
+
+Run it with `python deploy_async.py` or any ASGI server, e.g.
+`uvicorn asgi_app:app`. Settings are read from ASYNC_EXECUTOR ('thread' or
+'process'), ASYNC_WORKERS, ASYNC_MAX_PENDING and ASYNC_TIMEOUT. The process
+executor requires MODEL_PATH, so workers memory-map one saved model instead
+of each fitting (and retraining) its own.
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+_flask_app = None
+
+
+def _get_flask_app():
+    """Import the Flask app (and build or load the model) once per process"""
+    global _flask_app
+    if _flask_app is None:
+        from streamlit_app import app as flask_app
+        _flask_app = flask_app
+    return _flask_app
+
+
+def _call_wsgi(request):
+    """
+    Run one request through the Flask app
+
+    Args:
+        request (dict): Method, path, query string, headers and body
+
+    Returns:
+        tuple: (status code, headers, body)
+    """
+    environ = {
+        'REQUEST_METHOD': request['method'],
+        'SCRIPT_NAME': '',
+        'PATH_INFO': request['path'],
+        'QUERY_STRING': request['query_string'],
+        'SERVER_NAME': request['server'][0],
+        'SERVER_PORT': str(request['server'][1]),
+        'SERVER_PROTOCOL': f"HTTP/{request['http_version']}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': request['scheme'],
+        'wsgi.input': io.BytesIO(request['body']),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(request['body']))
+    }
+    for name, value in request['headers']:
+        name = name.upper().replace('-', '_')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name != 'CONTENT_LENGTH':
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = headers
+
+    result = _get_flask_app()(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return response['status'], response['headers'], body
+
+
+class AsyncServer:
+    """ASGI application that runs Flask requests in a bounded executor"""
+
+    def __init__(self, executor='thread', max_workers=4, max_pending=64, timeout=10.0):
+        """
+        Initialize the server
+
+        Args:
+            executor (str): 'thread' shares one model between threads;
+                'process' runs requests in worker processes (not GIL-bound),
+                each memory-mapping the saved model in MODEL_PATH
+            max_workers (int): Requests processed concurrently
+            max_pending (int): Requests allowed to wait for a worker
+            timeout (float): Seconds before a request is answered with 504
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError("executor must be 'thread' or 'process'")
+        self.executor_kind = executor
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.executor = None
+        self.in_flight = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def start(self):
+        """
+        Create the worker pool
+
+        Raises:
+            RuntimeError: If the process executor is used without MODEL_PATH
+        """
+        if self.executor is not None:
+            return
+        if self.executor_kind == 'process':
+            # Fitting in every worker would multiply memory and retraining by the pool size
+            if not os.environ.get('MODEL_PATH'):
+                raise RuntimeError("The process executor requires MODEL_PATH; "
+                                   "save a model with build_model.py first")
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                initializer=_get_flask_app)
+        else:
+            _get_flask_app()
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                               thread_name_prefix='recommender')
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    self.start()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        # Backpressure: refuse work once every worker and queue slot is taken
+        if self.in_flight >= self.max_workers + self.max_pending:
+            self.rejected += 1
+            await self._send_error(send, 503, 'Server busy, try again later', [(b'retry-after', b'1')])
+            return
+
+        self.start()
+        request = {
+            'method': scope['method'],
+            'path': scope['path'],
+            'query_string': scope.get('query_string', b'').decode('latin-1'),
+            'headers': [(name.decode('latin-1'), value.decode('latin-1'))
+                        for name, value in scope.get('headers', [])],
+            'body': body,
+            'server': scope.get('server') or ('localhost', 80),
+            'scheme': scope.get('scheme', 'http'),
+            'http_version': scope.get('http_version', '1.1')
+        }
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, _call_wsgi, request)
+
+        # The slot is released when the work really finishes, even after a timeout
+        self.in_flight += 1
+        future.add_done_callback(self._release)
+
+        try:
+            status, headers, response_body = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            await self._send_error(send, 504, 'Request timed out')
+            return
+        except Exception as e:
+            await self._send_error(send, 500, f'Internal server error: {e}')
+            return
+
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in headers]
+        })
+        await send({'type': 'http.response.body', 'body': response_body})
+
+    def _release(self, future):
+        self.in_flight -= 1
+        if not future.cancelled():
+            # Retrieve the exception so abandoned (timed-out) failures are not logged as unhandled
+            future.exception()
+
+    @staticmethod
+    async def _send_error(send, status, message, extra_headers=()):
+        body = json.dumps({"error": message}).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode('latin-1')),
+                        *extra_headers]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+app = AsyncServer(
+    executor=os.environ.get('ASYNC_EXECUTOR', 'thread'),
+    max_workers=int(os.environ.get('ASYNC_WORKERS', 4)),
+    max_pending=int(os.environ.get('ASYNC_MAX_PENDING', 64)),
+    timeout=float(os.environ.get('ASYNC_TIMEOUT', 10))
+)
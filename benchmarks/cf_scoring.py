@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark for collaborative filtering scoring
+Compares the old per-movie Python loop with the vectorized argpartition path
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import random as sparse_random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ranking import top_k
+
+
+def loop_scoring(user_movie_frame, user_features, movie_features, user_id, n_recommendations):
+    """Old implementation: dense pivot row, get_loc per movie and a full sort"""
+    user_idx = user_movie_frame.index.get_loc(user_id)
+    predicted_ratings = np.dot(user_features[user_idx], movie_features)
+
+    user_ratings = user_movie_frame.iloc[user_idx]
+    unwatched_movies = user_ratings[user_ratings == 0].index
+
+    movie_scores = []
+    for movie_id in unwatched_movies:
+        if movie_id in user_movie_frame.columns:
+            movie_col_idx = user_movie_frame.columns.get_loc(movie_id)
+            movie_scores.append((movie_id, predicted_ratings[movie_col_idx]))
+
+    movie_scores.sort(key=lambda x: x[1], reverse=True)
+    return [movie_id for movie_id, _ in movie_scores[:n_recommendations]]
+
+
+def vectorized_scoring(sparse_ratings, movie_ids, user_features, movie_features, user_idx, n_recommendations):
+    """New implementation: one masked NumPy pass and argpartition top-K"""
+    predicted_ratings = user_features[user_idx] @ movie_features
+
+    start, stop = sparse_ratings.indptr[user_idx], sparse_ratings.indptr[user_idx + 1]
+    seen = sparse_ratings.indices[start:stop]
+    predicted_ratings[seen] = -np.inf
+
+    n_unwatched = predicted_ratings.shape[0] - len(seen)
+    top_cols = top_k(predicted_ratings, min(n_recommendations, n_unwatched))
+    return movie_ids[top_cols].tolist()
+
+
+def percentiles(timings):
+    """Return p50 and p99 latency in milliseconds"""
+    timings = np.asarray(timings) * 1000
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def run(n_movies, n_users, n_components, n_requests, n_recommendations, seed):
+    """Time both implementations on one synthetic catalogue size"""
+    rng = np.random.default_rng(seed)
+    sparse_ratings = sparse_random(
+        n_users, n_movies, density=min(1.0, 50 / n_movies), format='csr',
+        random_state=seed, data_rvs=lambda size: rng.integers(1, 11, size) / 2
+    ).astype(np.float32)
+    sparse_ratings.sort_indices()
+    user_features = rng.random((n_users, n_components), dtype=np.float32)
+    movie_features = rng.random((n_components, n_movies), dtype=np.float32)
+
+    user_ids = np.arange(1, n_users + 1)
+    movie_ids = np.arange(1, n_movies + 1)
+    user_movie_frame = pd.DataFrame(sparse_ratings.toarray(), index=user_ids, columns=movie_ids)
+
+    queries = rng.integers(0, n_users, n_requests)
+
+    loop_timings = []
+    vectorized_timings = []
+    for user_idx in queries:
+        start = time.perf_counter()
+        expected = loop_scoring(user_movie_frame, user_features, movie_features,
+                                user_ids[user_idx], n_recommendations)
+        loop_timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        actual = vectorized_scoring(sparse_ratings, movie_ids, user_features, movie_features,
+                                    user_idx, n_recommendations)
+        vectorized_timings.append(time.perf_counter() - start)
+
+        if set(actual) != set(expected):
+            raise AssertionError(f"Results differ for user {user_ids[user_idx]}")
+
+    return percentiles(loop_timings), percentiles(vectorized_timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collaborative filtering scoring")
+    parser.add_argument("--movies", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="Catalogue sizes to benchmark")
+    parser.add_argument("--users", type=int, default=50, help="Number of synthetic users")
+    parser.add_argument("--components", type=int, default=20, help="Number of latent factors")
+    parser.add_argument("--requests", type=int, default=50, help="Requests timed per catalogue size")
+    parser.add_argument("--top", type=int, default=5, help="Recommendations per request")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    print(f"{'movies':>8} | {'loop p50':>10} {'loop p99':>10} | {'vec p50':>10} {'vec p99':>10} | {'speedup':>8}")
+    print("-" * 72)
+    for n_movies in args.movies:
+        (loop_p50, loop_p99), (vec_p50, vec_p99) = run(
+            n_movies, args.users, args.components, args.requests, args.top, args.seed
+        )
+        print(f"{n_movies:>8} | {loop_p50:>8.2f}ms {loop_p99:>8.2f}ms | "
+              f"{vec_p50:>8.3f}ms {vec_p99:>8.3f}ms | {loop_p99 / vec_p99:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
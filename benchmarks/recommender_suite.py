@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for MovieRecommendationSystem on synthetic data
+
+Generates (or reuses) a seeded MovieLens-like dataset, times construction and
+every public recommendation method, and reports wall time, latency
+percentiles, throughput and the memory each benchmark needs. Results are
+written as JSON; pass a previous run with --compare to flag regressions.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommendation_system import MovieRecommendationSystem
+from search_index import tokenize
+from synthetic_data import write_dataset
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MiB (Linux only, else None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def traced_peak_mb(func, args_list):
+    """
+    High-water mark of the memory allocated while making the calls, in MiB
+
+    Measured with tracemalloc (NumPy reports its buffers to it) in a pass of
+    its own, because tracing slows the calls down. Tracing starts afresh for
+    every benchmark, so only allocations made during its calls count, not
+    the model already in memory; construction and methods are comparable.
+    """
+    tracemalloc.start()
+    try:
+        for args in args_list:
+            func(*args)
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def time_calls(func, args_list, warmup=5):
+    """
+    Time one call per argument tuple
+
+    Returns:
+        dict: Wall time, latency percentiles, throughput and peak traced memory
+    """
+    for args in args_list[:warmup]:
+        func(*args)
+
+    timings = []
+    start = time.perf_counter()
+    for args in args_list:
+        call_start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - call_start)
+    wall = time.perf_counter() - start
+
+    timings = np.asarray(timings) * 1000
+    return {
+        'calls': len(timings),
+        'wall_s': wall,
+        'mean_ms': float(timings.mean()),
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'throughput_per_s': len(timings) / wall if wall else None,
+        'peak_mb': traced_peak_mb(func, args_list)
+    }
+
+
+def make_queries(recommender, n_queries, seed):
+    """Sample users, rated movies and search strings for the method benchmarks"""
+    rng = np.random.default_rng(seed)
+    user_ids = recommender.user_movie_matrix.index.to_numpy()
+    rated_movies = recommender.user_movie_matrix.columns.to_numpy()
+
+    users = rng.choice(user_ids, n_queries).tolist()
+    movies = rng.choice(rated_movies, n_queries).tolist()
+
+    searches = []
+    for position in rng.integers(0, len(recommender.catalogue), n_queries):
+        tokens = tokenize(recommender.catalogue.titles[position])
+        # Mix full words and partially typed ones
+        word = tokens[rng.integers(0, len(tokens))]
+        searches.append(word if rng.random() < 0.5 else word[:max(1, len(word) // 2)])
+
+    return users, movies, searches
+
+
+def run_suite(movies_path, ratings_path, n_queries, n_results, seed):
+    """
+    Build the recommender and time every public method
+
+    Returns:
+        dict: Results per benchmark name
+    """
+    results = {}
+
+    # The timed build is untraced; its peak is measured by a second, traced
+    # build. rss_delta_mb is what the built model keeps resident, not a peak
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    recommender = MovieRecommendationSystem(movies_path, ratings_path)
+    wall = time.perf_counter() - start
+    n_ratings = recommender.sparse_matrix.nnz
+    results['construction'] = {
+        'calls': 1,
+        'wall_s': wall,
+        'ratings': n_ratings,
+        'throughput_per_s': n_ratings / wall,
+        'rss_delta_mb': current_rss_mb() - rss_before if rss_before is not None else None,
+        'peak_mb': traced_peak_mb(MovieRecommendationSystem, [(movies_path, ratings_path)])
+    }
+
+    users, movies, searches = make_queries(recommender, n_queries, seed)
+
+    benchmarks = {
+        'content_based_recommendations': (
+            recommender.content_based_recommendations, [(m, n_results) for m in movies]),
+        'collaborative_filtering_recommendations': (
+            recommender.collaborative_filtering_recommendations, [(u, n_results) for u in users]),
+        'hybrid_recommendations': (
+            recommender.hybrid_recommendations, [(u, m, n_results) for u, m in zip(users, movies)]),
+        'get_popular_movies': (
+            recommender.get_popular_movies, [(n_results,)] * n_queries),
+        'search_movies': (
+            recommender.search_movies, [(q, n_results) for q in searches])
+    }
+    for name, (func, args_list) in benchmarks.items():
+        results[name] = time_calls(func, args_list)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare against a previous run
+
+    Construction is compared on wall time, methods on p50 latency.
+
+    Returns:
+        list: (name, baseline, current, ratio) of every regression beyond tolerance
+    """
+    regressions = []
+    print(f"\n{'benchmark':<42} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        metric = 'wall_s' if name == 'construction' else 'p50_ms'
+        old, new = baseline[name][metric], current[metric]
+        ratio = new / old if old else float('inf')
+        flag = '  REGRESSION' if ratio > 1 + tolerance else ''
+        print(f"{name:<42} {old:>10.3f} {new:>10.3f} {ratio:>6.2f}x{flag}")
+        if flag:
+            regressions.append((name, old, new, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MovieRecommendationSystem on synthetic data")
+    parser.add_argument("--movies", type=int, default=10000, help="Number of synthetic movies")
+    parser.add_argument("--users", type=int, default=5000, help="Number of synthetic users")
+    parser.add_argument("--ratings", type=int, default=500000, help="Target number of ratings")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--queries", type=int, default=200, help="Calls timed per method")
+    parser.add_argument("--top", type=int, default=10, help="Results per call")
+    parser.add_argument("--data-dir", default=None,
+                        help="Where to write the dataset (reused when the parameters match)")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="JSON results of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown relative to --compare before flagging a regression")
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or os.path.join(
+        tempfile.gettempdir(), f"movierec-bench-{args.movies}-{args.users}-{args.ratings}-{args.seed}"
+    )
+    print(f"📦 Preparing dataset in {data_dir}...")
+    start = time.perf_counter()
+    dataset = write_dataset(data_dir, args.movies, args.users, args.ratings, args.seed)
+    print(f"   {dataset['n_ratings_written']:,} ratings ready in {time.perf_counter() - start:.1f}s")
+
+    results = run_suite(dataset['movies_path'], dataset['ratings_path'],
+                        args.queries, args.top, args.seed)
+
+    print(f"\n{'benchmark':<42} {'wall':>9} {'p50':>9} {'p99':>9} {'per s':>10} "
+          f"{'peak mem':>10} {'rss delta':>10}")
+    print("-" * 105)
+    for name, result in results.items():
+        p50 = f"{result['p50_ms']:.2f}ms" if 'p50_ms' in result else '-'
+        p99 = f"{result['p99_ms']:.2f}ms" if 'p99_ms' in result else '-'
+        peak = f"{result['peak_mb']:.1f}MiB" if result.get('peak_mb') is not None else '-'
+        retained = f"{result['rss_delta_mb']:.1f}MiB" if result.get('rss_delta_mb') is not None else '-'
+        print(f"{name:<42} {result['wall_s']:>8.2f}s {p50:>9} {p99:>9} "
+              f"{result['throughput_per_s']:>10.1f} {peak:>10} {retained:>10}")
+
+    report = {
+        'dataset': dataset['params'],
+        'n_ratings': dataset['n_ratings_written'],
+        'queries': args.queries,
+        'top': args.top,
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('dataset') != report['dataset']:
+            print("⚠️ Baseline was run on a different dataset; ratios may not be meaningful")
+        regressions = compare(results, baseline['results'], args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Seeded generator of MovieLens-like datasets for benchmarking
+
+Movie popularity and user activity both follow power laws, so a few
+blockbusters and heavy raters account for most ratings, as in MovieLens.
+Ratings are written in chunks of users, so tens of millions of rows never
+need to be held in memory at once.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+GENRES = [
+    'Action', 'Adventure', 'Animation', 'Children', 'Comedy', 'Crime',
+    'Documentary', 'Drama', 'Fantasy', 'Film-Noir', 'Horror', 'IMAX',
+    'Musical', 'Mystery', 'Romance', 'Sci-Fi', 'Thriller', 'War', 'Western'
+]
+
+TITLE_WORDS = [
+    'the', 'last', 'night', 'city', 'love', 'dark', 'star', 'war', 'man', 'woman',
+    'king', 'queen', 'dead', 'life', 'story', 'house', 'lost', 'world', 'blood',
+    'return', 'secret', 'game', 'fire', 'ice', 'river', 'road', 'summer', 'winter',
+    'ghost', 'dream', 'heart', 'shadow', 'island', 'empire', 'girl', 'boy', 'time',
+    'space', 'moon', 'sun', 'black', 'white', 'red', 'blue', 'golden', 'silent',
+    'wild', 'little', 'big', 'american', 'french', 'midnight', 'morning', 'storm',
+    'ocean', 'mountain', 'machine', 'robot', 'dragon', 'wolf', 'tiger', 'eagle',
+    'kiss', 'escape', 'rising', 'falling', 'broken', 'hidden', 'final', 'first'
+]
+
+# Power-law exponents of movie popularity and user activity
+MOVIE_POPULARITY_EXPONENT = 1.0
+USER_ACTIVITY_EXPONENT = 0.8
+# Rounds of redrawing duplicate (user, movie) pairs
+MAX_DRAW_ROUNDS = 10
+
+
+def power_law_weights(n, exponent, rng):
+    """Weights proportional to rank^-exponent, assigned to items in random order"""
+    weights = np.arange(1, n + 1, dtype=np.float64) ** -exponent
+    return rng.permutation(weights / weights.sum())
+
+
+def generate_movies(n_movies, seed=42):
+    """
+    Generate a movie catalogue
+
+    Args:
+        n_movies (int): Number of movies
+        seed (int): Random seed
+
+    Returns:
+        DataFrame: movieId, title, genres and year columns
+    """
+    rng = np.random.default_rng(seed)
+    genre_weights = power_law_weights(len(GENRES), 0.7, rng)
+
+    years = rng.integers(1920, 2024, n_movies)
+    word_counts = rng.integers(1, 5, n_movies)
+    words = rng.integers(0, len(TITLE_WORDS), (n_movies, 4))
+    genre_counts = rng.integers(1, 4, n_movies)
+
+    titles = []
+    genres = []
+    for i in range(n_movies):
+        name = ' '.join(TITLE_WORDS[w] for w in words[i, :word_counts[i]]).title()
+        titles.append(f'{name} ({years[i]})')
+        picked = rng.choice(len(GENRES), genre_counts[i], replace=False, p=genre_weights)
+        genres.append('|'.join(GENRES[g] for g in sorted(picked)))
+
+    return pd.DataFrame({
+        'movieId': np.arange(1, n_movies + 1),
+        'title': titles,
+        'genres': genres,
+        'year': years
+    })
+
+
+def generate_ratings(n_users, n_movies, n_ratings, seed=42, chunk_users=10000):
+    """
+    Generate power-law ratings, one chunk of users at a time
+
+    Every user rates a given movie at most once and rates at most half the
+    catalogue, so the number of rows produced can be slightly below n_ratings.
+
+    Args:
+        n_users (int): Number of users
+        n_movies (int): Number of movies
+        n_ratings (int): Target number of ratings
+        seed (int): Random seed
+        chunk_users (int): Users generated per chunk
+
+    Yields:
+        DataFrame: userId, movieId, rating and timestamp columns
+    """
+    rng = np.random.default_rng(seed + 1)
+    movie_cdf = np.cumsum(power_law_weights(n_movies, MOVIE_POPULARITY_EXPONENT, rng))
+    movie_cdf[-1] = 1.0
+    activity = power_law_weights(n_users, USER_ACTIVITY_EXPONENT, rng)
+    ratings_per_user = np.clip(np.round(activity * n_ratings), 1, max(1, n_movies // 2)).astype(np.int64)
+
+    movie_quality = rng.normal(3.5, 0.5, n_movies)
+    user_bias = rng.normal(0.0, 0.4, n_users)
+
+    for start in range(0, n_users, chunk_users):
+        stop = min(start + chunk_users, n_users)
+        targets = ratings_per_user[start:stop]
+        pairs = np.empty(0, dtype=np.int64)
+
+        # Repeated (user, movie) draws are dropped, so draw again for the shortfall
+        for _ in range(MAX_DRAW_ROUNDS):
+            counts = np.bincount(pairs // n_movies - start, minlength=stop - start)
+            missing = targets - counts
+            if not missing.any():
+                break
+            users = np.repeat(np.arange(start, stop), missing)
+            movies = np.searchsorted(movie_cdf, rng.random(len(users)), side='right')
+            pairs = np.union1d(pairs, users * n_movies + movies)
+
+        users, movies = pairs // n_movies, pairs % n_movies
+
+        scores = movie_quality[movies] + user_bias[users] + rng.normal(0.0, 0.8, len(users))
+        ratings = np.clip(np.round(scores * 2) / 2, 0.5, 5.0)
+
+        yield pd.DataFrame({
+            'userId': users + 1,
+            'movieId': movies + 1,
+            'rating': ratings,
+            'timestamp': rng.integers(946684800, 1700000000, len(users))
+        })
+
+
+def write_dataset(directory, n_movies, n_users, n_ratings, seed=42):
+    """
+    Write movies.csv and ratings.csv, reusing files generated with the same parameters
+
+    Args:
+        directory (str): Output directory
+        n_movies (int): Number of movies
+        n_users (int): Number of users
+        n_ratings (int): Target number of ratings
+        seed (int): Random seed
+
+    Returns:
+        dict: Paths, parameters and the actual number of ratings written
+    """
+    params = {'movies': n_movies, 'users': n_users, 'ratings': n_ratings, 'seed': seed}
+    movies_path = os.path.join(directory, 'movies.csv')
+    ratings_path = os.path.join(directory, 'ratings.csv')
+    info_path = os.path.join(directory, 'dataset.json')
+
+    if os.path.exists(info_path):
+        with open(info_path) as f:
+            info = json.load(f)
+        if info['params'] == params and os.path.exists(ratings_path):
+            return info
+
+    os.makedirs(directory, exist_ok=True)
+    generate_movies(n_movies, seed).to_csv(movies_path, index=False)
+
+    written = 0
+    for i, chunk in enumerate(generate_ratings(n_users, n_movies, n_ratings, seed)):
+        chunk.to_csv(ratings_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        written += len(chunk)
+
+    info = {
+        'params': params,
+        'movies_path': movies_path,
+        'ratings_path': ratings_path,
+        'n_ratings_written': written
+    }
+    with open(info_path, 'w') as f:
+        json.dump(info, f, indent=2)
+    return info
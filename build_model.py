@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Fit the Movie Recommendation System once and save it as a model artifact
+Web workers can then load the artifact (memory-mapped) instead of refitting
+"""
+
+import argparse
+import os
+import time
+
+from recommendation_system import MovieRecommendationSystem
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and save a Movie Recommendation System model")
+    parser.add_argument("--movies", default="data/movies.csv", help="Path to movies CSV file")
+    parser.add_argument("--ratings", default="data/ratings.csv", help="Path to ratings CSV file")
+    parser.add_argument("--ratings-cache", default=None,
+                        help="Directory for a columnar cache of the parsed ratings")
+    parser.add_argument("--cf-engine", default="nmf", choices=["nmf", "als", "implicit-als"],
+                        help="Collaborative filtering engine")
+    parser.add_argument("--output", default="models/latest", help="Artifact directory to write")
+    parser.add_argument("--niceness", type=int, default=0,
+                        help="Lower this process's CPU priority by this much (POSIX)")
+    
+    args = parser.parse_args()
+    if args.niceness and hasattr(os, 'nice'):
+        os.nice(args.niceness)
+    
+    print("🎬 Building recommendation model...")
+    start = time.perf_counter()
+    recommender = MovieRecommendationSystem(args.movies, args.ratings,
+                                            ratings_cache=args.ratings_cache,
+                                            cf_engine=args.cf_engine)
+    print(f"✅ Model fitted in {time.perf_counter() - start:.2f}s")
+    
+    manifest = recommender.save(args.output)
+    print(f"💾 Saved {len(manifest['arrays'])} arrays to {args.output}")
+    print(f"🚀 Serve it with: MODEL_PATH={args.output} gunicorn -w 4 streamlit_app:app")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sklearn.decomposition import NMF
+
+
+def fold_in_nonnegative(ratings, item_factors, init=None, n_iter=50):
+    """
+    Compute non-negative user factors for fixed item factors
+
+    Solves min ||R - W H||^2 subject to W >= 0 (the objective NMF.transform
+    minimises) with projected coordinate descent on the k x k Gram matrix, so
+    the cost per user is O(nnz + k^2) per iteration.
+
+    Args:
+        ratings (csr_matrix): Rating rows of the users to fold in
+        item_factors (ndarray): Item factor matrix H (n_components x n_movies)
+        init (ndarray): Optional starting factors, e.g. the users' current ones
+        n_iter (int): Number of coordinate descent sweeps
+
+    Returns:
+        ndarray: User factors W (n_users x n_components)
+    """
+    gram = item_factors @ item_factors.T
+    rhs = np.asarray(ratings @ item_factors.T)
+    if init is None:
+        factors = np.zeros(rhs.shape, dtype=item_factors.dtype)
+    else:
+        factors = np.array(init, dtype=item_factors.dtype)
+
+    for _ in range(n_iter):
+        for j in range(gram.shape[0]):
+            if gram[j, j] <= 0:
+                continue
+            step = (rhs[:, j] - factors @ gram[:, j]) / gram[j, j]
+            factors[:, j] = np.maximum(0, factors[:, j] + step)
+
+    return factors
+
+
+class CFEngine:
+    """
+    Interface of a collaborative filtering engine
+
+    An engine factorises the sparse user x movie rating matrix R into user
+    factors W (n_users x k) and item factors H (k x n_movies), so that the
+    score of user u for movie i is W[u] @ H[:, i]. It can also compute
+    factors for new or changed users against fixed item factors.
+    """
+
+    name = None
+
+    def params(self):
+        """Constructor arguments, stored with saved models"""
+        raise NotImplementedError
+
+    def fit(self, ratings):
+        """
+        Factorise the rating matrix
+
+        Args:
+            ratings (csr_matrix): User x movie ratings
+
+        Returns:
+            tuple: (user_factors, item_factors)
+        """
+        raise NotImplementedError
+
+    def score_range(self, ratings):
+        """
+        Fixed range of the engine's scores, used to put them on a common scale
+
+        Args:
+            ratings (csr_matrix): User x movie ratings the engine was fitted on
+
+        Returns:
+            tuple: (low, high) score of the rating scale
+        """
+        return 0.0, float(ratings.data.max()) if ratings.nnz else 1.0
+
+    def fold_in(self, ratings, item_factors, init=None):
+        """
+        Compute user factors for fixed item factors
+
+        Args:
+            ratings (csr_matrix): Rating rows of the users to fold in
+            item_factors (ndarray): Item factors (k x n_movies)
+            init (ndarray): Optional current factors of these users
+
+        Returns:
+            ndarray: User factors (n_users x k)
+        """
+        raise NotImplementedError
+
+
+class NMFEngine(CFEngine):
+    """Non-negative matrix factorisation with scikit-learn (missing ratings count as zeros)"""
+
+    name = 'nmf'
+
+    def __init__(self, n_components=20, max_iter=200, random_state=42):
+        self.n_components = n_components
+        self.max_iter = max_iter
+        self.random_state = random_state
+        self.model = None
+
+    def params(self):
+        return {'n_components': self.n_components, 'max_iter': self.max_iter,
+                'random_state': self.random_state}
+
+    def fit(self, ratings):
+        self.model = NMF(n_components=self.n_components, random_state=self.random_state,
+                         max_iter=self.max_iter)
+        user_factors = self.model.fit_transform(ratings)
+        return user_factors, self.model.components_
+
+    def fold_in(self, ratings, item_factors, init=None):
+        return fold_in_nonnegative(ratings, item_factors, init=init)
+
+
+# Padded batch widths grow geometrically, wasting at most 25% on padding
+PAD_GROWTH = 1.25
+
+
+class ALSEngine(CFEngine):
+    """
+    Alternating least squares on the observed ratings only
+
+    Each half-step fixes one side's factors and solves a k x k regularised
+    least-squares system per user (or per movie). The systems are built from
+    the observed entries of the CSR matrix alone, so missing ratings are not
+    treated as zeros, and they are solved in row blocks on a thread pool;
+    NumPy releases the GIL in the heavy kernels, so blocks run in parallel.
+
+    With implicit=True the ratings are treated as implicit feedback (Hu,
+    Koren and Volinsky 2008): every rated movie has preference 1 with
+    confidence 1 + alpha * rating, unrated movies preference 0 with
+    confidence 1. The unrated part enters only through the shared k x k Gram
+    matrix, so the cost stays proportional to the number of ratings. Scores
+    are then preferences rather than predicted ratings.
+    """
+
+    name = 'als'
+
+    def __init__(self, n_components=20, regularization=0.1, n_iter=15, implicit=False,
+                 alpha=10.0, n_threads=None, block_nnz=65536, random_state=42):
+        """
+        Initialize the engine
+
+        Args:
+            n_components (int): Number of latent factors k
+            regularization (float): L2 penalty (scaled by each row's rating
+                count in explicit mode)
+            n_iter (int): Number of alternating sweeps
+            implicit (bool): Implicit-feedback objective instead of explicit ratings
+            alpha (float): Confidence scaling of implicit feedback
+            n_threads (int): Worker threads (default: number of CPUs)
+            block_nnz (int): Ratings per solved block, bounding temporary memory
+            random_state (int): Seed of the initial factors
+        """
+        self.n_components = n_components
+        self.regularization = regularization
+        self.n_iter = n_iter
+        self.implicit = implicit
+        self.alpha = alpha
+        self.n_threads = n_threads
+        self.block_nnz = block_nnz
+        self.random_state = random_state
+
+    def params(self):
+        return {'n_components': self.n_components, 'regularization': self.regularization,
+                'n_iter': self.n_iter, 'implicit': self.implicit, 'alpha': self.alpha,
+                'n_threads': self.n_threads, 'block_nnz': self.block_nnz,
+                'random_state': self.random_state}
+
+    def score_range(self, ratings):
+        # Implicit scores estimate a preference between 0 and 1
+        if self.implicit:
+            return 0.0, 1.0
+        return super().score_range(ratings)
+
+    def fit(self, ratings):
+        ratings = ratings.tocsr()
+        ratings_t = ratings.T.tocsr()
+        rng = np.random.default_rng(self.random_state)
+        item_factors = rng.normal(0, 0.01, (ratings.shape[1], self.n_components))
+        user_factors = np.zeros((ratings.shape[0], self.n_components))
+
+        with ThreadPoolExecutor(max_workers=self.n_threads or os.cpu_count()) as pool:
+            for _ in range(self.n_iter):
+                user_factors = self._solve(ratings, item_factors, pool)
+                item_factors = self._solve(ratings_t, user_factors, pool)
+
+        return user_factors.astype(np.float32), np.ascontiguousarray(item_factors.T, dtype=np.float32)
+
+    def fold_in(self, ratings, item_factors, init=None):
+        with ThreadPoolExecutor(max_workers=self.n_threads or os.cpu_count()) as pool:
+            factors = self._solve(ratings.tocsr(), item_factors.T.astype(np.float64), pool)
+        return factors.astype(item_factors.dtype)
+
+    def _row_blocks(self, indptr):
+        """Split rows into contiguous blocks of about block_nnz ratings"""
+        n_rows = len(indptr) - 1
+        bounds = np.searchsorted(indptr, np.arange(0, indptr[-1], self.block_nnz), side='right') - 1
+        bounds = np.unique(np.concatenate([bounds, [n_rows]]))
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def _solve(self, ratings, fixed, pool):
+        """
+        Solve the least-squares system of every row of ratings
+
+        Args:
+            ratings (csr_matrix): Rows to solve for, columns indexing fixed
+            fixed (ndarray): Fixed factors (n_columns x k)
+            pool (ThreadPoolExecutor): Workers solving the row blocks
+
+        Returns:
+            ndarray: Factors of every row (n_rows x k)
+        """
+        factors = np.zeros((ratings.shape[0], self.n_components))
+        gram = fixed.T @ fixed if self.implicit else None
+
+        def solve_block(start, stop):
+            counts = np.diff(ratings.indptr[start:stop + 1])
+            rows = np.flatnonzero(counts)
+            if not len(rows):
+                return
+
+            # Rows of similar length are padded into one dense batch, so every
+            # system is a small matrix product over that row's ratings only
+            widths = np.ceil(PAD_GROWTH ** np.ceil(np.log(counts[rows]) / np.log(PAD_GROWTH)))
+            widths = np.maximum(widths.astype(np.int64), counts[rows])
+            for width in np.unique(widths):
+                batch = rows[widths == width]
+                offsets = np.arange(width)
+                valid = offsets < counts[batch][:, None]
+                entries = ratings.indptr[start + batch][:, None] + np.where(valid, offsets, 0)
+
+                vectors = fixed[ratings.indices[entries]]
+                values = np.where(valid, ratings.data[entries], 0.0)
+                if self.implicit:
+                    # Confidence 1 + alpha * r; the constant 1 is covered by the Gram matrix
+                    system_weights = self.alpha * values
+                    rhs_weights = np.where(valid, 1.0 + system_weights, 0.0)
+                else:
+                    system_weights = valid.astype(np.float64)
+                    rhs_weights = values
+
+                systems = np.matmul((vectors * system_weights[:, :, None]).transpose(0, 2, 1), vectors)
+                rhs = np.matmul(rhs_weights[:, None, :], vectors)[:, 0]
+
+                if self.implicit:
+                    systems += gram
+                    penalty = np.full(len(batch), self.regularization)
+                else:
+                    penalty = self.regularization * counts[batch]
+                diagonal = np.arange(self.n_components)
+                systems[:, diagonal, diagonal] += penalty[:, None]
+
+                factors[start + batch] = np.linalg.solve(systems, rhs[:, :, None])[:, :, 0]
+
+        futures = [pool.submit(solve_block, start, stop) for start, stop in self._row_blocks(ratings.indptr)]
+        for future in futures:
+            future.result()
+        return factors
+
+
+ENGINES = {
+    'nmf': lambda **params: NMFEngine(**params),
+    'als': lambda **params: ALSEngine(**params),
+    'implicit-als': lambda **params: ALSEngine(**{'implicit': True, **params})
+}
+
+
+def create_engine(name='nmf', **params):
+    """
+    Create a collaborative filtering engine by name
+
+    Args:
+        name (str): 'nmf', 'als' or 'implicit-als'
+        **params: Engine constructor arguments
+
+    Returns:
+        CFEngine: The engine
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown collaborative filtering engine '{name}'")
+    return ENGINES[name](**params)
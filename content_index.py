@@ -0,0 +1,102 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from ranking import top_k
+
+
+class ContentIndex:
+    """
+    Sparse top-K similarity index for content-based filtering
+
+    Instead of materialising the dense N x N cosine similarity matrix, only the
+    K most similar movies of every movie are kept in a CSR matrix. The index is
+    built one block of rows at a time so peak memory stays at roughly
+    block_size x N floats regardless of the catalogue size.
+    """
+
+    def __init__(self, n_neighbors=50, block_size=256):
+        """
+        Initialize the content index
+
+        Args:
+            n_neighbors (int): Number of neighbours kept per movie
+            block_size (int): Number of rows scored per block while building
+        """
+        self.n_neighbors = n_neighbors
+        self.block_size = block_size
+        self.similarity = None
+
+    def fit(self, feature_matrix):
+        """
+        Build the top-K neighbour lists
+
+        Args:
+            feature_matrix (sparse matrix): L2-normalised movie feature rows
+                (e.g. TF-IDF genre vectors), so a dot product is a cosine
+
+        Returns:
+            ContentIndex: The fitted index
+        """
+        feature_matrix = csr_matrix(feature_matrix, dtype=np.float32)
+        n_movies = feature_matrix.shape[0]
+        k = max(0, min(self.n_neighbors, n_movies - 1))
+        # Genre vocabularies are tiny, so a dense transpose makes each block a
+        # cheap sparse x dense product; wide feature spaces stay sparse
+        if feature_matrix.shape[1] <= 1024:
+            feature_matrix_t = feature_matrix.T.toarray()
+        else:
+            feature_matrix_t = feature_matrix.T.tocsc()
+
+        indptr = [0]
+        indices = []
+        data = []
+
+        for start in range(0, n_movies, self.block_size):
+            stop = min(start + self.block_size, n_movies)
+
+            # Score one block of movies against the whole catalogue
+            block = feature_matrix[start:stop] @ feature_matrix_t
+            if not isinstance(block, np.ndarray):
+                block = block.toarray()
+
+            # A movie is never its own neighbour
+            rows = np.arange(stop - start)
+            block[rows, rows + start] = -np.inf
+
+            if k == 0:
+                indptr.extend([0] * (stop - start))
+                continue
+
+            # Top-K per row, ordered by score with ties broken by catalogue position
+            top = top_k(block, k)
+            top_scores = np.take_along_axis(block, top, axis=1)
+
+            # Movies sharing no features are not neighbours
+            keep = top_scores > 0
+            indices.append(top[keep])
+            data.append(top_scores[keep])
+            indptr.extend(indptr[-1] + np.cumsum(keep.sum(axis=1)))
+
+        indices = np.concatenate(indices) if indices else np.empty(0, dtype=np.int32)
+        data = np.concatenate(data) if data else np.empty(0, dtype=np.float32)
+
+        self.similarity = csr_matrix(
+            (data.astype(np.float32), indices.astype(np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(n_movies, n_movies)
+        )
+        return self
+
+    def neighbors(self, idx, n=None):
+        """
+        Get the most similar movies for a catalogue position
+
+        Args:
+            idx (int): Row position of the movie
+            n (int): Maximum number of neighbours to return
+
+        Returns:
+            tuple: (indices, scores) arrays ordered by decreasing similarity
+        """
+        start, stop = self.similarity.indptr[idx], self.similarity.indptr[idx + 1]
+        if n is not None:
+            stop = min(stop, start + n)
+        return self.similarity.indices[start:stop], self.similarity.data[start:stop]
@@ -0,0 +1,130 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from model_artifacts import save_artifact, load_artifact, MANIFEST_NAME
+
+# Compact dtypes for the ratings columns
+RATINGS_DTYPES = {
+    'userId': np.int32,
+    'movieId': np.int32,
+    'rating': np.float32,
+    'timestamp': np.uint32
+}
+
+
+def _source_signature(path):
+    """Size and modification time used to detect a changed source CSV"""
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def ratings_cache_path(cache_dir, path):
+    """
+    Directory the cache of one ratings CSV is written to inside cache_dir
+
+    Every source gets its own subdirectory, so files already in cache_dir are
+    never touched and several CSVs can share one cache directory.
+
+    Args:
+        cache_dir (str): Directory holding the ratings caches
+        path (str): Path to the ratings CSV file
+
+    Returns:
+        str: Cache directory for this CSV
+    """
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, f'ratings-{digest}')
+
+
+def deduplicate_ratings(columns):
+    """
+    Keep only the latest rating of every (userId, movieId) pair
+
+    Args:
+        columns (dict): Column arrays including userId and movieId
+
+    Returns:
+        dict: Column arrays without duplicate pairs, in original order
+    """
+    n_rows = len(columns['userId'])
+    keys = (columns['userId'].astype(np.int64) << 32) | columns['movieId'].astype(np.int64)
+
+    # First occurrence in the reversed keys is the last one in file order
+    _, last_reversed = np.unique(keys[::-1], return_index=True)
+    if len(last_reversed) == n_rows:
+        return columns
+
+    keep = np.sort(n_rows - 1 - last_reversed)
+    return {name: values[keep] for name, values in columns.items()}
+
+
+def read_ratings_csv(path, chunksize=1_000_000):
+    """
+    Stream a ratings CSV in chunks with compact dtypes
+
+    Args:
+        path (str): Path to the ratings CSV file
+        chunksize (int): Rows parsed per chunk
+
+    Returns:
+        dict: Column arrays (int32 ids, float32 ratings, uint32 timestamps)
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {name: dtype for name, dtype in RATINGS_DTYPES.items() if name in header}
+
+    chunks = {name: [] for name in dtypes}
+    for chunk in pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize):
+        for name in dtypes:
+            chunks[name].append(chunk[name].to_numpy())
+
+    columns = {
+        name: np.concatenate(parts) if parts else np.empty(0, dtype=dtypes[name])
+        for name, parts in chunks.items()
+    }
+    return deduplicate_ratings(columns)
+
+
+def load_ratings(path, cache_dir=None, chunksize=1_000_000, mmap=False):
+    """
+    Load ratings, using a columnar binary cache when one is available
+
+    The first load parses the CSV in chunks and, if cache_dir is given, writes
+    one .npy file per column into a ratings-<hash> subdirectory of it (see
+    ratings_cache_path). Later loads of the same (unchanged) CSV
+    read the arrays straight from the cache without any parsing.
+
+    Args:
+        path (str): Path to the ratings CSV file
+        cache_dir (str): Directory for the columnar cache (None disables it)
+        chunksize (int): Rows parsed per chunk
+        mmap (bool): Memory-map the cached columns instead of reading them
+
+    Returns:
+        DataFrame: Ratings with compact dtypes and unique (userId, movieId) pairs
+    """
+    signature = _source_signature(path)
+    if cache_dir is not None:
+        cache_dir = ratings_cache_path(cache_dir, path)
+
+    if cache_dir is not None and os.path.exists(os.path.join(cache_dir, MANIFEST_NAME)):
+        try:
+            arrays, manifest = load_artifact(cache_dir, mmap_mode='r' if mmap else None)
+        except ValueError:
+            arrays, manifest = None, None
+        if manifest is not None and manifest['metadata'].get('source') == signature:
+            columns = manifest['metadata']['columns']
+            return pd.DataFrame({name: arrays[f'ratings.{name}'] for name in columns}, copy=False)
+
+    columns = read_ratings_csv(path, chunksize)
+
+    if cache_dir is not None:
+        save_artifact(
+            cache_dir,
+            {f'ratings.{name}': values for name, values in columns.items()},
+            {'kind': 'ratings', 'source': signature, 'columns': list(columns)}
+        )
+
+    return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Deployment script for the async (ASGI) Movie Recommendation System API
+This script runs the Flask endpoints behind an ASGI server with a bounded worker pool
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+def check_dependencies():
+    """Check if the ASGI server is installed"""
+    try:
+        __import__('uvicorn')
+        print("✅ All required packages are installed!")
+    except ImportError:
+        print("❌ Missing package: uvicorn")
+        print("Installing missing packages...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "uvicorn"])
+        print("✅ All packages installed successfully!")
+
+def run_async_server(port=8000, host="localhost", executor="thread", workers=4,
+                     max_pending=64, timeout=10.0, model_path=None):
+    """Run the ASGI app with the specified configuration"""
+    os.environ["ASYNC_EXECUTOR"] = executor
+    os.environ["ASYNC_WORKERS"] = str(workers)
+    os.environ["ASYNC_MAX_PENDING"] = str(max_pending)
+    os.environ["ASYNC_TIMEOUT"] = str(timeout)
+    if model_path:
+        os.environ["MODEL_PATH"] = model_path
+    
+    print("🚀 Starting async API server...")
+    print(f"📍 URL: http://{host}:{port}")
+    print(f"⚙️  {workers} {executor} workers, {max_pending} queued requests, {timeout}s timeout")
+    print("🔄 Press Ctrl+C to stop the server")
+    print("-" * 50)
+    
+    try:
+        import uvicorn
+        uvicorn.run("asgi_app:app", host=host, port=port)
+    except KeyboardInterrupt:
+        print("\n🛑 Async server stopped by user")
+    except ImportError:
+        print("❌ uvicorn not found. Run with --check-deps to install it.")
+    except Exception as e:
+        print(f"❌ Error running async server: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Deploy the async Movie Recommendation System API")
+    parser.add_argument("--port", type=int, default=8000, help="Port to run the server on (default: 8000)")
+    parser.add_argument("--host", default="localhost", help="Host to run the server on (default: localhost)")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="Worker pool type; 'process' avoids the GIL (default: thread)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests (default: 4)")
+    parser.add_argument("--max-pending", type=int, default=64,
+                        help="Requests allowed to wait before answering 503 (default: 64)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds (default: 10)")
+    parser.add_argument("--model-path", help="Saved model to memory-map instead of fitting at startup")
+    parser.add_argument("--check-deps", action="store_true", help="Check and install dependencies")
+    
+    args = parser.parse_args()
+    
+    print("🎬 Movie Recommendation System - Async API Deployment")
+    print("=" * 60)
+    
+    if not os.path.exists("asgi_app.py"):
+        print("❌ asgi_app.py not found!")
+        print("Please make sure you're in the correct directory.")
+        return
+    
+    if args.executor == "process" and not (args.model_path or os.environ.get("MODEL_PATH")):
+        print("❌ The process executor needs a saved model, so workers do not each fit one.")
+        print("Build one with: python build_model.py --output models/latest")
+        print("Then pass: --model-path models/latest")
+        return
+    
+    if args.check_deps:
+        check_dependencies()
+    
+    run_async_server(args.port, args.host, args.executor, args.workers,
+                     args.max_pending, args.timeout, args.model_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Evaluate recommendation quality on a time-based split
+Trains on the older ratings and measures top-k quality on the newer ones
+"""
+
+import argparse
+import json
+
+import pandas as pd
+
+from data_loader import load_ratings
+from evaluation import evaluate_time_split
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the Movie Recommendation System offline")
+    parser.add_argument("--movies", default="data/movies.csv", help="Path to movies CSV file")
+    parser.add_argument("--ratings", default="data/ratings.csv", help="Path to ratings CSV file")
+    parser.add_argument("--cf-engine", nargs="+", default=["nmf"], choices=["nmf", "als", "implicit-als"],
+                        help="Collaborative filtering engine(s) to compare")
+    parser.add_argument("--test-fraction", type=float, default=0.2, help="Fraction of newest ratings held out")
+    parser.add_argument("--k", type=int, default=10, help="Length of the recommendation lists")
+    parser.add_argument("--relevance-threshold", type=float, default=4.0,
+                        help="Minimum held-out rating counted as relevant")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker threads for scoring")
+    parser.add_argument("--output", default=None, help="Write the reports as JSON to this file")
+    
+    args = parser.parse_args()
+    
+    movies_df = pd.read_csv(args.movies)
+    ratings_df = load_ratings(args.ratings)
+    
+    reports = {}
+    for engine in args.cf_engine:
+        print(f"📊 Evaluating {engine}...")
+        report = evaluate_time_split(
+            movies_df, ratings_df, test_fraction=args.test_fraction, k=args.k,
+            relevance_threshold=args.relevance_threshold, n_jobs=args.jobs, cf_engine=engine
+        )
+        reports[engine] = report
+        print(f"   trained on {report['train_ratings']:,} ratings in {report['train_seconds']:.1f}s, "
+              f"evaluated {report['users_evaluated']:,} users in {report['seconds']:.2f}s")
+        for metric in (f"precision@{args.k}", f"recall@{args.k}", f"ndcg@{args.k}", f"map@{args.k}", "coverage"):
+            print(f"   {metric:<14} {report[metric]:.4f}")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=2)
+        print(f"💾 Reports written to {args.output}")
+
+if __name__ == "__main__":
+    main()
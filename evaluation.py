@@ -0,0 +1,168 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from recommendation_system import MovieRecommendationSystem
+
+
+def time_split(ratings_df, test_fraction=0.2):
+    """
+    Split ratings at a global point in time
+
+    Every rating before the cutoff is used for training and every rating from
+    the cutoff on for testing, so the model never sees the future.
+
+    Args:
+        ratings_df (DataFrame): Ratings with a timestamp column
+        test_fraction (float): Approximate fraction of ratings in the test split
+
+    Returns:
+        tuple: (train_df, test_df, cutoff timestamp)
+    """
+    timestamps = ratings_df['timestamp'].to_numpy()
+    # The 'higher' quantile, without np.quantile's method argument (numpy>=1.22)
+    position = int(np.ceil((1.0 - test_fraction) * (len(timestamps) - 1)))
+    cutoff = np.partition(timestamps, position)[position]
+    in_test = timestamps >= cutoff
+    return ratings_df[~in_test], ratings_df[in_test], int(cutoff)
+
+
+def ranking_metrics(rec_ids, relevant_keys, n_relevant, user_rows, k):
+    """
+    Per-user ranking metrics of top-k lists, without per-user Python loops
+
+    Args:
+        rec_ids (ndarray): Recommended movie IDs (n_users x k), -1 for empty slots
+        relevant_keys (ndarray): Sorted user_row * key_base + movieId keys of relevant pairs
+        n_relevant (ndarray): Number of relevant movies per user
+        user_rows (ndarray): Row of each user in the key space
+        k (int): List length
+
+    Returns:
+        dict: precision, recall, ndcg and average_precision arrays per user
+    """
+    key_base = np.int64(1) << 32
+    keys = user_rows[:, None].astype(np.int64) * key_base + rec_ids.astype(np.int64)
+    found = np.searchsorted(relevant_keys, keys)
+    found = np.minimum(found, len(relevant_keys) - 1)
+    hits = (relevant_keys[found] == keys) & (rec_ids >= 0)
+
+    n_hits = hits.sum(axis=1)
+    ranks = np.arange(1, k + 1)
+    discounts = 1.0 / np.log2(ranks + 1)
+    ideal = np.cumsum(discounts)[np.minimum(n_relevant, k) - 1]
+
+    precision_at_rank = np.cumsum(hits, axis=1) / ranks
+    return {
+        'precision': n_hits / k,
+        'recall': n_hits / n_relevant,
+        'ndcg': (hits * discounts).sum(axis=1) / ideal,
+        'average_precision': (precision_at_rank * hits).sum(axis=1) / np.minimum(n_relevant, k)
+    }
+
+
+def evaluate(recommender, test_df, k=10, relevance_threshold=4.0, n_jobs=None, chunk_size=4096):
+    """
+    Measure top-k recommendation quality on held-out ratings
+
+    Only users known to the recommender with at least one relevant test
+    rating are evaluated. Their top-k lists come from recommend_batch(), which
+    scores a block of users with one matrix product; chunks of users are
+    scored and measured in parallel threads.
+
+    Args:
+        recommender (MovieRecommendationSystem): Model trained on the past
+        test_df (DataFrame): Held-out (future) ratings
+        k (int): Length of the recommendation lists
+        relevance_threshold (float): Minimum test rating counted as relevant
+            (None counts every test rating)
+        n_jobs (int): Worker threads (default: number of CPUs)
+        chunk_size (int): Users per parallel chunk
+
+    Returns:
+        dict: precision@k, recall@k, ndcg@k, map@k and coverage plus counts
+    """
+    relevant = test_df
+    if relevance_threshold is not None:
+        relevant = relevant[relevant['rating'] >= relevance_threshold]
+    relevant = relevant[relevant['userId'].isin(recommender.user_movie_matrix.index)]
+    relevant = relevant.drop_duplicates(['userId', 'movieId'])
+
+    user_ids, user_rows, n_relevant = np.unique(
+        relevant['userId'].to_numpy(), return_inverse=True, return_counts=True
+    )
+    key_base = np.int64(1) << 32
+    relevant_keys = np.sort(user_rows.astype(np.int64) * key_base + relevant['movieId'].to_numpy())
+
+    def evaluate_chunk(start):
+        stop = min(start + chunk_size, len(user_ids))
+        rec_ids, _ = recommender.recommend_batch(user_ids[start:stop], k)
+        # Pad when the catalogue has fewer than k movies
+        if rec_ids.shape[1] < k:
+            rec_ids = np.pad(rec_ids, ((0, 0), (0, k - rec_ids.shape[1])), constant_values=-1)
+        scores = ranking_metrics(rec_ids, relevant_keys, n_relevant[start:stop],
+                                 np.arange(start, stop), k)
+        return scores, np.unique(rec_ids[rec_ids >= 0])
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        results = list(pool.map(evaluate_chunk, range(0, len(user_ids), chunk_size)))
+    elapsed = time.perf_counter() - start_time
+
+    report = {
+        'k': k,
+        'users_evaluated': len(user_ids),
+        'relevant_ratings': len(relevant),
+        'seconds': elapsed
+    }
+    if not results:
+        report.update({f'{name}@{k}': 0.0 for name in ('precision', 'recall', 'ndcg', 'map')})
+        report['coverage'] = 0.0
+        return report
+
+    per_user = {name: np.concatenate([scores[name] for scores, _ in results])
+                for name in results[0][0]}
+    recommended = np.unique(np.concatenate([movies for _, movies in results]))
+
+    report[f'precision@{k}'] = float(per_user['precision'].mean())
+    report[f'recall@{k}'] = float(per_user['recall'].mean())
+    report[f'ndcg@{k}'] = float(per_user['ndcg'].mean())
+    report[f'map@{k}'] = float(per_user['average_precision'].mean())
+    report['coverage'] = len(recommended) / len(recommender.catalogue)
+    return report
+
+
+def evaluate_time_split(movies_df, ratings_df, test_fraction=0.2, k=10, relevance_threshold=4.0,
+                        n_jobs=None, chunk_size=4096, **model_params):
+    """
+    Train on the past and evaluate on the future
+
+    Args:
+        movies_df (DataFrame): Movie catalogue
+        ratings_df (DataFrame): All ratings, with a timestamp column
+        test_fraction (float): Approximate fraction of ratings held out
+        k (int): Length of the recommendation lists
+        relevance_threshold (float): Minimum test rating counted as relevant
+        n_jobs (int): Worker threads for scoring
+        chunk_size (int): Users per parallel chunk
+        **model_params: Passed to MovieRecommendationSystem.from_dataframes, e.g. cf_engine
+
+    Returns:
+        dict: Metrics from evaluate() plus split sizes and training time
+    """
+    train_df, test_df, cutoff = time_split(ratings_df, test_fraction)
+
+    start_time = time.perf_counter()
+    recommender = MovieRecommendationSystem.from_dataframes(movies_df, train_df, **model_params)
+    train_seconds = time.perf_counter() - start_time
+
+    report = evaluate(recommender, test_df, k, relevance_threshold, n_jobs, chunk_size)
+    report.update({
+        'cutoff_timestamp': cutoff,
+        'train_ratings': len(train_df),
+        'test_ratings': len(test_df),
+        'train_seconds': train_seconds
+    })
+    return report
@@ -0,0 +1,230 @@
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Histogram bucket upper bounds in seconds, from sub-millisecond lookups to model fits
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Metric name, label name and help text of each family
+FAMILIES = {
+    'stage': ('movierec_stage_duration_seconds', 'stage',
+              'Time spent in each recommender stage'),
+    'endpoint': ('movierec_request_duration_seconds', 'endpoint',
+                 'HTTP request latency per endpoint')
+}
+
+
+class Histogram:
+    """Latency histogram; counts are kept per bucket and made cumulative on export"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # One extra slot for values above the largest bound
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Record one duration in seconds"""
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self):
+        """Number of observations <= each bucket bound"""
+        counts = []
+        total = 0
+        for count in self.bucket_counts[:-1]:
+            total += count
+            counts.append(total)
+        return counts
+
+
+class _StageTimer:
+    """Context manager that records its duration on exit"""
+
+    __slots__ = ('metrics', 'family', 'name', 'start')
+
+    def __init__(self, metrics, family, name):
+        self.metrics = metrics
+        self.family = family
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.family, self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    """Shared no-op context manager used while metrics are disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Registry of per-stage and per-endpoint latency histograms, plus gauges
+
+    While disabled, stage() hands out a shared no-op context manager and
+    timed() calls straight through, so instrumented code pays one attribute
+    check per stage.
+    """
+
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the registry
+
+        Args:
+            enabled (bool): Record durations from the start
+            buckets (tuple): Histogram bucket upper bounds in seconds
+        """
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms = {family: {} for family in FAMILIES}
+        # Gauges describe state rather than latency, so they are set even while disabled
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """Start recording durations"""
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording durations"""
+        self.enabled = False
+
+    def stage(self, name):
+        """
+        Time a block of code
+
+        Args:
+            name (str): Stage name
+
+        Returns:
+            Context manager recording the block's duration
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, 'stage', name)
+
+    def observe(self, family, name, seconds):
+        """
+        Record one duration
+
+        Args:
+            family (str): 'stage' or 'endpoint'
+            name (str): Stage or endpoint name
+            seconds (float): Duration
+        """
+        with self._lock:
+            histogram = self._histograms[family].get(name)
+            if histogram is None:
+                histogram = self._histograms[family][name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def set_gauge(self, name, value, help_text, labels=None):
+        """
+        Set a gauge, replacing its previous value and labels
+
+        Args:
+            name (str): Metric name
+            value (float): Current value
+            help_text (str): Description for the exposition
+            labels (dict): Optional label values, e.g. {'version': ...}
+        """
+        with self._lock:
+            self._gauges[name] = (value, help_text, dict(labels or {}))
+
+    def summary(self, family='stage'):
+        """
+        Get call counts and total durations
+
+        Args:
+            family (str): 'stage' or 'endpoint'
+
+        Returns:
+            dict: {name: {'count', 'total_seconds', 'mean_seconds'}}
+        """
+        with self._lock:
+            return {
+                name: {
+                    'count': histogram.count,
+                    'total_seconds': histogram.sum,
+                    'mean_seconds': histogram.sum / histogram.count if histogram.count else 0.0
+                }
+                for name, histogram in sorted(self._histograms[family].items())
+            }
+
+    def reset(self):
+        """Drop every recorded duration"""
+        with self._lock:
+            self._histograms = {family: {} for family in FAMILIES}
+
+    def render_prometheus(self):
+        """
+        Render every histogram in the Prometheus text exposition format
+
+        Returns:
+            str: The exposition text
+        """
+        lines = []
+        with self._lock:
+            for family, (metric, label, help_text) in FAMILIES.items():
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} histogram')
+                for name, histogram in sorted(self._histograms[family].items()):
+                    value = _escape_label(name)
+                    for bound, count in zip(histogram.buckets, histogram.cumulative_counts()):
+                        lines.append(f'{metric}_bucket{{{label}="{value}",le="{bound}"}} {count}')
+                    lines.append(f'{metric}_bucket{{{label}="{value}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{metric}_sum{{{label}="{value}"}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{{label}="{value}"}} {histogram.count}')
+            for name, (value, help_text, labels) in sorted(self._gauges.items()):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} gauge')
+                label_text = ','.join(f'{key}="{_escape_label(text)}"' for key, text in labels.items())
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value):
+    """Escape a label value for the exposition format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Process-wide registry; set METRICS_ENABLED=1 or call metrics.enable() to record
+metrics = Metrics(enabled=os.environ.get('METRICS_ENABLED', '0') == '1')
+
+
+def timed(name):
+    """
+    Decorator recording every call of a function as a stage
+
+    Args:
+        name (str): Stage name
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            with _StageTimer(metrics, 'stage', name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,222 @@
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+ARTIFACT_FORMAT = 'movie-recommendation-system'
+ARTIFACT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+
+def encode_strings(values):
+    """
+    Pack strings into a UTF-8 byte blob plus offsets (no pickling needed)
+
+    Args:
+        values (array-like): Strings to pack
+
+    Returns:
+        tuple: (offsets, blob) where string i is blob[offsets[i]:offsets[i + 1]]
+    """
+    encoded = [str(value).encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+def decode_strings(offsets, blob):
+    """
+    Unpack strings packed with encode_strings
+
+    Args:
+        offsets (ndarray): String boundaries
+        blob (ndarray): UTF-8 bytes
+
+    Returns:
+        ndarray: Object array of strings
+    """
+    data = np.asarray(blob).tobytes()
+    offsets = np.asarray(offsets).tolist()
+    return np.array(
+        [data[start:stop].decode('utf-8') for start, stop in zip(offsets[:-1], offsets[1:])],
+        dtype=object
+    )
+
+
+def frame_to_arrays(df, prefix):
+    """
+    Convert a DataFrame into named column arrays
+
+    Args:
+        df (DataFrame): Frame to convert
+        prefix (str): Name prefix for the arrays
+
+    Returns:
+        tuple: (arrays, columns) where columns records each column's kind
+    """
+    arrays = {}
+    columns = []
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values):
+            arrays[f'{prefix}.{column}'] = values.to_numpy()
+            columns.append({'name': column, 'kind': 'numeric'})
+        else:
+            offsets, blob = encode_strings(values.fillna(''))
+            arrays[f'{prefix}.{column}.offsets'] = offsets
+            arrays[f'{prefix}.{column}.bytes'] = blob
+            columns.append({'name': column, 'kind': 'string'})
+    return arrays, columns
+
+
+def arrays_to_frame(arrays, prefix, columns):
+    """
+    Rebuild a DataFrame converted with frame_to_arrays
+
+    Args:
+        arrays (dict): Loaded arrays
+        prefix (str): Name prefix used when saving
+        columns (list): Column descriptions from the manifest
+
+    Returns:
+        DataFrame: The rebuilt frame
+    """
+    data = {}
+    for column in columns:
+        name = column['name']
+        if column['kind'] == 'numeric':
+            data[name] = arrays[f'{prefix}.{name}']
+        else:
+            data[name] = decode_strings(arrays[f'{prefix}.{name}.offsets'],
+                                        arrays[f'{prefix}.{name}.bytes'])
+    return pd.DataFrame(data, copy=False)
+
+
+def csr_to_arrays(matrix, prefix):
+    """
+    Split a CSR matrix into named arrays
+
+    Args:
+        matrix (csr_matrix): Matrix to split
+        prefix (str): Name prefix for the arrays
+
+    Returns:
+        dict: data, indices, indptr and shape arrays
+    """
+    return {
+        f'{prefix}.data': matrix.data,
+        f'{prefix}.indices': matrix.indices,
+        f'{prefix}.indptr': matrix.indptr,
+        f'{prefix}.shape': np.asarray(matrix.shape, dtype=np.int64)
+    }
+
+
+def arrays_to_csr(arrays, prefix):
+    """
+    Rebuild a CSR matrix split with csr_to_arrays
+
+    Args:
+        arrays (dict): Loaded arrays
+        prefix (str): Name prefix used when saving
+
+    Returns:
+        csr_matrix: The rebuilt matrix (sharing the loaded buffers)
+    """
+    return csr_matrix(
+        (arrays[f'{prefix}.data'], arrays[f'{prefix}.indices'], arrays[f'{prefix}.indptr']),
+        shape=tuple(int(n) for n in arrays[f'{prefix}.shape']),
+        copy=False
+    )
+
+
+def save_artifact(path, arrays, metadata=None):
+    """
+    Write arrays and a manifest into a versioned artifact directory
+
+    Every array is stored as its own .npy file so it can be memory-mapped on
+    load. The directory is written next to the target and renamed into place,
+    so readers never see a half-written artifact. An existing directory is
+    only replaced if it is empty or itself an artifact.
+
+    Args:
+        path (str): Artifact directory
+        arrays (dict): Arrays to store, keyed by name
+        metadata (dict): Extra JSON-serialisable information for the manifest
+
+    Returns:
+        dict: The written manifest
+    """
+    path = os.path.abspath(path)
+    if os.path.isdir(path) and os.listdir(path) and not os.path.exists(os.path.join(path, MANIFEST_NAME)):
+        raise ValueError(f"Refusing to replace '{path}': it is not empty and not a model artifact")
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'version': ARTIFACT_VERSION,
+        'created_at': time.time(),
+        'arrays': {},
+        'metadata': metadata or {}
+    }
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype == object:
+            raise TypeError(f"Array '{name}' has object dtype and cannot be stored")
+        filename = f'{name}.npy'
+        np.save(os.path.join(tmp_path, filename), array, allow_pickle=False)
+        manifest['arrays'][name] = {
+            'file': filename,
+            'dtype': array.dtype.str,
+            'shape': list(array.shape)
+        }
+
+    with open(os.path.join(tmp_path, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the finished directory into place
+    old_path = None
+    if os.path.exists(path):
+        old_path = f'{path}.old-{os.getpid()}'
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if old_path is not None:
+        shutil.rmtree(old_path)
+
+    return manifest
+
+
+def load_artifact(path, mmap_mode=None):
+    """
+    Read an artifact directory written by save_artifact
+
+    Args:
+        path (str): Artifact directory
+        mmap_mode (str): Passed to np.load; 'r' memory-maps arrays read-only
+
+    Returns:
+        tuple: (arrays, manifest)
+    """
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"{path} is not a movie recommendation model artifact")
+    if manifest.get('version') != ARTIFACT_VERSION:
+        raise ValueError(
+            f"Unsupported model artifact version {manifest.get('version')} "
+            f"(expected {ARTIFACT_VERSION})"
+        )
+
+    arrays = {}
+    for name, info in manifest['arrays'].items():
+        arrays[name] = np.load(os.path.join(path, info['file']), mmap_mode=mmap_mode,
+                               allow_pickle=False)
+    return arrays, manifest
@@ -0,0 +1,307 @@
+"""
+Background retraining with an atomic model swap
+
+A ModelRefresher owns the model that serves requests. When the data files
+change (or a retrain is requested) it builds a complete new model next to
+the serving one and then replaces the reference in a single assignment, so a
+request that already took the old model finishes on it undisturbed and the
+old model is freed once the last such request is done.
+
+Builds are throttled: at most one per min_interval, and by default they run
+in a separate build_model.py process with a lower CPU priority and capped
+BLAS threads, so request threads keep the CPU (and the GIL) while it fits.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from instrumentation import metrics
+from recommendation_system import MovieRecommendationSystem, ModelNotReadyError
+
+BUILD_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build_model.py')
+
+# Thread-count variables of the BLAS/OpenMP libraries, capped in the build process
+BLAS_THREAD_VARIABLES = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+def _file_signature(path):
+    """Size and modification time of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class ModelRefresher:
+    """Serving model plus a scheduler that rebuilds and swaps it in the background"""
+
+    def __init__(self, model, movies_path='data/movies.csv', ratings_path='data/ratings.csv',
+                 ratings_cache=None, cf_engine='nmf', mode='process', check_interval=60.0,
+                 min_interval=600.0, niceness=10, build_threads=1, work_dir=None):
+        """
+        Initialize the refresher
+
+        Args:
+            model (MovieRecommendationSystem): Model to serve until the first swap
+                (may still be building in the background)
+            movies_path (str): Movies CSV the model is rebuilt from
+            ratings_path (str): Ratings CSV the model is rebuilt from
+            ratings_cache (str): Columnar ratings cache directory for rebuilds
+            cf_engine (str): Collaborative filtering engine name for rebuilds
+            mode (str): 'process' builds in a separate build_model.py process;
+                'thread' builds in the scheduler thread (shares the GIL)
+            check_interval (float): Seconds between checks of the data files
+            min_interval (float): Minimum seconds between the starts of two builds
+            niceness (int): CPU priority decrease of the build (POSIX; in
+                thread mode Linux only); 0 keeps the normal priority
+            build_threads (int): BLAS threads of the build process (None: no cap)
+            work_dir (str): Where the build process writes its artifact
+                (default: the system temporary directory)
+        """
+        if mode not in ('process', 'thread'):
+            raise ValueError("mode must be 'process' or 'thread'")
+        self.movies_path = movies_path
+        self.ratings_path = ratings_path
+        self.ratings_cache = ratings_cache
+        self.cf_engine = cf_engine
+        self.mode = mode
+        self.check_interval = check_interval
+        self.min_interval = min_interval
+        self.niceness = niceness
+        self.build_threads = build_threads
+        self.work_dir = work_dir
+
+        # Model and its build info are swapped together as one tuple
+        self._active = (model, self._describe(model, build_seconds=None, generation=0))
+        self._sources = self._source_signature()
+        self._build_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._retrain_requested = False
+        self.last_build_started = None
+        self.last_error = None
+        self.builds = 0
+        self.failed_builds = 0
+
+    @property
+    def current(self):
+        """The model serving requests right now"""
+        return self._active[0]
+
+    @property
+    def running(self):
+        """Whether the scheduler thread is running"""
+        return self._thread is not None
+
+    def snapshot(self):
+        """
+        Get the serving model and its build info as one consistent pair
+
+        Returns:
+            tuple: (model, info) with built_at, build_seconds and generation
+        """
+        return self._active
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='model-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the scheduler thread; a build in progress runs to completion first"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def request_retrain(self):
+        """
+        Ask the scheduler to rebuild at the next opportunity, data changed or not
+
+        Returns:
+            float: Earliest time (epoch seconds) the build can start
+        """
+        self._retrain_requested = True
+        self._wake.set()
+        return self._next_allowed_build() or time.time()
+
+    def retrain_now(self):
+        """
+        Build a new model and swap it in, in the calling thread
+
+        Returns:
+            MovieRecommendationSystem: The new serving model
+
+        Raises:
+            Exception: Whatever the build raised; the old model keeps serving
+        """
+        with self._build_lock:
+            self._retrain_requested = False
+            self.last_build_started = time.time()
+            sources = self._source_signature()
+            start = time.perf_counter()
+            try:
+                with metrics.stage('retrain'):
+                    if self.mode == 'process':
+                        model = self._build_in_process()
+                    else:
+                        model = self._build_in_thread()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                self.failed_builds += 1
+                raise
+
+            build_seconds = time.perf_counter() - start
+            generation = self._active[1]['generation'] + 1
+            self._active = (model, self._describe(model, build_seconds, generation))
+            self._sources = sources
+            self.last_error = None
+            self.builds += 1
+            self._publish_metrics()
+            return model
+
+    def status(self):
+        """
+        Report the serving model and the scheduler state
+
+        Returns:
+            dict: Model version and build info plus scheduler settings and counters
+        """
+        model, info = self._active
+        return {
+            'version': model.model_version,
+            **info,
+            'scheduler_running': self.running,
+            'mode': self.mode,
+            'retrain_requested': self._retrain_requested,
+            'last_build_started': self.last_build_started,
+            'next_build_allowed': self._next_allowed_build(),
+            'builds': self.builds,
+            'failed_builds': self.failed_builds,
+            'last_error': self.last_error
+        }
+
+    def _run(self):
+        """Scheduler loop: rebuild when due, sleeping check_interval in between"""
+        if self.mode == 'thread':
+            self._lower_thread_priority()
+
+        # Report the startup model once it is built
+        model, info = self._active
+        try:
+            model.wait_until_ready()
+            self._active = (model, self._describe(model, info['build_seconds'], info['generation']))
+            self._publish_metrics()
+        except ModelNotReadyError as e:
+            self.last_error = str(e)
+
+        while not self._stop.is_set():
+            if self._due():
+                try:
+                    self.retrain_now()
+                except Exception as e:
+                    print(f"Model retraining failed: {e}")
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
+
+    def _due(self):
+        """Whether a build is wanted and the throttle allows one now"""
+        not_before = self._next_allowed_build()
+        if not_before is not None and time.time() < not_before:
+            return False
+        return (self._retrain_requested
+                or self._source_signature() != self._sources
+                or self.current.init_error is not None)
+
+    def _next_allowed_build(self):
+        """Earliest start time of the next build under min_interval (None: any time)"""
+        if self.last_build_started is None:
+            return None
+        return self.last_build_started + self.min_interval
+
+    def _source_signature(self):
+        """Signatures of the data files, compared to detect new data"""
+        return _file_signature(self.movies_path), _file_signature(self.ratings_path)
+
+    def _build_in_thread(self):
+        """Fit a new model in this thread"""
+        return MovieRecommendationSystem(self.movies_path, self.ratings_path,
+                                         ratings_cache=self.ratings_cache,
+                                         cf_engine=self.cf_engine)
+
+    def _build_in_process(self):
+        """Fit a new model with build_model.py in a low-priority process and load its artifact"""
+        output_dir = tempfile.mkdtemp(prefix='movierec-retrain-', dir=self.work_dir)
+        try:
+            artifact = os.path.join(output_dir, 'model')
+            command = [sys.executable, BUILD_SCRIPT,
+                       '--movies', os.path.abspath(self.movies_path),
+                       '--ratings', os.path.abspath(self.ratings_path),
+                       '--cf-engine', self.cf_engine,
+                       '--output', artifact]
+            if self.ratings_cache:
+                command += ['--ratings-cache', os.path.abspath(self.ratings_cache)]
+            # The build lowers its own priority; preexec_fn is unsafe in a threaded server
+            if self.niceness:
+                command += ['--niceness', str(self.niceness)]
+
+            env = dict(os.environ)
+            if self.build_threads:
+                env.update({name: str(self.build_threads) for name in BLAS_THREAD_VARIABLES})
+
+            result = subprocess.run(command, env=env, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE, text=True)
+            if result.returncode != 0:
+                raise RuntimeError(f"build_model.py exited with {result.returncode}: "
+                                   f"{result.stderr.strip()[-2000:]}")
+
+            # Read into memory, so the artifact can be removed right away
+            return MovieRecommendationSystem.load(artifact)
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    def _lower_thread_priority(self):
+        """Lower the CPU priority of the calling thread (Linux schedules threads individually)"""
+        if not self.niceness or not sys.platform.startswith('linux'):
+            return
+        try:
+            thread_id = threading.get_native_id()
+            os.setpriority(os.PRIO_PROCESS, thread_id,
+                           os.getpriority(os.PRIO_PROCESS, thread_id) + self.niceness)
+        except (AttributeError, OSError):
+            pass
+
+    @staticmethod
+    def _describe(model, build_seconds, generation):
+        """Build info of a model; built_at is known once its CF model is fitted"""
+        fit_stats = getattr(model, 'fit_stats', None)
+        return {
+            'built_at': fit_stats['fitted_at'] if fit_stats else None,
+            'build_seconds': build_seconds,
+            'generation': generation
+        }
+
+    def _publish_metrics(self):
+        """Expose the serving model's version and build info as gauges"""
+        model, info = self._active
+        metrics.set_gauge('movierec_model_info', 1, 'Version of the serving model',
+                          {'version': model.model_version})
+        metrics.set_gauge('movierec_model_generation', info['generation'],
+                          'Number of model swaps since startup')
+        if info['built_at'] is not None:
+            metrics.set_gauge('movierec_model_built_timestamp_seconds', info['built_at'],
+                              'Time the serving model was fitted')
+        if info['build_seconds'] is not None:
+            metrics.set_gauge('movierec_model_build_duration_seconds', info['build_seconds'],
+                              'Duration of the last model rebuild')
@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+
+
+class MovieCatalogue:
+    """
+    Columnar movie catalogue with O(1) id lookup
+
+    Titles, genres and years are stored as arrays aligned with catalogue
+    positions, and a hash index maps movie IDs to positions. Response dicts
+    for a whole result list are built with a single fancy-indexing pass per
+    column instead of one DataFrame scan per movie.
+
+    Genre strings are parsed once into a bitmask per movie (bit i set for
+    genre_vocabulary[i]; one uint64 word per 64 genres), so genre and year
+    filters are a few array operations over the whole catalogue.
+    """
+
+    def __init__(self, movies_df):
+        """
+        Build the catalogue from a movies DataFrame
+
+        Args:
+            movies_df (DataFrame): Movies with movieId, title, genres and year columns
+        """
+        self.movie_ids = movies_df['movieId'].to_numpy()
+        self.columns = {
+            'movieId': self.movie_ids,
+            'title': movies_df['title'].to_numpy(dtype=object),
+            'genres': movies_df['genres'].fillna('').to_numpy(dtype=object),
+            'year': movies_df['year'].to_numpy()
+        }
+        self.titles = self.columns['title']
+        self.genres = self.columns['genres']
+        self.years = self.columns['year']
+
+        # movieId -> catalogue position
+        self.id_index = pd.Index(self.movie_ids)
+        self.positions_by_id = {movie_id: pos for pos, movie_id in enumerate(self.movie_ids.tolist())}
+
+        self._index_genres()
+
+    def _index_genres(self):
+        """Build the genre vocabulary, per-movie genre bitmasks and genre counts"""
+        # A catalogue has far fewer genre combinations than movies, so each is split once
+        combinations, inverse, combination_counts = np.unique(
+            self.genres.astype(str), return_inverse=True, return_counts=True
+        )
+        split = [[genre for genre in combination.split('|') if genre] for combination in combinations]
+        self.genre_vocabulary = tuple(sorted({genre for genres in split for genre in genres}))
+        self.genre_bits = {genre: bit for bit, genre in enumerate(self.genre_vocabulary)}
+
+        n_words = max(1, -(-len(self.genre_vocabulary) // 64))
+        combination_masks = np.zeros((len(combinations), n_words), dtype=np.uint64)
+        combination_genres = np.zeros((len(combinations), len(self.genre_vocabulary)), dtype=bool)
+        for row, genres in enumerate(split):
+            for genre in genres:
+                bit = self.genre_bits[genre]
+                combination_masks[row, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+                combination_genres[row, bit] = True
+
+        self.genre_masks = combination_masks[inverse.ravel()]
+        self.genre_counts = combination_counts @ combination_genres
+
+    def genre_mask(self, genres):
+        """
+        Get the bitmask of a set of genres
+
+        Args:
+            genres (iterable): Genre names; names not in the vocabulary are ignored
+
+        Returns:
+            tuple: (mask words, whether every genre is in the vocabulary)
+        """
+        mask = np.zeros(self.genre_masks.shape[1], dtype=np.uint64)
+        all_known = True
+        for genre in genres:
+            bit = self.genre_bits.get(genre)
+            if bit is None:
+                all_known = False
+                continue
+            mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        return mask, all_known
+
+    def filter_positions(self, any_genres=None, all_genres=None, year_min=None, year_max=None):
+        """
+        Find movies by genre and release year
+
+        Args:
+            any_genres (iterable): Keep movies with at least one of these genres
+            all_genres (iterable): Keep movies with every one of these genres
+            year_min (int): Keep movies released in or after this year
+            year_max (int): Keep movies released in or before this year
+
+        Returns:
+            ndarray: Catalogue positions of the matching movies, ascending
+        """
+        keep = np.ones(len(self), dtype=bool)
+        if any_genres is not None:
+            mask, _ = self.genre_mask(any_genres)
+            keep &= (self.genre_masks & mask).any(axis=1)
+        if all_genres is not None:
+            mask, all_known = self.genre_mask(all_genres)
+            if not all_known:
+                return np.empty(0, dtype=np.intp)
+            keep &= ((self.genre_masks & mask) == mask).all(axis=1)
+        # Movies without a year never match a year bound
+        if year_min is not None:
+            keep &= self.years >= year_min
+        if year_max is not None:
+            keep &= self.years <= year_max
+        return np.flatnonzero(keep)
+
+    def counts_by_genre(self):
+        """
+        Number of movies per genre
+
+        Returns:
+            dict: Genre -> movie count, most common genre first
+        """
+        order = np.argsort(-self.genre_counts, kind='stable')
+        return {self.genre_vocabulary[i]: int(self.genre_counts[i]) for i in order}
+
+    def __len__(self):
+        return len(self.movie_ids)
+
+    def __contains__(self, movie_id):
+        return movie_id in self.positions_by_id
+
+    def position(self, movie_id):
+        """
+        Get the catalogue position of a movie
+
+        Args:
+            movie_id (int): Movie ID
+
+        Returns:
+            int: Catalogue position, or None if the movie is unknown
+        """
+        return self.positions_by_id.get(movie_id)
+
+    def positions(self, movie_ids):
+        """
+        Get catalogue positions for many movies at once
+
+        Args:
+            movie_ids (array-like): Movie IDs
+
+        Returns:
+            ndarray: Catalogue positions, -1 for unknown movies
+        """
+        return self.id_index.get_indexer(np.asarray(movie_ids))
+
+    def get(self, movie_id, fields=('title', 'genres', 'year')):
+        """
+        Get a single movie as a response dict
+
+        Args:
+            movie_id (int): Movie ID
+            fields (tuple): Catalogue columns to include besides movieId
+
+        Returns:
+            dict: Movie information, or None if the movie is unknown
+        """
+        movies = self.hydrate([movie_id], fields)
+        return movies[0] if movies else None
+
+    def hydrate(self, movie_ids, fields=('title', 'genres'), **extra):
+        """
+        Build response dicts for a list of movies
+
+        Args:
+            movie_ids (array-like): Movie IDs in result order
+            fields (tuple): Catalogue columns to include besides movieId
+            **extra: Additional per-movie columns (e.g. scores) aligned with movie_ids
+
+        Returns:
+            list: List of movie dicts; unknown movie IDs are skipped
+        """
+        positions = self.positions(movie_ids)
+        known = positions >= 0
+        if not known.all():
+            extra = {name: np.asarray(values)[known] for name, values in extra.items()}
+        return self.hydrate_positions(positions[known], fields, **extra)
+
+    def hydrate_positions(self, positions, fields=('title', 'genres'), **extra):
+        """
+        Build response dicts for movies given by catalogue position
+
+        Args:
+            positions (array-like): Catalogue positions in result order
+            fields (tuple): Catalogue columns to include besides movieId
+            **extra: Additional per-movie columns (e.g. scores) aligned with positions
+
+        Returns:
+            list: List of movie dicts
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        columns = {'movieId': self.movie_ids[positions].tolist()}
+        for field in fields:
+            columns[field] = self.columns[field][positions].tolist()
+        for name, values in extra.items():
+            columns[name] = np.asarray(values).tolist()
+
+        keys = list(columns)
+        return [dict(zip(keys, row)) for row in zip(*columns.values())]
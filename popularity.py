@@ -0,0 +1,123 @@
+import numpy as np
+
+
+class PopularityStats:
+    """
+    Per-movie rating aggregates with ranked orders
+
+    Rating counts and sums are kept in arrays aligned with catalogue
+    positions. They are computed once from the ratings and then updated in
+    O(batch) as ratings arrive. Ranked orders are cached and only recomputed
+    after an update, so a top-N query is an array slice.
+    """
+
+    def __init__(self, n_movies):
+        """
+        Create empty aggregates
+
+        Args:
+            n_movies (int): Number of movies in the catalogue
+        """
+        self.rating_count = np.zeros(n_movies, dtype=np.int64)
+        self.rating_sum = np.zeros(n_movies, dtype=np.float64)
+        self._orders = {}
+
+    @classmethod
+    def from_positions(cls, n_movies, positions, ratings):
+        """
+        Aggregate ratings given by catalogue position
+
+        Args:
+            n_movies (int): Number of movies in the catalogue
+            positions (ndarray): Catalogue position of every rating (-1 for unknown movies)
+            ratings (ndarray): Rating values
+
+        Returns:
+            PopularityStats: The aggregates
+        """
+        stats = cls(n_movies)
+        known = positions >= 0
+        stats.rating_count = np.bincount(positions[known], minlength=n_movies).astype(np.int64)
+        stats.rating_sum = np.bincount(positions[known], weights=ratings[known], minlength=n_movies)
+        return stats
+
+    def update(self, positions, count_deltas, sum_deltas):
+        """
+        Apply a batch of changes
+
+        Args:
+            positions (ndarray): Catalogue positions of the affected movies (-1 is ignored)
+            count_deltas (ndarray): Change in number of ratings per entry
+            sum_deltas (ndarray): Change in sum of ratings per entry
+        """
+        known = positions >= 0
+        np.add.at(self.rating_count, positions[known], np.asarray(count_deltas)[known])
+        np.add.at(self.rating_sum, positions[known], np.asarray(sum_deltas)[known])
+        self._orders.clear()
+
+    @property
+    def rating_mean(self):
+        """Average rating per movie (0 for unrated movies)"""
+        return np.divide(self.rating_sum, self.rating_count,
+                         out=np.zeros_like(self.rating_sum), where=self.rating_count > 0)
+
+    def bayesian_average(self, prior_weight=None, positions=None):
+        """
+        Average rating shrunk towards the global mean
+
+        score = (C * m + sum) / (C + count), where m is the global mean rating
+        and C the prior weight, so movies with few ratings cannot outrank
+        well-established ones on a handful of votes.
+
+        Args:
+            prior_weight (float): C; defaults to the mean count of rated movies
+            positions (ndarray): Only compute the scores of these movies
+
+        Returns:
+            ndarray: Bayesian average per movie
+        """
+        rated = self.rating_count > 0
+        total = self.rating_count.sum()
+        global_mean = self.rating_sum.sum() / total if total else 0.0
+        if prior_weight is None:
+            prior_weight = self.rating_count[rated].mean() if rated.any() else 1.0
+
+        counts, sums = self.rating_count, self.rating_sum
+        if positions is not None:
+            counts, sums = counts[positions], sums[positions]
+        return (prior_weight * global_mean + sums) / (prior_weight + counts)
+
+    def ranked(self, by='count'):
+        """
+        Rated movies ordered best first, ties broken by catalogue position
+
+        Args:
+            by (str): 'count' for number of ratings, 'bayesian' for Bayesian average
+
+        Returns:
+            ndarray: Catalogue positions
+        """
+        if by not in self._orders:
+            if by == 'count':
+                scores = self.rating_count
+            elif by == 'bayesian':
+                scores = self.bayesian_average()
+            else:
+                raise ValueError(f"Unknown popularity ranking '{by}'")
+
+            rated = np.flatnonzero(self.rating_count > 0)
+            self._orders[by] = rated[np.lexsort((rated, -scores[rated]))]
+        return self._orders[by]
+
+    def top(self, n, by='count'):
+        """
+        Get the n most popular movies
+
+        Args:
+            n (int): Number of movies
+            by (str): Ranking criterion, see ranked()
+
+        Returns:
+            ndarray: Catalogue positions
+        """
+        return self.ranked(by)[:n]
@@ -66,6 +66,16 @@ def run_streamlit():
         subprocess.run([sys.executable, "-m", "pip", "install", "streamlit"])
         print("✅ Streamlit installed! Please run the script again.")
 
+def run_async_api():
+    """Run the async (ASGI) API server"""
+    print("⚡ Starting Async API Server...")
+    print("-" * 50)
+    
+    try:
+        subprocess.run([sys.executable, "deploy_async.py"])
+    except KeyboardInterrupt:
+        print("\n🛑 Async API server stopped")
+
 def run_demo():
     """Run the demo script"""
     print("🎯 Running Demo Script...")
@@ -87,13 +97,14 @@ def main():
     print("\n🚀 Choose an option:")
     print("1. 🌐 Flask Web App (Traditional web interface)")
     print("2. 📱 Streamlit App (Modern interactive interface)")
-    print("3. 🎯 Run Demo (Command line demo)")
-    print("4. 📊 View Project Info")
-    print("5. ❌ Exit")
+    print("3. ⚡ Async API Server (ASGI, bounded worker pool)")
+    print("4. 🎯 Run Demo (Command line demo)")
+    print("5. 📊 View Project Info")
+    print("6. ❌ Exit")
     
     while True:
         try:
-            choice = input("\nEnter your choice (1-5): ").strip()
+            choice = input("\nEnter your choice (1-6): ").strip()
             
             if choice == "1":
                 run_flask()
@@ -102,15 +113,18 @@ def main():
                 run_streamlit()
                 break
             elif choice == "3":
-                run_demo()
+                run_async_api()
                 break
             elif choice == "4":
-                show_project_info()
+                run_demo()
+                break
             elif choice == "5":
+                show_project_info()
+            elif choice == "6":
                 print("👋 Goodbye!")
                 break
             else:
-                print("❌ Invalid choice. Please enter 1-5.")
+                print("❌ Invalid choice. Please enter 1-6.")
                 
         except KeyboardInterrupt:
             print("\n👋 Goodbye!")
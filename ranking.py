@@ -0,0 +1,55 @@
+import numpy as np
+
+
+def top_k(scores, k):
+    """
+    Get the positions of the k largest scores without a full sort
+
+    Uses argpartition to pick the candidates in O(N) and only sorts those k.
+    Works on 1-D score vectors and on 2-D blocks (one row per query).
+
+    Args:
+        scores (ndarray): Scores along the last axis
+        k (int): Number of positions to return
+
+    Returns:
+        ndarray: Positions of the top scores, best first, ties broken by position
+    """
+    scores = np.asarray(scores)
+    n = scores.shape[-1]
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+
+    if k < n:
+        rows = scores.reshape(-1, n)
+        # Partition at the (k+1)-th largest so the best score left out is known
+        partition = np.argpartition(rows, n - k - 1, axis=-1)
+        top = partition[:, n - k:]
+
+        # argpartition keeps an arbitrary subset of the scores tied with the
+        # k-th largest; only where the best score left out equals the cut
+        # does a tie cross it, and there the first tied positions are kept
+        top_scores = np.take_along_axis(rows, top, axis=-1)
+        cut = top_scores.min(axis=-1, keepdims=True)
+        left_out = np.take_along_axis(rows, partition[:, n - k - 1:n - k], axis=-1)
+        tied_rows = np.flatnonzero(left_out == cut)
+        if len(tied_rows):
+            block_top, block_cut = top[tied_rows], cut[tied_rows]
+            slots = top_scores[tied_rows] == block_cut
+            n_slots = slots.sum(axis=-1)
+            tied_row, tied_col = np.nonzero(rows[tied_rows] == block_cut)
+            first_tied = np.searchsorted(tied_row, np.arange(len(tied_rows)))
+            # The first n_slots tied columns of every row, in row order
+            fill = np.arange(n_slots.sum()) + np.repeat(first_tied - (np.cumsum(n_slots) - n_slots), n_slots)
+            block_top[slots] = tied_col[fill]
+            top[tied_rows] = block_top
+
+        top = np.sort(top, axis=-1).reshape(scores.shape[:-1] + (k,))
+    else:
+        top = np.broadcast_to(np.arange(n), scores.shape).copy()
+
+    # Order the candidates by score; the stable sort keeps ties in position order
+    top_scores = np.take_along_axis(scores, top, axis=-1)
+    order = np.argsort(-top_scores, axis=-1, kind='stable')
+    return np.take_along_axis(top, order, axis=-1)
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+
+class RatingMatrix:
+    """
+    Sparse user-movie rating matrix
+
+    The CSR matrix is built straight from the userId/movieId/rating columns,
+    so no dense users x movies intermediate is ever created. `index` (users)
+    and `columns` (movies) mirror the row/column labels of the old pivot
+    table and map IDs to matrix positions.
+    """
+
+    def __init__(self, matrix, user_ids, movie_ids):
+        """
+        Wrap an existing CSR matrix
+
+        Args:
+            matrix (csr_matrix): users x movies rating matrix
+            user_ids (array-like): User ID of every row
+            movie_ids (array-like): Movie ID of every column
+        """
+        self.matrix = matrix
+        self.index = pd.Index(user_ids, name='userId')
+        self.columns = pd.Index(movie_ids, name='movieId')
+
+    @classmethod
+    def from_ratings(cls, ratings_df, dtype=np.float32):
+        """
+        Build the matrix from a ratings DataFrame
+
+        Args:
+            ratings_df (DataFrame): Ratings with userId, movieId and rating columns
+            dtype: Value dtype of the sparse matrix
+
+        Returns:
+            RatingMatrix: The user-movie rating matrix
+        """
+        # The latest rating wins when a user rated the same movie twice
+        ratings_df = ratings_df.drop_duplicates(['userId', 'movieId'], keep='last')
+
+        # Compact integer positions, sorted by ID like the old pivot table
+        user_ids, user_pos = np.unique(ratings_df['userId'].to_numpy(), return_inverse=True)
+        movie_ids, movie_pos = np.unique(ratings_df['movieId'].to_numpy(), return_inverse=True)
+
+        matrix = csr_matrix(
+            (ratings_df['rating'].to_numpy(dtype=dtype), (user_pos, movie_pos)),
+            shape=(len(user_ids), len(movie_ids))
+        )
+        matrix.sort_indices()
+        return cls(matrix, user_ids, movie_ids)
+
+    def update(self, ratings_df):
+        """
+        Merge new ratings into the matrix
+
+        Unknown users and movies are appended as new rows and columns, and a
+        new rating for an existing (userId, movieId) pair replaces the old one.
+
+        Args:
+            ratings_df (DataFrame): New ratings with userId, movieId and rating columns
+
+        Returns:
+            tuple: (changed_users, n_new_users, n_new_movies) where changed_users
+                holds the row positions of every user with new ratings
+        """
+        ratings_df = ratings_df.drop_duplicates(['userId', 'movieId'], keep='last')
+        user_ids = ratings_df['userId'].to_numpy()
+        movie_ids = ratings_df['movieId'].to_numpy()
+
+        # Extend the index maps with unseen users and movies
+        new_users = np.unique(user_ids[self.index.get_indexer(user_ids) < 0])
+        new_movies = np.unique(movie_ids[self.columns.get_indexer(movie_ids) < 0])
+        if len(new_users):
+            self.index = self.index.append(pd.Index(new_users, name='userId'))
+        if len(new_movies):
+            self.columns = self.columns.append(pd.Index(new_movies, name='movieId'))
+        shape = (len(self.index), len(self.columns))
+
+        user_pos = self.index.get_indexer(user_ids)
+        movie_pos = self.columns.get_indexer(movie_ids)
+        delta = csr_matrix(
+            (ratings_df['rating'].to_numpy(dtype=self.matrix.dtype), (user_pos, movie_pos)),
+            shape=shape
+        )
+
+        # Grow the existing matrix: new rows are empty, new columns need no data
+        indptr = np.concatenate([
+            self.matrix.indptr,
+            np.full(len(new_users), self.matrix.indptr[-1], dtype=self.matrix.indptr.dtype)
+        ])
+        matrix = csr_matrix((self.matrix.data, self.matrix.indices, indptr), shape=shape)
+
+        # Drop the old value of re-rated pairs, then add the new ratings
+        replaced = delta.copy()
+        replaced.data[:] = 1
+        matrix = matrix - matrix.multiply(replaced) + delta
+        matrix.eliminate_zeros()
+        matrix.sort_indices()
+        self.matrix = csr_matrix(matrix)
+
+        return np.unique(user_pos), len(new_users), len(new_movies)
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def seen(self, user_idx):
+        """
+        Get the movie positions a user has rated
+
+        Args:
+            user_idx (int): Row position of the user
+
+        Returns:
+            ndarray: Column positions of the rated movies
+        """
+        start, stop = self.matrix.indptr[user_idx], self.matrix.indptr[user_idx + 1]
+        return self.matrix.indices[start:stop]
@@ -1,244 +1,961 @@
 import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.decomposition import NMF
-from scipy.sparse import csr_matrix
+from content_index import ContentIndex
+from movie_catalogue import MovieCatalogue
+from rating_matrix import RatingMatrix
+from ranking import top_k
+from ann_index import IVFIndex
+from search_index import SearchIndex, TitleAutocomplete
+from popularity import PopularityStats
+from cf_engines import CFEngine, create_engine
+from data_loader import load_ratings
+from instrumentation import metrics, timed
+from model_artifacts import (
+    save_artifact, load_artifact, frame_to_arrays, arrays_to_frame, csr_to_arrays, arrays_to_csr
+)
+import threading
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+# Parts of the model in build order; each serves requests as soon as it is built
+COMPONENTS = ('catalogue', 'popularity', 'content', 'collaborative')
+
+class ModelNotReadyError(RuntimeError):
+    """Raised when a method needs a model component that is not built (yet)"""
+    
+    def __init__(self, components, init_error=None):
+        self.components = list(components)
+        self.init_error = init_error
+        if init_error is not None:
+            message = f"Model initialization failed: {init_error}"
+        else:
+            message = f"Model components not ready yet: {', '.join(self.components)}"
+        super().__init__(message)
+
+def _scale_to_weight(scores, low, high, weight):
+    """
+    Map scores in place from the fixed range [low, high] to [0, weight]
+    
+    The range is a property of the score type (e.g. the rating scale), not of
+    one request's scores, so nearly equal scores stay nearly equal instead of
+    being stretched over the full weight. Scores outside it are clipped.
+    
+    Args:
+        scores (ndarray): Raw float64 scores, modified in place
+        low (float): Score mapped to 0
+        high (float): Score mapped to weight
+        weight (float): Upper end of the scaled range
+        
+    Returns:
+        ndarray: The scaled scores
+    """
+    scores -= low
+    scores /= high - low
+    np.clip(scores, 0.0, 1.0, out=scores)
+    scores *= weight
+    return scores
+
 class MovieRecommendationSystem:
-    def __init__(self, movies_path='data/movies.csv', ratings_path='data/ratings.csv'):
+    def __init__(self, movies_path='data/movies.csv', ratings_path='data/ratings.csv',
+                 content_neighbors=50, ratings_cache=None, cf_engine='nmf', background=False):
         """
         Initialize the Movie Recommendation System
         
+        With background=True the constructor returns immediately and the model
+        is built in a daemon thread, one component at a time (see COMPONENTS).
+        Methods serve as soon as the components they need are ready and raise
+        ModelNotReadyError before that; use readiness() or wait_until_ready()
+        to check.
+        
         Args:
             movies_path (str): Path to movies CSV file
             ratings_path (str): Path to ratings CSV file
+            content_neighbors (int): Number of similar movies kept per movie
+                in the content index
+            ratings_cache (str): Directory for a columnar cache of the parsed
+                ratings; later runs skip CSV parsing while the CSV is unchanged
+            cf_engine (str or CFEngine): Collaborative filtering engine, by
+                name ('nmf', 'als', 'implicit-als') or as a configured instance
+            background (bool): Build the model in a background thread
+        """
+        self._configure(content_neighbors, cf_engine)
+        args = (movies_path, ratings_path, ratings_cache)
+        if background:
+            self._init_thread = threading.Thread(
+                target=self._build_in_background, args=args, name='model-init', daemon=True
+            )
+            self._init_thread.start()
+        else:
+            self._load_and_fit(*args)
+    
+    @timed('construction')
+    def _load_and_fit(self, movies_path, ratings_path, ratings_cache):
+        """Read the CSV files and build every component"""
+        with metrics.stage('load_movies'):
+            movies_df = pd.read_csv(movies_path)
+        self._fit_catalogue(movies_df)
+        
+        # Ratings are parsed in typed chunks (int32 ids, float32 ratings)
+        with metrics.stage('load_ratings'):
+            ratings_df = load_ratings(ratings_path, cache_dir=ratings_cache)
+        self._fit_models(ratings_df)
+    
+    def _build_in_background(self, movies_path, ratings_path, ratings_cache):
+        """Thread target of background initialization; failures are recorded, not raised"""
+        try:
+            self._load_and_fit(movies_path, ratings_path, ratings_cache)
+        except Exception as e:
+            with self._ready_condition:
+                self.init_error = e
+                self._ready_condition.notify_all()
+    
+    @classmethod
+    @timed('construction')
+    def from_dataframes(cls, movies_df, ratings_df, content_neighbors=50, cf_engine='nmf'):
+        """
+        Build the recommendation system from in-memory data, e.g. a training split
+        
+        Args:
+            movies_df (DataFrame): Movies with movieId, title, genres and year columns
+            ratings_df (DataFrame): Ratings with userId, movieId, rating and
+                optionally timestamp columns
+            content_neighbors (int): Number of similar movies kept per movie
+            cf_engine (str or CFEngine): Collaborative filtering engine
+            
+        Returns:
+            MovieRecommendationSystem: The fitted recommendation system
         """
-        self.movies_df = pd.read_csv(movies_path)
-        self.ratings_df = pd.read_csv(ratings_path)
+        self = cls.__new__(cls)
+        self._configure(content_neighbors, cf_engine)
+        self._fit_catalogue(movies_df.reset_index(drop=True))
+        self._fit_models(ratings_df.reset_index(drop=True))
+        return self
+    
+    def _configure(self, content_neighbors, cf_engine):
+        """Set the model parameters and start with no component ready"""
+        self.content_neighbors = content_neighbors
+        self.cf_engine = cf_engine if isinstance(cf_engine, CFEngine) else create_engine(cf_engine)
+        self.read_only = False
+        self.cf_ann_index = None
+        self.content_ann_index = None
+        self.topk_store = None
+        self._init_readiness()
+    
+    def _fit_catalogue(self, movies_df):
+        """Build the catalogue and the search index"""
+        self.movies_df = movies_df
+        
+        # Columnar catalogue for O(1) id lookup and batch hydration
+        with metrics.stage('catalogue'):
+            self.catalogue = MovieCatalogue(self.movies_df)
+        with metrics.stage('search_index'):
+            self.search_index = SearchIndex(self.catalogue.titles, self.catalogue.genres)
+        self._mark_ready('catalogue')
+    
+    def _fit_models(self, ratings_df):
+        """Build the rating aggregates and fit both models, cheapest first"""
+        self.ratings_df = ratings_df
         
-        # Create user-movie rating matrix
-        self.user_movie_matrix = self.ratings_df.pivot(
-            index='userId', 
-            columns='movieId', 
-            values='rating'
-        ).fillna(0)
+        # Initialize rating aggregates and title autocomplete
+        self._setup_popularity()
+        self._setup_autocomplete()
+        self._mark_ready('popularity')
         
         # Initialize content-based filtering
         self._setup_content_based_filtering()
+        self._mark_ready('content')
+        
+        # Create sparse user-movie rating matrix
+        with metrics.stage('rating_matrix'):
+            self.user_movie_matrix = RatingMatrix.from_ratings(self.ratings_df)
         
         # Initialize collaborative filtering
         self._setup_collaborative_filtering()
+        self._mark_ready('collaborative')
+    
+    def _init_readiness(self):
+        """Start tracking which components are built"""
+        self._ready = set()
+        self._ready_condition = threading.Condition()
+        self.init_error = None
+    
+    def _mark_ready(self, *components):
+        """Make built components available and wake up waiting threads"""
+        with self._ready_condition:
+            self._ready.update(components)
+            self._ready_condition.notify_all()
+    
+    def _require(self, *components):
+        """Raise ModelNotReadyError unless every given component is built"""
+        missing = [component for component in components if component not in self._ready]
+        if missing:
+            raise ModelNotReadyError(missing, self.init_error)
+    
+    def is_ready(self, component=None):
+        """
+        Check whether a component (by default: every component) is built
+        
+        Args:
+            component (str): One of COMPONENTS, or None for all
+            
+        Returns:
+            bool: True if ready
+        """
+        if component is None:
+            return len(self._ready) == len(COMPONENTS)
+        return component in self._ready
+    
+    def readiness(self):
+        """
+        Report the state of every component
+        
+        Returns:
+            dict: {component: True/False} plus 'ready' (all built) and
+                'error' (message of a failed background build, or None)
+        """
+        report = {component: component in self._ready for component in COMPONENTS}
+        report['ready'] = all(report.values())
+        report['error'] = None if self.init_error is None else str(self.init_error)
+        return report
+    
+    def wait_until_ready(self, component=None, timeout=None):
+        """
+        Block until a component (by default: every component) is built
+        
+        Args:
+            component (str): One of COMPONENTS, or None for all
+            timeout (float): Maximum seconds to wait (None waits indefinitely)
+            
+        Returns:
+            bool: True if ready, False on timeout
+            
+        Raises:
+            ModelNotReadyError: If the background build failed
+        """
+        needed = set(COMPONENTS) if component is None else {component}
+        with self._ready_condition:
+            self._ready_condition.wait_for(
+                lambda: needed <= self._ready or self.init_error is not None, timeout
+            )
+        if self.init_error is not None and not needed <= self._ready:
+            missing = [c for c in COMPONENTS if c in needed and c not in self._ready]
+            raise ModelNotReadyError(missing, self.init_error)
+        return needed <= self._ready
+    
+    @timed('popularity')
+    def _setup_popularity(self):
+        """Setup per-movie rating counts and sums, aligned with the catalogue"""
+        self.popularity = PopularityStats.from_positions(
+            len(self.catalogue),
+            self.catalogue.positions(self.ratings_df['movieId'].to_numpy()),
+            self.ratings_df['rating'].to_numpy(dtype=np.float64)
+        )
+    
+    @timed('autocomplete_index')
+    def _setup_autocomplete(self):
+        """Setup the typeahead index, ranking titles by number of ratings"""
+        self.title_autocomplete = TitleAutocomplete(self.catalogue.titles, self.popularity.rating_count)
     
     def _setup_content_based_filtering(self):
-        """Setup content-based filtering using TF-IDF and cosine similarity"""
+        """Setup content-based filtering using TF-IDF and a sparse top-K cosine index"""
         # Create TF-IDF vectorizer for genres
         self.tfidf = TfidfVectorizer(stop_words='english')
         
-        # Create genre matrix
-        genre_matrix = self.tfidf.fit_transform(self.movies_df['genres'].fillna(''))
-        
-        # Calculate cosine similarity between movies
-        self.movie_similarity = cosine_similarity(genre_matrix, genre_matrix)
+        # Create genre matrix (rows are L2-normalised, so dot product == cosine)
+        with metrics.stage('tfidf'):
+            self.genre_matrix = self.tfidf.fit_transform(self.movies_df['genres'].fillna(''))
         
-        # Create movie index mapping
-        self.movie_idx = {movie_id: idx for idx, movie_id in enumerate(self.movies_df['movieId'])}
-        self.idx_movie = {idx: movie_id for movie_id, idx in self.movie_idx.items()}
+        # Keep only the most similar movies of each movie in a CSR matrix
+        with metrics.stage('content_index'):
+            self.content_index = ContentIndex(n_neighbors=self.content_neighbors).fit(self.genre_matrix)
+        self.movie_similarity = self.content_index.similarity
     
     def _setup_collaborative_filtering(self):
-        """Setup collaborative filtering using Non-negative Matrix Factorization"""
-        # Convert to sparse matrix
-        self.sparse_matrix = csr_matrix(self.user_movie_matrix.values)
+        """Setup collaborative filtering by factorising the ratings with the CF engine"""
+        # Sparse ratings, built without a dense pivot
+        self.sparse_matrix = self.user_movie_matrix.matrix
+        
+        # Factorise into user factors (users x k) and movie factors (k x movies)
+        with metrics.stage('cf_fit'):
+            self.user_features, self.movie_features = self.cf_engine.fit(self.sparse_matrix)
+        self.nmf = getattr(self.cf_engine, 'model', None)
+        self.cf_score_range = self.cf_engine.score_range(self.sparse_matrix)
+        
+        # Track how much data arrived since this fit
+        self.fit_stats = {
+            'fitted_at': time.time(),
+            'ratings_at_fit': int(self.sparse_matrix.nnz),
+            'ratings_since_fit': 0,
+            'users_folded_in': 0,
+            'movies_without_factors': 0
+        }
+    
+    def save(self, path):
+        """
+        Save the fitted model to a versioned artifact directory
+        
+        Args:
+            path (str): Directory to write (replaced atomically if it exists)
+            
+        Returns:
+            dict: The written manifest
+        """
+        self._require(*COMPONENTS)
+        movie_arrays, movie_columns = frame_to_arrays(self.movies_df, 'movies')
+        rating_arrays, rating_columns = frame_to_arrays(self.ratings_df, 'ratings')
+        
+        arrays = {
+            **movie_arrays,
+            **rating_arrays,
+            **csr_to_arrays(self.sparse_matrix, 'user_movie_matrix'),
+            'user_movie_matrix.user_ids': self.user_movie_matrix.index.to_numpy(),
+            'user_movie_matrix.movie_ids': self.user_movie_matrix.columns.to_numpy(),
+            **csr_to_arrays(self.genre_matrix, 'genre_matrix'),
+            **csr_to_arrays(self.movie_similarity, 'movie_similarity'),
+            'user_features': self.user_features,
+            'movie_features': self.movie_features,
+            **self.search_index.to_arrays('search_index'),
+            **self.title_autocomplete.to_arrays('autocomplete')
+        }
+        metadata = {
+            'content_neighbors': self.content_neighbors,
+            'cf_engine': {'name': self.cf_engine.name, 'params': self.cf_engine.params()},
+            'fit_stats': self.fit_stats,
+            'movies_columns': movie_columns,
+            'ratings_columns': rating_columns
+        }
+        return save_artifact(path, arrays, metadata)
+    
+    @classmethod
+    @timed('load')
+    def load(cls, path, mmap=False):
+        """
+        Load a model saved with save() without refitting anything
+        
+        With mmap=True the arrays are memory-mapped read-only instead of read
+        into private memory. Every process that maps the same artifact then
+        shares one physical copy through the OS page cache, so running more
+        web workers does not multiply the size of the factors, the rating
+        matrix or the similarity index.
+        
+        Args:
+            path (str): Artifact directory
+            mmap (bool): Memory-map the arrays read-only
+            
+        Returns:
+            MovieRecommendationSystem: The loaded recommendation system
+        """
+        with metrics.stage('load_artifact'):
+            arrays, manifest = load_artifact(path, mmap_mode='r' if mmap else None)
+        metadata = manifest['metadata']
+        
+        self = cls.__new__(cls)
+        self._init_readiness()
+        self.content_neighbors = metadata['content_neighbors']
+        # Models saved before engines were pluggable were fitted with NMF
+        engine = metadata.get('cf_engine', {'name': 'nmf', 'params': {}})
+        self.cf_engine = create_engine(engine['name'], **engine['params'])
+        self.read_only = mmap
+        self.cf_ann_index = None
+        self.content_ann_index = None
+        self.topk_store = None
+        self.movies_df = arrays_to_frame(arrays, 'movies', metadata['movies_columns'])
+        self.ratings_df = arrays_to_frame(arrays, 'ratings', metadata['ratings_columns'])
+        self.catalogue = MovieCatalogue(self.movies_df)
+        
+        self.user_movie_matrix = RatingMatrix(
+            arrays_to_csr(arrays, 'user_movie_matrix'),
+            arrays['user_movie_matrix.user_ids'],
+            arrays['user_movie_matrix.movie_ids']
+        )
+        self._setup_popularity()
+        
+        # Saved search indexes; models saved without them are indexed again
+        if 'search_index.title_tokens' in arrays:
+            self.search_index = SearchIndex.from_arrays(arrays, 'search_index')
+            self.title_autocomplete = TitleAutocomplete.from_arrays(
+                arrays, 'autocomplete', self.popularity.rating_count
+            )
+        else:
+            self.search_index = SearchIndex(self.catalogue.titles, self.catalogue.genres)
+            self._setup_autocomplete()
+        
+        # Fitted content model
+        self.tfidf = None
+        self.genre_matrix = arrays_to_csr(arrays, 'genre_matrix')
+        self.content_index = ContentIndex(n_neighbors=self.content_neighbors)
+        self.content_index.similarity = arrays_to_csr(arrays, 'movie_similarity')
+        self.movie_similarity = self.content_index.similarity
+        
+        # Fitted collaborative model
+        self.sparse_matrix = self.user_movie_matrix.matrix
+        self.nmf = None
+        self.user_features = arrays['user_features']
+        self.movie_features = arrays['movie_features']
+        self.cf_score_range = self.cf_engine.score_range(self.sparse_matrix)
+        self.fit_stats = metadata['fit_stats']
+        self._mark_ready(*COMPONENTS)
+        return self
+    
+    @timed('add_ratings')
+    def add_ratings(self, ratings_df):
+        """
+        Add new ratings without refitting the collaborative model
+        
+        The ratings are merged into the sparse rating store and the factors
+        of every new or changed user are recomputed against the fixed item
+        factors. Movies that were not in the rating matrix at fit time get
+        zero factors until the next refit().
+        
+        Args:
+            ratings_df (DataFrame): New ratings with userId, movieId, rating
+                and optionally timestamp columns
+            
+        Returns:
+            dict: Number of users updated and of new users and movies
+        """
+        self._require(*COMPONENTS)
+        if self.read_only:
+            raise RuntimeError("Model is memory-mapped read-only; load it with mmap=False to add ratings")
+        
+        new_ratings = ratings_df.copy()
+        if 'timestamp' in self.ratings_df.columns and 'timestamp' not in new_ratings.columns:
+            new_ratings['timestamp'] = int(time.time())
+        new_ratings = new_ratings[self.ratings_df.columns].astype(self.ratings_df.dtypes.to_dict())
+        new_ratings = new_ratings.drop_duplicates(['userId', 'movieId'], keep='last')
+        
+        # Update the popularity aggregates; a re-rated movie only changes its sum
+        user_pos = self.user_movie_matrix.index.get_indexer(new_ratings['userId'].to_numpy())
+        movie_cols = self.user_movie_matrix.columns.get_indexer(new_ratings['movieId'].to_numpy())
+        known = (user_pos >= 0) & (movie_cols >= 0)
+        previous = np.zeros(len(new_ratings))
+        previous[known] = np.asarray(self.sparse_matrix[user_pos[known], movie_cols[known]]).ravel()
+        self.popularity.update(
+            self.catalogue.positions(new_ratings['movieId'].to_numpy()),
+            (previous == 0).astype(np.int64),
+            new_ratings['rating'].to_numpy(dtype=np.float64) - previous
+        )
+        with metrics.stage('autocomplete_index'):
+            self.title_autocomplete.set_popularity(self.popularity.rating_count)
+        
+        self.ratings_df = pd.concat([self.ratings_df, new_ratings], ignore_index=True)
+        self.ratings_df = self.ratings_df.drop_duplicates(['userId', 'movieId'], keep='last')
+        self.ratings_df = self.ratings_df.reset_index(drop=True)
+        
+        # Merge into the sparse rating store
+        changed_users, n_new_users, n_new_movies = self.user_movie_matrix.update(new_ratings)
+        self.sparse_matrix = self.user_movie_matrix.matrix
+        
+        # New movies score zero until the item factors are refitted
+        n_components = self.movie_features.shape[0]
+        if n_new_movies:
+            self.movie_features = np.hstack([
+                self.movie_features,
+                np.zeros((n_components, n_new_movies), dtype=self.movie_features.dtype)
+            ])
+            # Keep the CF index covering every matrix column
+            if self.cf_ann_index is not None:
+                self.cf_ann_index.add(self.movie_features[:, -n_new_movies:].T)
+        if n_new_users:
+            self.user_features = np.vstack([
+                self.user_features,
+                np.zeros((n_new_users, n_components), dtype=self.user_features.dtype)
+            ])
+        
+        # Fold the changed users in against the fixed item factors
+        with metrics.stage('fold_in'):
+            self.user_features[changed_users] = self.cf_engine.fold_in(
+                self.sparse_matrix[changed_users],
+                self.movie_features,
+                init=self.user_features[changed_users]
+            )
+        
+        # Precomputed lists of these users no longer reflect their ratings
+        if self.topk_store is not None:
+            self.topk_store.mark_stale(self.user_movie_matrix.index[changed_users])
+        
+        self.fit_stats['ratings_since_fit'] += len(new_ratings)
+        self.fit_stats['users_folded_in'] += len(changed_users)
+        self.fit_stats['movies_without_factors'] += n_new_movies
+        
+        return {
+            'users_updated': len(changed_users),
+            'new_users': n_new_users,
+            'new_movies': n_new_movies
+        }
+    
+    @property
+    def model_version(self):
+        """Identifier that changes whenever a refit or new ratings change the model"""
+        if 'collaborative' not in self._ready:
+            return 'initializing'
+        return f"{int(self.fit_stats['fitted_at'] * 1000):x}-{self.fit_stats['ratings_since_fit']}"
+    
+    def staleness(self, refit_threshold=0.1):
+        """
+        Report how far the collaborative model has drifted since its last fit
+        
+        Args:
+            refit_threshold (float): Fraction of new ratings (relative to the
+                ratings seen at fit time) after which a full refit is due
+            
+        Returns:
+            dict: Fit statistics plus seconds_since_fit, fraction_since_fit
+                and needs_refit
+        """
+        self._require('collaborative')
+        stats = dict(self.fit_stats)
+        stats['seconds_since_fit'] = time.time() - stats['fitted_at']
+        stats['fraction_since_fit'] = stats['ratings_since_fit'] / max(1, stats['ratings_at_fit'])
+        stats['needs_refit'] = stats['fraction_since_fit'] >= refit_threshold
+        return stats
+    
+    def refit(self):
+        """Refit the collaborative model on all ratings added so far"""
+        self._require(*COMPONENTS)
+        if self.read_only:
+            raise RuntimeError("Model is memory-mapped read-only; load it with mmap=False to refit")
+        self._setup_collaborative_filtering()
+        if self.cf_ann_index is not None:
+            self.cf_ann_index = IVFIndex(
+                self.cf_ann_index.n_lists, self.cf_ann_index.n_probe
+            ).fit(self.movie_features.T)
+    
+    def attach_topk_store(self, store):
+        """
+        Serve collaborative filtering from precomputed per-user lists
+        
+        Users the store has no current list for (new users, users with
+        ratings added since it was built, every user after a refit) and
+        requests for more than K movies are still scored live.
+        
+        Args:
+            store (TopKStore): Store built from this model with build_topk_store
+        """
+        self.topk_store = store
+    
+    @timed('build_ann_indexes')
+    def build_ann_indexes(self, n_lists=None, n_probe=8):
+        """
+        Build approximate nearest-neighbour indexes for sub-linear retrieval
+        
+        One IVF index covers the CF item factors (used by collaborative
+        filtering) and one the TF-IDF genre vectors (used by content-based
+        filtering). Once built, both recommenders search them by default.
         
-        # Apply NMF (Non-negative Matrix Factorization)
-        self.nmf = NMF(n_components=20, random_state=42, max_iter=200)
-        self.user_features = self.nmf.fit_transform(self.sparse_matrix)
-        self.movie_features = self.nmf.components_
+        Args:
+            n_lists (int): Number of k-means cells (default: about sqrt(N))
+            n_probe (int): Cells scored per query; higher means better recall
+                and slower queries
+        """
+        self._require('content', 'collaborative')
+        self.cf_ann_index = IVFIndex(n_lists, n_probe).fit(self.movie_features.T)
+        self.content_ann_index = IVFIndex(n_lists, n_probe).fit(self.genre_matrix)
     
     def get_movie_by_id(self, movie_id):
         """Get movie information by ID"""
-        return self.movies_df[self.movies_df['movieId'] == movie_id].iloc[0]
+        self._require('catalogue')
+        with metrics.stage('get_movie_by_id'):
+            position = self.catalogue.position(movie_id)
+            if position is None:
+                raise IndexError(f"Movie {movie_id} not found")
+            return self.movies_df.iloc[position]
+    
+    def get_movie(self, movie_id):
+        """
+        Get a movie as a response dict
+        
+        Args:
+            movie_id (int): Movie ID
+            
+        Returns:
+            dict: Movie ID, title, genres and year, or None if the movie is unknown
+        """
+        self._require('catalogue')
+        return self.catalogue.get(movie_id)
     
     def get_movie_by_title(self, title):
         """Get movie information by title"""
+        self._require('catalogue')
         return self.movies_df[self.movies_df['title'].str.contains(title, case=False, na=False)]
     
-    def content_based_recommendations(self, movie_id, n_recommendations=5):
+    @timed('content_based_recommendations')
+    def content_based_recommendations(self, movie_id, n_recommendations=5, approximate=None):
         """
         Get content-based recommendations based on movie genres
         
         Args:
             movie_id (int): Movie ID to find similar movies for
             n_recommendations (int): Number of recommendations to return
+            approximate (bool): Search the ANN index instead of the precomputed
+                neighbour lists (default: only if build_ann_indexes() was called)
             
         Returns:
             list: List of recommended movie IDs with similarity scores
+            
+        Raises:
+            ValueError: If approximate is True before build_ann_indexes()
         """
-        if movie_id not in self.movie_idx:
+        self._require('content')
+        movie_idx = self.catalogue.position(movie_id)
+        if movie_idx is None:
             return []
         
-        movie_idx = self.movie_idx[movie_id]
-        movie_scores = list(enumerate(self.movie_similarity[movie_idx]))
-        movie_scores = sorted(movie_scores, key=lambda x: x[1], reverse=True)
-        movie_scores = movie_scores[1:n_recommendations+1]  # Exclude the movie itself
-        
-        recommendations = []
-        for idx, score in movie_scores:
-            movie_id_rec = self.idx_movie[idx]
-            movie_info = self.get_movie_by_id(movie_id_rec)
-            recommendations.append({
-                'movieId': movie_id_rec,
-                'title': movie_info['title'],
-                'genres': movie_info['genres'],
-                'similarity_score': round(score, 3)
-            })
-        
-        return recommendations
+        if approximate is None:
+            approximate = self.content_ann_index is not None
+        elif approximate and self.content_ann_index is None:
+            raise ValueError("No ANN index built; call build_ann_indexes() first")
+        
+        with metrics.stage('content_scoring'):
+            if approximate:
+                query = self.genre_matrix[movie_idx].toarray()
+                neighbor_idx, neighbor_scores = self.content_ann_index.search(
+                    query, n_recommendations, exclude=[movie_idx]
+                )
+                # Movies sharing no genres are not neighbours
+                similar = neighbor_scores > 0
+                neighbor_idx, neighbor_scores = neighbor_idx[similar], neighbor_scores[similar]
+            else:
+                neighbor_idx, neighbor_scores = self.content_index.neighbors(movie_idx, n_recommendations)
+        
+        with metrics.stage('hydrate'):
+            return self.catalogue.hydrate_positions(
+                neighbor_idx,
+                similarity_score=np.round(neighbor_scores.astype(np.float64), 3)
+            )
     
-    def collaborative_filtering_recommendations(self, user_id, n_recommendations=5):
+    @timed('collaborative_filtering_recommendations')
+    def collaborative_filtering_recommendations(self, user_id, n_recommendations=5, approximate=None):
         """
         Get collaborative filtering recommendations based on user similarities
         
         Args:
             user_id (int): User ID to get recommendations for
             n_recommendations (int): Number of recommendations to return
+            approximate (bool): Retrieve candidates from the ANN index instead of
+                scoring every movie (default: only if build_ann_indexes() was called)
             
         Returns:
             list: List of recommended movie IDs with predicted ratings
+            
+        Raises:
+            ValueError: If approximate is True before build_ann_indexes()
         """
+        self._require('collaborative')
+        
+        # Precomputed top-K lists answer with one row read
+        if self.topk_store is not None:
+            with metrics.stage('topk_lookup'):
+                stored = self.topk_store.lookup(user_id, n_recommendations, self.fit_stats['fitted_at'])
+            if stored is not None:
+                with metrics.stage('hydrate'):
+                    return self.catalogue.hydrate(
+                        stored[0], predicted_rating=np.round(stored[1].astype(np.float64), 2)
+                    )
+        
         if user_id not in self.user_movie_matrix.index:
             return []
         
         # Get user index
         user_idx = self.user_movie_matrix.index.get_loc(user_id)
+        seen = self.user_movie_matrix.seen(user_idx)
+        
+        if approximate is None:
+            approximate = self.cf_ann_index is not None
+        elif approximate and self.cf_ann_index is None:
+            raise ValueError("No ANN index built; call build_ann_indexes() first")
+        
+        if approximate:
+            with metrics.stage('cf_ann_search'):
+                top_cols, top_scores = self.cf_ann_index.search(
+                    self.user_features[user_idx], n_recommendations, exclude=seen
+                )
+        else:
+            # Predict ratings for all movies
+            with metrics.stage('cf_scoring'):
+                predicted_ratings = self.user_features[user_idx] @ self.movie_features
+                
+                # Exclude movies the user has already rated
+                predicted_ratings[seen] = -np.inf
+            
+            # Select the top unwatched movies without sorting the whole catalogue
+            with metrics.stage('top_k'):
+                n_unwatched = predicted_ratings.shape[0] - len(seen)
+                top_cols = top_k(predicted_ratings, min(n_recommendations, n_unwatched))
+                top_scores = predicted_ratings[top_cols]
+        
+        with metrics.stage('hydrate'):
+            return self.catalogue.hydrate(
+                self.user_movie_matrix.columns[top_cols].to_numpy(),
+                predicted_rating=np.round(top_scores.astype(np.float64), 2)
+            )
+    
+    @timed('recommend_batch')
+    def recommend_batch(self, user_ids, n_recommendations=5, block_size=1024):
+        """
+        Get collaborative filtering recommendations for many users at once
         
-        # Predict ratings for all movies
-        predicted_ratings = np.dot(self.user_features[user_idx], self.movie_features)
-        
-        # Get movies the user hasn't rated
-        user_ratings = self.user_movie_matrix.iloc[user_idx]
-        unwatched_movies = user_ratings[user_ratings == 0].index
-        
-        # Get predicted ratings for unwatched movies
-        movie_scores = []
-        for movie_id in unwatched_movies:
-            if movie_id in self.user_movie_matrix.columns:
-                movie_col_idx = self.user_movie_matrix.columns.get_loc(movie_id)
-                predicted_rating = predicted_ratings[movie_col_idx]
-                movie_scores.append((movie_id, predicted_rating))
-        
-        # Sort by predicted rating
-        movie_scores.sort(key=lambda x: x[1], reverse=True)
+        Users are scored a block at a time with one matrix product, so memory
+        stays at roughly block_size x n_movies floats.
         
-        # Get top recommendations
-        recommendations = []
-        for movie_id, predicted_rating in movie_scores[:n_recommendations]:
-            movie_info = self.get_movie_by_id(movie_id)
-            recommendations.append({
-                'movieId': movie_id,
-                'title': movie_info['title'],
-                'genres': movie_info['genres'],
-                'predicted_rating': round(predicted_rating, 2)
-            })
+        Args:
+            user_ids (array-like): User IDs to get recommendations for
+            n_recommendations (int): Number of recommendations per user
+            block_size (int): Number of users scored per matrix product
+            
+        Returns:
+            tuple: (movie_ids, scores) arrays of shape (len(user_ids), n_recommendations);
+                unknown users and missing slots hold movie ID -1 and score NaN
+        """
+        self._require('collaborative')
+        user_positions = self.user_movie_matrix.index.get_indexer(np.asarray(user_ids))
+        movie_ids = self.user_movie_matrix.columns.to_numpy()
+        n_recommendations = min(n_recommendations, len(movie_ids))
+        
+        rec_ids = np.full((len(user_positions), n_recommendations), -1, dtype=movie_ids.dtype)
+        rec_scores = np.full((len(user_positions), n_recommendations), np.nan, dtype=np.float32)
+        
+        known_rows = np.flatnonzero(user_positions >= 0)
+        for start in range(0, len(known_rows), block_size):
+            rows = known_rows[start:start + block_size]
+            block_users = user_positions[rows]
+            
+            # Score the whole block with a single matrix product
+            scores = self.user_features[block_users] @ self.movie_features
+            
+            # Exclude movies each user has already rated
+            scores[self.sparse_matrix[block_users].nonzero()] = -np.inf
+            
+            top_cols = top_k(scores, n_recommendations)
+            top_scores = np.take_along_axis(scores, top_cols, axis=1)
+            valid = np.isfinite(top_scores)
+            rec_ids[rows] = np.where(valid, movie_ids[top_cols], -1)
+            rec_scores[rows] = np.where(valid, top_scores, np.nan)
         
-        return recommendations
+        return rec_ids, rec_scores
     
-    def hybrid_recommendations(self, user_id, movie_id=None, n_recommendations=5):
+    @timed('hybrid_recommendations')
+    def hybrid_recommendations(self, user_id, movie_id=None, n_recommendations=5,
+                               cf_weight=0.6, cb_weight=0.4):
         """
         Get hybrid recommendations combining content-based and collaborative filtering
         
+        Every movie in the catalogue is a candidate. The user's predicted
+        ratings are mapped from the CF engine's fixed score range (e.g. the
+        rating scale) to [0, 1]; the genre similarities to movie_id are
+        cosines and already in [0, 1]. Their weighted sum is ranked in one
+        vectorized pass. Movies without collaborative factors score 0.
+        
         Args:
             user_id (int): User ID to get recommendations for
             movie_id (int): Optional movie ID for content-based filtering
             n_recommendations (int): Number of recommendations to return
+            cf_weight (float): Weight of the scaled collaborative score
+            cb_weight (float): Weight of the content score
             
         Returns:
             list: List of recommended movies with combined scores
+            
+        Raises:
+            ValueError: If a weight is negative or not finite
         """
-        # Get collaborative filtering recommendations
-        cf_recommendations = self.collaborative_filtering_recommendations(user_id, n_recommendations * 2)
+        if not all(np.isfinite(weight) and weight >= 0 for weight in (cf_weight, cb_weight)):
+            raise ValueError("cf_weight and cb_weight must be finite and non-negative")
+        self._require('content', 'collaborative')
+        # Without a movie there is no content component
+        if not movie_id:
+            return self.collaborative_filtering_recommendations(user_id, n_recommendations)
+        
+        movie_idx = self.catalogue.position(movie_id)
+        user_known = user_id in self.user_movie_matrix.index
+        if movie_idx is None and not user_known:
+            return []
         
-        # If movie_id is provided, get content-based recommendations
-        if movie_id:
-            cb_recommendations = self.content_based_recommendations(movie_id, n_recommendations * 2)
-            
-            # Combine recommendations
-            hybrid_scores = {}
-            
-            # Add collaborative filtering scores
-            for rec in cf_recommendations:
-                movie_id_rec = rec['movieId']
-                hybrid_scores[movie_id_rec] = {
-                    'movieId': movie_id_rec,
-                    'title': rec['title'],
-                    'genres': rec['genres'],
-                    'cf_score': rec['predicted_rating'],
-                    'cb_score': 0,
-                    'hybrid_score': rec['predicted_rating'] * 0.6  # Weight for CF
-                }
-            
-            # Add content-based scores
-            for rec in cb_recommendations:
-                movie_id_rec = rec['movieId']
-                if movie_id_rec in hybrid_scores:
-                    hybrid_scores[movie_id_rec]['cb_score'] = rec['similarity_score']
-                    hybrid_scores[movie_id_rec]['hybrid_score'] += rec['similarity_score'] * 0.4  # Weight for CB
+        n_movies = len(self.catalogue)
+        hybrid_scores = np.zeros(n_movies)
+        excluded = [[]]
+        
+        if user_known:
+            with metrics.stage('cf_scoring'):
+                # Predicted ratings of every movie in the rating matrix
+                user_idx = self.user_movie_matrix.index.get_loc(user_id)
+                predicted_ratings = self.user_features[user_idx] @ self.movie_features
+                
+                # Put the predictions on the fixed rating scale
+                seen = self.user_movie_matrix.seen(user_idx)
+                scaled_ratings = _scale_to_weight(predicted_ratings.astype(np.float64),
+                                                  *self.cf_score_range, cf_weight)
+                
+                # Move the scores to catalogue positions; movies without factors score 0
+                column_positions, position_columns = self._matrix_column_positions()
+                if position_columns is None:
+                    hybrid_scores = scaled_ratings
+                    excluded.append(seen)
                 else:
-                    hybrid_scores[movie_id_rec] = {
-                        'movieId': movie_id_rec,
-                        'title': rec['title'],
-                        'genres': rec['genres'],
-                        'cf_score': 0,
-                        'cb_score': rec['similarity_score'],
-                        'hybrid_score': rec['similarity_score'] * 0.4
-                    }
-            
-            # Sort by hybrid score
-            recommendations = sorted(hybrid_scores.values(), key=lambda x: x['hybrid_score'], reverse=True)
-            return recommendations[:n_recommendations]
+                    has_column = position_columns >= 0
+                    hybrid_scores[has_column] = scaled_ratings[position_columns[has_column]]
+                    excluded.append(column_positions[seen])
+        
+        if movie_idx is not None:
+            with metrics.stage('content_scoring'):
+                # Cosine similarity to every movie, computed once per distinct genre profile
+                profile_vectors, profile_of_movie = self._genre_profiles()
+                profile_scores = profile_vectors @ profile_vectors[profile_of_movie[movie_idx]]
+                cb_scores = profile_scores[profile_of_movie]
+                
+                # Cosine similarities are in [0, 1] already
+                hybrid_scores += _scale_to_weight(cb_scores.astype(np.float64), 0.0, 1.0, cb_weight)
+            excluded.append([movie_idx])
+        
+        with metrics.stage('top_k'):
+            excluded = np.unique(np.concatenate(excluded).astype(np.int64))
+            excluded = excluded[excluded >= 0]
+            hybrid_scores[excluded] = -np.inf
+            top_positions = top_k(hybrid_scores, min(n_recommendations, n_movies - len(excluded)))
+        
+        # Raw component scores of the selected movies
+        cf_top = np.zeros(len(top_positions))
+        if user_known:
+            top_columns = top_positions if position_columns is None else position_columns[top_positions]
+            has_column = top_columns >= 0
+            cf_top[has_column] = predicted_ratings[top_columns[has_column]]
+        cb_top = cb_scores[top_positions] if movie_idx is not None else np.zeros(len(top_positions))
+        
+        with metrics.stage('hydrate'):
+            return self.catalogue.hydrate_positions(
+                top_positions,
+                cf_score=np.round(cf_top, 2),
+                cb_score=np.round(cb_top, 3),
+                hybrid_score=np.round(hybrid_scores[top_positions], 3)
+            )
+    
+    def _genre_profiles(self):
+        """
+        Distinct TF-IDF genre rows, which depend only on the genre string
         
-        else:
-            # Return only collaborative filtering recommendations
-            return cf_recommendations[:n_recommendations]
+        A catalogue has far fewer genre combinations than movies, so scoring
+        the distinct rows densely and gathering is cheaper than a sparse
+        product over every movie.
+        
+        Returns:
+            tuple: (dense array of distinct rows, row index of every movie)
+        """
+        if getattr(self, '_genre_profile_cache', None) is None:
+            _, first_movie, profile_of_movie = np.unique(
+                self.catalogue.genres, return_index=True, return_inverse=True
+            )
+            self._genre_profile_cache = (self.genre_matrix[first_movie].toarray(), profile_of_movie)
+        return self._genre_profile_cache
     
-    def get_popular_movies(self, n_movies=10):
+    def _matrix_column_positions(self):
+        """
+        Map between rating matrix columns and catalogue positions
+        
+        Returns:
+            tuple: (catalogue position of every column, -1 if not in the
+                catalogue; column of every catalogue position, -1 if the movie
+                has no ratings), or (None, None) when both are the identity
+        """
+        columns = self.user_movie_matrix.columns
+        # Columns are only ever appended, so a length change means new movies
+        cached = getattr(self, '_column_positions', None)
+        if cached is None or cached[0] != len(columns):
+            column_positions = self.catalogue.positions(columns.to_numpy())
+            if len(columns) == len(self.catalogue) and (column_positions == np.arange(len(columns))).all():
+                maps = (None, None)
+            else:
+                position_columns = columns.get_indexer(self.catalogue.movie_ids)
+                maps = (column_positions, position_columns)
+            cached = self._column_positions = (len(columns), maps)
+        return cached[1]
+
+    @timed('get_popular_movies')
+    def get_popular_movies(self, n_movies=10, ranking='count'):
         """
         Get most popular movies based on number of ratings
         
         Args:
             n_movies (int): Number of popular movies to return
+            ranking (str): 'count' ranks by number of ratings, 'bayesian' by
+                average rating shrunk towards the global mean
             
         Returns:
             list: List of popular movies
         """
-        # Count ratings for each movie
-        movie_ratings_count = self.ratings_df.groupby('movieId').agg({
-            'rating': ['count', 'mean']
-        }).round(2)
+        self._require('popularity')
+        # Top movies are a slice of the precomputed ranking
+        positions = self.popularity.top(n_movies, ranking)
+        
+        extra = {
+            'rating_count': self.popularity.rating_count[positions],
+            'rating_mean': np.round(self.popularity.rating_mean[positions], 2)
+        }
+        if ranking == 'bayesian':
+            extra['bayesian_rating'] = np.round(self.popularity.bayesian_average(positions=positions), 2)
+        
+        return self.catalogue.hydrate_positions(positions, **extra)
+    
+    @timed('autocomplete')
+    def autocomplete(self, prefix, n_results=10):
+        """
+        Suggest movies whose title has a word starting with the typed prefix
         
-        movie_ratings_count.columns = ['rating_count', 'rating_mean']
-        movie_ratings_count = movie_ratings_count.sort_values('rating_count', ascending=False)
+        Args:
+            prefix (str): Text typed so far
+            n_results (int): Number of suggestions to return
+            
+        Returns:
+            list: List of matching movies, most rated first
+        """
+        self._require('popularity')
+        positions = self.title_autocomplete.complete(prefix, n_results)
+        return self.catalogue.hydrate_positions(positions, fields=('title', 'genres', 'year'))
+    
+    @timed('filter_movies')
+    def filter_movies(self, any_genres=None, all_genres=None, year_min=None, year_max=None, n_results=None):
+        """
+        Find movies by genre and release year
         
-        # Get top movies
-        popular_movies = []
-        for movie_id in movie_ratings_count.head(n_movies).index:
-            movie_info = self.get_movie_by_id(movie_id)
-            popular_movies.append({
-                'movieId': movie_id,
-                'title': movie_info['title'],
-                'genres': movie_info['genres'],
-                'rating_count': int(movie_ratings_count.loc[movie_id, 'rating_count']),
-                'rating_mean': movie_ratings_count.loc[movie_id, 'rating_mean']
-            })
+        Genres are matched exactly against the catalogue's genre vocabulary
+        (so 'Music' does not match 'Musical') using precomputed bitmasks.
         
-        return popular_movies
+        Args:
+            any_genres (list): Keep movies with at least one of these genres
+            all_genres (list): Keep movies with every one of these genres
+            year_min (int): Keep movies released in or after this year
+            year_max (int): Keep movies released in or before this year
+            n_results (int): Maximum number of movies to return (default: all)
+            
+        Returns:
+            list: List of matching movies in catalogue order
+        """
+        self._require('catalogue')
+        with metrics.stage('genre_filter'):
+            positions = self.catalogue.filter_positions(any_genres, all_genres, year_min, year_max)
+        
+        with metrics.stage('hydrate'):
+            return self.catalogue.hydrate_positions(positions[:n_results], fields=('title', 'genres', 'year'))
     
+    def get_genre_counts(self):
+        """
+        Get the number of movies per genre (precomputed with the catalogue)
+        
+        Returns:
+            dict: Genre -> movie count, most common genre first
+        """
+        self._require('catalogue')
+        return self.catalogue.counts_by_genre()
+    
+    @timed('search_movies')
     def search_movies(self, query, n_results=10):
         """
         Search movies by title or genre
         
+        Every query word must appear in the title or genres (the last word may
+        be a prefix). Title matches rank above genre matches.
+        
         Args:
             query (str): Search query
             n_results (int): Number of results to return
@@ -246,27 +963,10 @@ class MovieRecommendationSystem:
         Returns:
             list: List of matching movies
         """
-        # Search in title
-        title_matches = self.movies_df[
-            self.movies_df['title'].str.contains(query, case=False, na=False)
-        ]
-        
-        # Search in genres
-        genre_matches = self.movies_df[
-            self.movies_df['genres'].str.contains(query, case=False, na=False)
-        ]
-        
-        # Combine and remove duplicates
-        all_matches = pd.concat([title_matches, genre_matches]).drop_duplicates()
+        self._require('catalogue')
+        with metrics.stage('search_index_lookup'):
+            positions = self.search_index.search(query, n_results)
         
         # Convert to list of dictionaries
-        results = []
-        for _, movie in all_matches.head(n_results).iterrows():
-            results.append({
-                'movieId': movie['movieId'],
-                'title': movie['title'],
-                'genres': movie['genres'],
-                'year': movie['year']
-            })
-        
-        return results 
\ No newline at end of file
+        with metrics.stage('hydrate'):
+            return self.catalogue.hydrate_positions(positions, fields=('title', 'genres', 'year')) 
\ No newline at end of file
@@ -0,0 +1,219 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+def make_cache_key(namespace, model_version, params, lowercase=()):
+    """
+    Build a cache key from normalized request parameters
+
+    Parameter names are sorted and values stripped, so equivalent requests
+    share an entry. The model version is part of the key: once the model is
+    retrained or updated, old entries are simply never asked for again.
+
+    Args:
+        namespace (str): Endpoint name or path
+        model_version (str): Version of the model that produced the response
+        params (Mapping): Request parameters
+        lowercase (tuple): Parameters whose values are case-insensitive
+
+    Returns:
+        str: The cache key
+    """
+    items = []
+    for name in sorted(params):
+        value = str(params[name]).strip()
+        if name in lowercase:
+            value = value.lower()
+        items.append(f'{name}={value}')
+    digest = hashlib.sha1('&'.join(items).encode('utf-8')).hexdigest()
+    return f'{namespace}:{model_version}:{digest}'
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with a TTL and a memory bound
+
+    Values are bytes (serialized responses), so the memory bound counts the
+    actual payload sizes. The least recently used entries are evicted once
+    the total exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=300):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes (int): Upper bound on the total size of cached values
+            ttl (float): Seconds an entry stays valid
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Look up a value
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            bytes: The cached value, or None on a miss or an expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Store a value
+
+        Args:
+            key (str): Cache key
+            value (bytes): Value to cache; values larger than max_bytes are skipped
+        """
+        if len(value) > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._bytes += len(value)
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Get hit/miss counters and size
+
+        Returns:
+            dict: Cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': 'memory',
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+class RedisCache:
+    """
+    Cache backed by a Redis-compatible server
+
+    Shares entries across processes and hosts. The server enforces the TTL
+    and its own memory policy; URLs such as unix:///tmp/redis.sock reach a
+    local socket.
+    """
+
+    def __init__(self, url='redis://localhost:6379/0', ttl=300, prefix='movierec:'):
+        """
+        Connect to the server
+
+        Args:
+            url (str): Server URL
+            ttl (float): Seconds an entry stays valid
+            prefix (str): Prefix for every key written by this cache
+        """
+        if redis is None:
+            raise ImportError("The redis package is required for the Redis cache backend")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Look up a value, returning None on a miss"""
+        value = self.client.get(self.prefix + key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Store a value with the configured TTL"""
+        self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl)))
+
+    def clear(self):
+        """Drop every entry written with this cache's prefix"""
+        for key in self.client.scan_iter(f'{self.prefix}*'):
+            self.client.delete(key)
+
+    def stats(self):
+        """Get this process's hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': 'redis',
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+def create_cache(backend='memory', max_bytes=64 * 1024 * 1024, ttl=300, url=None):
+    """
+    Create a response cache
+
+    Args:
+        backend (str): 'memory' for the in-process LRU, 'redis' for a shared server
+        max_bytes (int): Memory bound of the in-process cache
+        ttl (float): Seconds an entry stays valid
+        url (str): Server URL for the redis backend
+
+    Returns:
+        LRUCache or RedisCache: The cache
+    """
+    if backend == 'memory':
+        return LRUCache(max_bytes=max_bytes, ttl=ttl)
+    if backend == 'redis':
+        return RedisCache(url=url or 'redis://localhost:6379/0', ttl=ttl)
+    raise ValueError(f"Unknown cache backend '{backend}'")
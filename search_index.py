@@ -0,0 +1,396 @@
+import re
+import unicodedata
+import numpy as np
+
+from model_artifacts import encode_strings
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Relevance weights of a query token matching a title or a genre token
+TITLE_WEIGHT = 2.0
+GENRE_WEIGHT = 1.0
+# Score multiplier for a prefix match relative to an exact token match
+PREFIX_FACTOR = 0.5
+# Leading bytes of every autocomplete key kept in a fixed-width sorted array
+KEY_HEAD_BYTES = 16
+
+
+def normalize(text):
+    """
+    Lower-case text and strip accents so 'Amélie' matches 'amelie'
+
+    Args:
+        text (str): Text to normalize
+
+    Returns:
+        str: Normalized text
+    """
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    """
+    Split text into normalized alphanumeric tokens
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: Tokens in order of appearance
+    """
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class SearchIndex:
+    """
+    Inverted index over movie title and genre tokens
+
+    Every normalized token maps to a sorted posting list of catalogue
+    positions. A query intersects the posting lists of its tokens, starting
+    with the shortest, so the work depends on the size of the lists touched
+    rather than on the catalogue size. The last query token also matches as a
+    prefix, which keeps partially typed words useful.
+
+    The postings are stored as flat arrays (a sorted token array plus
+    CSR-style offsets into one positions array), so a saved model can
+    memory-map them instead of tokenizing every title again on load.
+    """
+
+    ARRAY_NAMES = ('title_tokens', 'title_offsets', 'title_positions',
+                   'genre_tokens', 'genre_offsets', 'genre_positions')
+
+    def __init__(self, titles, genres):
+        """
+        Build the index
+
+        Args:
+            titles (array-like): Movie titles by catalogue position
+            genres (array-like): Pipe-joined genres by catalogue position
+        """
+        self.title_tokens, self.title_offsets, self.title_positions = self._build_postings(titles)
+        self.genre_tokens, self.genre_offsets, self.genre_positions = self._build_postings(genres)
+        self._build_vocabulary()
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix):
+        """
+        Rebuild an index from arrays written by to_arrays
+
+        Args:
+            arrays (dict): Arrays keyed by name (may be memory-mapped)
+            prefix (str): Name prefix used when saving
+
+        Returns:
+            SearchIndex: The index, without re-tokenizing any text
+        """
+        self = cls.__new__(cls)
+        for name in cls.ARRAY_NAMES:
+            setattr(self, name, arrays[f'{prefix}.{name}'])
+        self._build_vocabulary()
+        return self
+
+    def to_arrays(self, prefix):
+        """
+        Get the index as named arrays for a model artifact
+
+        Args:
+            prefix (str): Name prefix for the arrays
+
+        Returns:
+            dict: Arrays keyed by name
+        """
+        return {f'{prefix}.{name}': getattr(self, name) for name in self.ARRAY_NAMES}
+
+    def _build_vocabulary(self):
+        """Token lookup tables and the sorted vocabulary for prefix expansion"""
+        self._title_ids = {token: i for i, token in enumerate(self.title_tokens.tolist())}
+        self._genre_ids = {token: i for i, token in enumerate(self.genre_tokens.tolist())}
+        self.vocabulary = np.union1d(self.title_tokens, self.genre_tokens)
+
+    @staticmethod
+    def _build_postings(texts):
+        """Sorted unique tokens, posting offsets and the positions of the texts containing them"""
+        tokens = []
+        positions = []
+        for position, text in enumerate(texts):
+            for token in set(tokenize(text)):
+                tokens.append(token)
+                positions.append(position)
+
+        # Tokens are [a-z0-9]+, so they fit a byte-string array
+        tokens, token_ids = np.unique(np.asarray(tokens, dtype='S'), return_inverse=True)
+        order = np.argsort(token_ids, kind='stable')
+        offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(token_ids, minlength=len(tokens)), out=offsets[1:])
+        return tokens, offsets, np.asarray(positions, dtype=np.int64)[order]
+
+    def _expand_prefix(self, prefix):
+        """Vocabulary tokens starting with prefix"""
+        start = np.searchsorted(self.vocabulary, prefix)
+        stop = np.searchsorted(self.vocabulary, prefix + b'\xff')
+        return self.vocabulary[start:stop].tolist()
+
+    def _token_matches(self, token, allow_prefix):
+        """
+        Posting lists and per-position scores for one query token
+
+        Returns:
+            tuple: (positions, scores) for every movie the token matches
+        """
+        variants = [(token, 1.0)]
+        if allow_prefix:
+            variants += [(other, PREFIX_FACTOR) for other in self._expand_prefix(token) if other != token]
+
+        positions = []
+        scores = []
+        for variant, factor in variants:
+            for token_ids, offsets, postings, weight in (
+                    (self._title_ids, self.title_offsets, self.title_positions, TITLE_WEIGHT),
+                    (self._genre_ids, self.genre_offsets, self.genre_positions, GENRE_WEIGHT)):
+                if variant in token_ids:
+                    start, stop = offsets[token_ids[variant]:token_ids[variant] + 2]
+                    positions.append(postings[start:stop])
+                    scores.append(np.full(stop - start, weight * factor))
+
+        if not positions:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Keep the best way each movie matched this token
+        positions = np.concatenate(positions)
+        scores = np.concatenate(scores)
+        order = np.lexsort((-scores, positions))
+        positions, scores = positions[order], scores[order]
+        first = np.ones(len(positions), dtype=bool)
+        first[1:] = positions[1:] != positions[:-1]
+        return positions[first], scores[first]
+
+    def search(self, query, n_results=10):
+        """
+        Find the movies matching every token of the query
+
+        Args:
+            query (str): Free-text query
+            n_results (int): Maximum number of results
+
+        Returns:
+            ndarray: Catalogue positions ordered by relevance, then catalogue order
+        """
+        tokens = [token.encode('ascii') for token in tokenize(query)]
+        if not tokens:
+            return np.empty(0, dtype=np.int64)
+
+        matches = [
+            self._token_matches(token, allow_prefix=(i == len(tokens) - 1))
+            for i, token in enumerate(tokens)
+        ]
+        matches.sort(key=lambda match: len(match[0]))
+
+        # Intersect from the shortest posting list up
+        candidates = matches[0][0]
+        for positions, _ in matches[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, positions, assume_unique=True)
+        if not len(candidates):
+            return candidates
+
+        relevance = np.zeros(len(candidates))
+        for positions, scores in matches:
+            relevance += scores[np.searchsorted(positions, candidates)]
+
+        order = np.lexsort((candidates, -relevance))
+        return candidates[order[:n_results]]
+
+
+class TitleAutocomplete:
+    """
+    Typeahead index over normalized movie titles
+
+    Every title is stored once per word start ('the matrix', 'matrix'), so a
+    prefix can match any word of the title. The keys live in one sorted array
+    and the movies under a prefix form a contiguous range found by binary
+    search. For short prefixes, whose ranges are large, the most popular
+    movies are precomputed per prefix node; longer prefixes have small ranges
+    that are ranked on the fly.
+
+    Keys and prefix nodes are flat arrays, so a saved model can memory-map
+    them. The binary search runs on the first KEY_HEAD_BYTES of every key and
+    only falls back to the full keys for longer prefixes.
+    """
+
+    ARRAY_NAMES = ('key_heads', 'key_offsets', 'key_blob', 'positions',
+                   'cache_prefixes', 'cache_top')
+
+    def __init__(self, titles, popularity, cache_depth=4, cache_size=10):
+        """
+        Build the index
+
+        Args:
+            titles (array-like): Movie titles by catalogue position
+            popularity (array-like): Ranking weight (e.g. rating count) by catalogue position
+            cache_depth (int): Longest prefix whose top movies are precomputed
+            cache_size (int): Number of movies precomputed per prefix node
+        """
+        self.cache_depth = cache_depth
+        self.cache_size = cache_size
+
+        entries = []
+        for position, title in enumerate(titles):
+            tokens = tokenize(title)
+            for start in range(len(tokens)):
+                entries.append((' '.join(tokens[start:]), position))
+        entries.sort()
+
+        # Keys are ASCII (tokens are [a-z0-9]+), so byte order is string order
+        keys = [key for key, _ in entries]
+        self.key_heads = np.asarray([key[:KEY_HEAD_BYTES] for key in keys], dtype=f'S{KEY_HEAD_BYTES}')
+        self.key_offsets, self.key_blob = encode_strings(keys)
+        self.positions = np.asarray([position for _, position in entries], dtype=np.int64)
+        self.set_popularity(popularity)
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix, popularity):
+        """
+        Rebuild an index from arrays written by to_arrays
+
+        Args:
+            arrays (dict): Arrays keyed by name (may be memory-mapped)
+            prefix (str): Name prefix used when saving
+            popularity (array-like): The ranking weights the index was saved with
+
+        Returns:
+            TitleAutocomplete: The index, without re-tokenizing any title
+        """
+        self = cls.__new__(cls)
+        for name in cls.ARRAY_NAMES:
+            setattr(self, name, arrays[f'{prefix}.{name}'])
+        self.cache_depth = self.cache_prefixes.dtype.itemsize
+        self.cache_size = self.cache_top.shape[1]
+        self.popularity = np.array(popularity, dtype=np.float64)
+        self._build_node_lookup()
+        return self
+
+    def to_arrays(self, prefix):
+        """
+        Get the index as named arrays for a model artifact
+
+        Args:
+            prefix (str): Name prefix for the arrays
+
+        Returns:
+            dict: Arrays keyed by name
+        """
+        return {f'{prefix}.{name}': getattr(self, name) for name in self.ARRAY_NAMES}
+
+    def set_popularity(self, popularity):
+        """
+        Replace the ranking weights and recompute the per-prefix top movies
+
+        Args:
+            popularity (array-like): Ranking weight by catalogue position
+        """
+        self.popularity = np.array(popularity, dtype=np.float64)
+        self.cache_prefixes, self.cache_top = self._build_cache()
+        self._build_node_lookup()
+
+    def _build_node_lookup(self):
+        """Map every cached prefix to its row of cache_top"""
+        self._nodes = {prefix: node for node, prefix in enumerate(self.cache_prefixes.tolist())}
+
+    def _rank(self, positions, n):
+        """Distinct positions ordered by popularity, then catalogue order"""
+        positions = np.unique(positions)
+        order = np.lexsort((positions, -self.popularity[positions]))
+        return positions[order[:n]]
+
+    def _build_cache(self):
+        """Top movies of every prefix up to cache_depth characters"""
+        depth = self.cache_depth
+        prefixes = [np.empty(0, dtype=f'S{depth}')]
+        tops = [np.empty((0, self.cache_size), dtype=np.int64)]
+
+        # Leading bytes of every key, zero-padded to cache_depth
+        lengths = np.diff(self.key_offsets)
+        columns = np.arange(depth)
+        lead = np.zeros((len(lengths), depth), dtype=np.uint8)
+        filled = columns < lengths[:, None]
+        lead[filled] = np.asarray(self.key_blob)[(self.key_offsets[:-1, None] + columns)[filled]]
+
+        # Rank every movie once by popularity, then catalogue order
+        n_movies = len(self.popularity)
+        by_popularity = np.lexsort((np.arange(n_movies), -self.popularity))
+        popularity_rank = np.empty(n_movies, dtype=np.int64)
+        popularity_rank[by_popularity] = np.arange(n_movies)
+
+        for length in range(1, depth + 1):
+            keys = np.flatnonzero(lengths >= length)
+            if not len(keys):
+                continue
+            key_prefixes = lead[keys]
+            key_prefixes[:, length:] = 0
+            key_prefixes = np.ascontiguousarray(key_prefixes).view(f'S{depth}').ravel()
+
+            # Keys sharing a prefix are contiguous, so every node is one run
+            new_node = np.ones(len(keys), dtype=bool)
+            new_node[1:] = key_prefixes[1:] != key_prefixes[:-1]
+            node_starts = np.flatnonzero(new_node)
+            node_of_key = np.cumsum(new_node) - 1
+
+            # Distinct movies per node, most popular first
+            pairs = np.sort(node_of_key * n_movies + popularity_rank[self.positions[keys]])
+            pairs = pairs[np.append(True, pairs[1:] != pairs[:-1])]
+            nodes, positions = pairs // n_movies, by_popularity[pairs % n_movies]
+            rank = np.arange(len(nodes)) - np.searchsorted(nodes, nodes)
+            kept = rank < self.cache_size
+            top = np.full((len(node_starts), self.cache_size), -1, dtype=np.int64)
+            top[nodes[kept], rank[kept]] = positions[kept]
+
+            prefixes.append(key_prefixes[node_starts])
+            tops.append(top)
+
+        return np.concatenate(prefixes), np.concatenate(tops)
+
+    def _bisect(self, key, start, stop):
+        """First position in [start, stop) whose key is not less than key"""
+        while start < stop:
+            middle = (start + stop) // 2
+            if self.key_blob[self.key_offsets[middle]:self.key_offsets[middle + 1]].tobytes() < key:
+                start = middle + 1
+            else:
+                stop = middle
+        return start
+
+    def complete(self, prefix, n=10):
+        """
+        Get the most popular movies with a title word starting with prefix
+
+        Args:
+            prefix (str): Typed text; earlier words must match in order
+            n (int): Maximum number of suggestions
+
+        Returns:
+            ndarray: Catalogue positions ordered by popularity
+        """
+        prefix = ' '.join(tokenize(prefix)).encode('ascii')
+        if not prefix:
+            return np.empty(0, dtype=np.int64)
+
+        if n <= self.cache_size and len(prefix) <= self.cache_depth:
+            node = self._nodes.get(prefix)
+            if node is None:
+                return np.empty(0, dtype=np.int64)
+            top = self.cache_top[node, :n]
+            return top[top >= 0]
+
+        if len(prefix) < KEY_HEAD_BYTES:
+            start = self.key_heads.searchsorted(prefix)
+            stop = self.key_heads.searchsorted(prefix + b'\xff')
+        else:
+            # Heads are truncated; compare the full keys among those sharing one
+            head = prefix[:KEY_HEAD_BYTES]
+            start = self.key_heads.searchsorted(head)
+            stop = self.key_heads.searchsorted(head, side='right')
+            start = self._bisect(prefix, start, stop)
+            stop = self._bisect(prefix + b'\xff', start, stop)
+        return self._rank(self.positions[start:stop], n)
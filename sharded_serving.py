@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Sharded scatter-gather serving for large catalogues
+
+The catalogue is hash-partitioned by movieId % n_shards. Every shard holds
+only its movies: their item factors and rating-matrix columns (collaborative
+filtering), TF-IDF genre rows (content-based filtering) and catalogue
+columns (response dicts). The coordinator holds only the user factors.
+
+A query is scattered to every shard, each shard returns its local top-K
+already hydrated, and the coordinator merges the sorted lists with a heap.
+Ties are broken by global catalogue (or rating-matrix column) position, as
+ranking.top_k does, so results equal those of the single-process
+MovieRecommendationSystem.
+
+Shards run as local worker processes connected by pipes, or as socket
+servers (multiprocessing.connection) that can live on other machines:
+
+    python sharded_serving.py build --shards 4 --output shards
+    python sharded_serving.py serve --shard shards/shard-0 --port 6000 --authkey secret
+"""
+
+import argparse
+import heapq
+import itertools
+import os
+import threading
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from model_artifacts import (
+    save_artifact, load_artifact, frame_to_arrays, arrays_to_frame, csr_to_arrays, arrays_to_csr
+)
+from movie_catalogue import MovieCatalogue
+from ranking import top_k
+
+# Shard methods a coordinator may call
+SHARD_METHODS = ('describe', 'content_vector', 'content_top_k', 'cf_top_k')
+
+
+def shard_of(movie_ids, n_shards):
+    """Shard number of each movie"""
+    return np.asarray(movie_ids) % n_shards
+
+
+def build_shards(recommender, n_shards, output_dir):
+    """
+    Split a fitted model into shard artifacts plus a coordinator artifact
+
+    Args:
+        recommender (MovieRecommendationSystem): Fitted model
+        n_shards (int): Number of shards
+        output_dir (str): Directory receiving coordinator/ and shard-<i>/
+
+    Returns:
+        list: Paths of the shard artifacts
+    """
+    catalogue_shards = shard_of(recommender.catalogue.movie_ids, n_shards)
+    column_ids = recommender.user_movie_matrix.columns.to_numpy()
+    column_shards = shard_of(column_ids, n_shards)
+    ratings_by_column = recommender.sparse_matrix.tocsc()
+    genre_matrix = recommender.genre_matrix.tocsr().astype(np.float32)
+
+    paths = []
+    for shard in range(n_shards):
+        positions = np.flatnonzero(catalogue_shards == shard)
+        columns = np.flatnonzero(column_shards == shard)
+        movie_arrays, movie_columns = frame_to_arrays(
+            recommender.movies_df.iloc[positions].reset_index(drop=True), 'movies'
+        )
+        arrays = {
+            **movie_arrays,
+            'movie_positions': positions,
+            **csr_to_arrays(genre_matrix[positions], 'genre_matrix'),
+            'cf_movie_ids': column_ids[columns],
+            'cf_columns': columns,
+            'item_factors': np.ascontiguousarray(recommender.movie_features[:, columns]),
+            **csr_to_arrays(ratings_by_column[:, columns].tocsr(), 'seen')
+        }
+        path = os.path.join(output_dir, f'shard-{shard}')
+        save_artifact(path, arrays, {'kind': 'shard', 'shard': shard, 'n_shards': n_shards,
+                                     'movies_columns': movie_columns})
+        paths.append(path)
+
+    save_artifact(os.path.join(output_dir, 'coordinator'), {
+        'user_ids': recommender.user_movie_matrix.index.to_numpy(),
+        'user_features': recommender.user_features
+    }, {'kind': 'coordinator', 'n_shards': n_shards})
+    return paths
+
+
+class Shard:
+    """One partition of the catalogue, answering local top-K queries"""
+
+    def __init__(self, path, mmap=True):
+        """
+        Load a shard artifact
+
+        Args:
+            path (str): Shard artifact directory
+            mmap (bool): Memory-map the arrays read-only
+        """
+        arrays, manifest = load_artifact(path, mmap_mode='r' if mmap else None)
+        metadata = manifest['metadata']
+        self.shard = metadata['shard']
+        self.n_shards = metadata['n_shards']
+        self.catalogue = MovieCatalogue(arrays_to_frame(arrays, 'movies', metadata['movies_columns']))
+        self.movie_positions = arrays['movie_positions']
+        self.genre_matrix = arrays_to_csr(arrays, 'genre_matrix')
+        self.cf_movie_ids = arrays['cf_movie_ids']
+        self.cf_columns = arrays['cf_columns']
+        self.item_factors = arrays['item_factors']
+        self.seen = arrays_to_csr(arrays, 'seen')
+
+    def describe(self):
+        """Shard number and sizes"""
+        return {'shard': self.shard, 'n_shards': self.n_shards,
+                'movies': len(self.catalogue), 'cf_movies': len(self.cf_movie_ids)}
+
+    def content_vector(self, movie_id):
+        """Genre vector of one of this shard's movies, or None if unknown"""
+        position = self.catalogue.position(movie_id)
+        if position is None:
+            return None
+        return self.genre_matrix[position]
+
+    def content_top_k(self, query, k, exclude_movie_id=None):
+        """
+        Local movies most similar to a genre vector
+
+        Args:
+            query (csr_matrix): 1 x vocabulary genre vector
+            k (int): Number of results
+            exclude_movie_id (int): Movie to leave out (the query movie)
+
+        Returns:
+            list: (-score, global position, movie dict) tuples, best first
+        """
+        scores = np.asarray(self.genre_matrix @ query.T.toarray()).ravel()
+        excluded = self.catalogue.position(exclude_movie_id)
+        if excluded is not None:
+            scores[excluded] = -np.inf
+
+        top = top_k(scores, k)
+        # Movies sharing no genres are not neighbours
+        top = top[scores[top] > 0]
+        records = self.catalogue.hydrate_positions(
+            top, similarity_score=np.round(scores[top].astype(np.float64), 3)
+        )
+        return list(zip((-scores[top]).tolist(), self.movie_positions[top].tolist(), records))
+
+    def cf_top_k(self, user_row, user_vector, k):
+        """
+        Local unrated movies with the highest predicted rating
+
+        Args:
+            user_row (int): Row of the user in the rating matrix
+            user_vector (ndarray): The user's factors
+            k (int): Number of results
+
+        Returns:
+            list: (-score, global column, movie dict or None) tuples, best
+                first; movies missing from the catalogue have no dict
+        """
+        scores = user_vector @ self.item_factors
+        seen = self.seen.indices[self.seen.indptr[user_row]:self.seen.indptr[user_row + 1]]
+        scores[seen] = -np.inf
+
+        top = top_k(scores, min(k, len(scores) - len(seen)))
+        positions = self.catalogue.positions(self.cf_movie_ids[top])
+        known = positions >= 0
+        hydrated = iter(self.catalogue.hydrate_positions(
+            positions[known], predicted_rating=np.round(scores[top][known].astype(np.float64), 2)
+        ))
+        records = [next(hydrated) if is_known else None for is_known in known.tolist()]
+        return list(zip((-scores[top]).tolist(), self.cf_columns[top].tolist(), records))
+
+
+def _serve_connection(connection, shard):
+    """Answer one coordinator's requests until it disconnects or says stop"""
+    while True:
+        try:
+            method, args = connection.recv()
+        except (EOFError, OSError):
+            break
+        if method == 'stop':
+            break
+        if method not in SHARD_METHODS:
+            connection.send(('error', f"Unknown shard method '{method}'"))
+            continue
+        try:
+            connection.send(('ok', getattr(shard, method)(*args)))
+        except Exception as e:
+            connection.send(('error', f"{type(e).__name__}: {e}"))
+    connection.close()
+
+
+def _run_pipe_worker(connection, path, mmap):
+    """Entry point of a local shard process"""
+    try:
+        shard = Shard(path, mmap)
+    except Exception as e:
+        connection.send(('error', f"{type(e).__name__}: {e}"))
+        return
+    connection.send(('ok', shard.describe()))
+    _serve_connection(connection, shard)
+
+
+def serve_shard(path, address, authkey, mmap=True):
+    """
+    Serve a shard over a socket, one thread per coordinator connection
+
+    Args:
+        path (str): Shard artifact directory
+        address (tuple): (host, port) to listen on
+        authkey (bytes): Shared secret coordinators must present
+        mmap (bool): Memory-map the arrays read-only
+    """
+    shard = Shard(path, mmap)
+    with Listener(address, authkey=authkey) as listener:
+        print(f"Shard {shard.shard}/{shard.n_shards} listening on {listener.address}")
+        while True:
+            connection = listener.accept()
+            threading.Thread(target=_serve_connection, args=(connection, shard), daemon=True).start()
+
+
+class ShardedRecommender:
+    """
+    Coordinator that scatters queries to the shards and merges their top-K
+
+    Requests are sent to every shard before any reply is read, so the shards
+    score in parallel. Connections are shared, so one query at a time is in
+    flight; run one coordinator per serving thread for more concurrency.
+    """
+
+    def __init__(self, shard_dir, connections, processes=()):
+        """
+        Use already connected shards; see start_local() and connect()
+
+        Args:
+            shard_dir (str): Directory written by build_shards
+            connections (list): One connection per shard, in shard order
+            processes (list): Local shard processes to stop on close()
+        """
+        arrays, manifest = load_artifact(os.path.join(shard_dir, 'coordinator'))
+        self.n_shards = manifest['metadata']['n_shards']
+        if len(connections) != self.n_shards:
+            raise ValueError(f"Expected {self.n_shards} shard connections, got {len(connections)}")
+        self.user_index = {user_id: row for row, user_id in enumerate(arrays['user_ids'].tolist())}
+        self.user_features = arrays['user_features']
+        self.connections = list(connections)
+        self.processes = list(processes)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def start_local(cls, shard_dir, mmap=True):
+        """
+        Start one worker process per shard, connected by pipes
+
+        Args:
+            shard_dir (str): Directory written by build_shards
+            mmap (bool): Memory-map the shard arrays in the workers
+
+        Returns:
+            ShardedRecommender: The coordinator
+        """
+        _, manifest = load_artifact(os.path.join(shard_dir, 'coordinator'))
+        connections, processes = [], []
+        for shard in range(manifest['metadata']['n_shards']):
+            parent, child = Pipe()
+            process = Process(target=_run_pipe_worker, name=f'shard-{shard}', daemon=True,
+                              args=(child, os.path.join(shard_dir, f'shard-{shard}'), mmap))
+            process.start()
+            child.close()
+            connections.append(parent)
+            processes.append(process)
+
+        for shard, connection in enumerate(connections):
+            status, result = connection.recv()
+            if status != 'ok':
+                for process in processes:
+                    process.terminate()
+                raise RuntimeError(f"Shard {shard} failed to start: {result}")
+        return cls(shard_dir, connections, processes)
+
+    @classmethod
+    def connect(cls, shard_dir, addresses, authkey):
+        """
+        Connect to shards served with serve_shard()
+
+        Args:
+            shard_dir (str): Directory holding the coordinator artifact
+            addresses (list): (host, port) of every shard, in shard order
+            authkey (bytes): Shared secret of the shard servers
+
+        Returns:
+            ShardedRecommender: The coordinator
+        """
+        return cls(shard_dir, [Client(address, authkey=authkey) for address in addresses])
+
+    def _scatter(self, method, args, shards=None):
+        """Send a request to shards and gather their replies in shard order"""
+        shards = range(self.n_shards) if shards is None else shards
+        with self._lock:
+            for shard in shards:
+                self.connections[shard].send((method, args))
+            replies = [self.connections[shard].recv() for shard in shards]
+        for shard, (status, result) in zip(shards, replies):
+            if status != 'ok':
+                raise RuntimeError(f"Shard {shard} failed: {result}")
+        return [result for _, result in replies]
+
+    @staticmethod
+    def _merge(shard_results, k):
+        """Merge sorted per-shard (-score, position, record) lists into the global top k"""
+        merged = heapq.merge(*shard_results, key=lambda item: (item[0], item[1]))
+        return [record for _, _, record in itertools.islice(merged, k)]
+
+    def collaborative_filtering_recommendations(self, user_id, n_recommendations=5):
+        """
+        Get collaborative filtering recommendations from every shard
+
+        Args:
+            user_id (int): User ID to get recommendations for
+            n_recommendations (int): Number of recommendations to return
+
+        Returns:
+            list: List of recommended movies with predicted ratings
+        """
+        user_row = self.user_index.get(user_id)
+        if user_row is None:
+            return []
+        results = self._scatter('cf_top_k', (user_row, self.user_features[user_row], n_recommendations))
+        return [record for record in self._merge(results, n_recommendations) if record is not None]
+
+    def content_based_recommendations(self, movie_id, n_recommendations=5):
+        """
+        Get content-based recommendations from every shard
+
+        Args:
+            movie_id (int): Movie ID to find similar movies for
+            n_recommendations (int): Number of recommendations to return
+
+        Returns:
+            list: List of similar movies with similarity scores
+        """
+        owner = int(shard_of(movie_id, self.n_shards))
+        query = self._scatter('content_vector', (movie_id,), [owner])[0]
+        if query is None:
+            return []
+        results = self._scatter('content_top_k', (query, n_recommendations, movie_id))
+        return self._merge(results, n_recommendations)
+
+    def describe(self):
+        """Sizes of every shard"""
+        return self._scatter('describe', ())
+
+    def close(self):
+        """Disconnect from the shards and stop local shard processes"""
+        for connection in self.connections:
+            try:
+                connection.send(('stop', ()))
+                connection.close()
+            except (OSError, ValueError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.connections, self.processes = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or serve catalogue shards")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Fit the model and split it into shards")
+    build.add_argument("--movies", default="data/movies.csv", help="Path to movies CSV file")
+    build.add_argument("--ratings", default="data/ratings.csv", help="Path to ratings CSV file")
+    build.add_argument("--cf-engine", default="nmf", choices=["nmf", "als", "implicit-als"],
+                       help="Collaborative filtering engine")
+    build.add_argument("--shards", type=int, default=4, help="Number of shards")
+    build.add_argument("--output", default="shards", help="Directory to write the shards to")
+
+    serve = commands.add_parser('serve', help="Serve one shard over a socket")
+    serve.add_argument("--shard", required=True, help="Shard artifact directory")
+    serve.add_argument("--host", default="localhost", help="Interface to listen on")
+    serve.add_argument("--port", type=int, required=True, help="Port to listen on")
+    serve.add_argument("--authkey", default=os.environ.get('SHARD_AUTHKEY'),
+                       help="Shared secret of shards and coordinator (default: $SHARD_AUTHKEY)")
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        from recommendation_system import MovieRecommendationSystem
+        recommender = MovieRecommendationSystem(args.movies, args.ratings, cf_engine=args.cf_engine)
+        paths = build_shards(recommender, args.shards, args.output)
+        print(f"💾 Wrote {len(paths)} shards and the coordinator to {args.output}")
+    else:
+        if not args.authkey:
+            parser.error("--authkey or SHARD_AUTHKEY is required")
+        serve_shard(args.shard, (args.host, args.port), args.authkey.encode())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,178 @@
-import streamlit as st
-from recommendation_system import MovieRecommendationSystem
+from flask import Flask, render_template, request, jsonify, g
+from recommendation_system import MovieRecommendationSystem, ModelNotReadyError
+from response_cache import create_cache, make_cache_key
+from model_refresher import ModelRefresher
+from topk_store import TopKStore
+from instrumentation import metrics
+import functools
 import json
+import math
+import os
+import time
 
 app = Flask(__name__)
 
+# Per-stage and per-endpoint timings, served at /metrics (METRICS_ENABLED=0 turns them off)
+if os.environ.get('METRICS_ENABLED', '1') == '1':
+    metrics.enable()
+
+# Set MODEL_PATH to a saved model to memory-map it instead of fitting, so
+# all worker processes share one copy of the model arrays
+MODEL_PATH = os.environ.get('MODEL_PATH')
+
+# When fitting, the model is built in the background by default (MODEL_INIT=eager
+# blocks instead); search and popular movies serve before CF is trained
+MODEL_INIT = os.environ.get('MODEL_INIT', 'background')
+
 # Initialize the recommendation system
 try:
-    recommender = MovieRecommendationSystem()
-    st.success("Recommendation system initialized successfully!")
+    if MODEL_PATH:
+        recommender = MovieRecommendationSystem.load(MODEL_PATH, mmap=True)
+        print("Recommendation system initialized successfully!")
+    else:
+        recommender = MovieRecommendationSystem(cf_engine=os.environ.get('CF_ENGINE', 'nmf'),
+                                                background=(MODEL_INIT == 'background'))
+        if recommender.is_ready():
+            print("Recommendation system initialized successfully!")
+        else:
+            print("Recommendation system is initializing in the background; see /readyz")
 except Exception as e:
-    st.error(f"Error initializing recommendation system: {e}")
+    print(f"Error initializing recommendation system: {e}")
     recommender = None
 
+# Set TOPK_STORE_PATH to lists precomputed by topk_store.py for the model in
+# MODEL_PATH; collaborative requests are then answered by a memory-mapped row read
+TOPK_STORE_PATH = os.environ.get('TOPK_STORE_PATH')
+if recommender is not None and TOPK_STORE_PATH:
+    if MODEL_PATH:
+        recommender.attach_topk_store(TopKStore.load(TOPK_STORE_PATH, mmap=True))
+    else:
+        print("TOPK_STORE_PATH is only used together with MODEL_PATH; ignoring it")
+
+# Rebuild the model in the background when the data files change and swap it
+# in atomically; RETRAIN_CHECK_INTERVAL=0 disables it. Models loaded from
+# MODEL_PATH are rebuilt by build_model.py instead.
+model_refresher = None
+if recommender is not None:
+    model_refresher = ModelRefresher(
+        recommender,
+        cf_engine=os.environ.get('CF_ENGINE', 'nmf'),
+        mode=os.environ.get('RETRAIN_MODE', 'process'),
+        check_interval=float(os.environ.get('RETRAIN_CHECK_INTERVAL', 60)),
+        min_interval=float(os.environ.get('RETRAIN_MIN_INTERVAL', 600)),
+        niceness=int(os.environ.get('RETRAIN_NICENESS', 10))
+    )
+    if not MODEL_PATH and model_refresher.check_interval > 0:
+        model_refresher.start()
+
+def current_recommender():
+    """
+    Model serving this request
+    
+    The model is taken once per request and kept in g, so a retrained model
+    swapped in mid-request is only used by later requests.
+    """
+    if 'recommender' not in g:
+        if model_refresher is None:
+            g.recommender, g.model_info = recommender, None
+        else:
+            g.recommender, g.model_info = model_refresher.snapshot()
+    return g.recommender
+
+# Response cache; keys include the model version, so retraining invalidates it
+response_cache = create_cache(
+    backend=os.environ.get('CACHE_BACKEND', 'memory'),
+    max_bytes=int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    ttl=float(os.environ.get('CACHE_TTL', 300)),
+    url=os.environ.get('CACHE_URL')
+)
+
+def cached_response(lowercase=()):
+    """Serve successful JSON responses of a GET endpoint from the response cache"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            recommender = current_recommender()
+            if recommender is None:
+                return view(*args, **kwargs)
+            
+            key = make_cache_key(request.path, recommender.model_version, request.args, lowercase)
+            body = response_cache.get(key)
+            if body is not None:
+                return app.response_class(body, mimetype='application/json')
+            
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response_cache.set(key, response.get_data())
+            return response
+        return wrapper
+    return decorator
+
+@app.before_request
+def start_timer():
+    """Remember when the request started"""
+    if metrics.enabled:
+        g.request_start = time.perf_counter()
+
+@app.after_request
+def record_latency(response):
+    """Record the request latency under its route pattern"""
+    start = g.get('request_start')
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.observe('endpoint', endpoint, time.perf_counter() - start)
+    return response
+
+@app.after_request
+def add_model_headers(response):
+    """Tell clients which model answered the request"""
+    model = g.get('recommender')
+    if model is not None:
+        response.headers['X-Model-Version'] = model.model_version
+        info = g.get('model_info')
+        if info is not None and info['built_at'] is not None:
+            response.headers['X-Model-Built-At'] = time.strftime(
+                '%Y-%m-%dT%H:%M:%SZ', time.gmtime(info['built_at'])
+            )
+    return response
+
+@app.errorhandler(ModelNotReadyError)
+def model_not_ready(error):
+    """Answer 503 while the components an endpoint needs are still being built"""
+    recommender = current_recommender()
+    if error.init_error is not None:
+        return jsonify({"error": str(error), "components": recommender.readiness()}), 500
+    response = jsonify({"error": str(error), "components": recommender.readiness()})
+    response.status_code = 503
+    response.headers['Retry-After'] = '5'
+    return response
+
+@app.route('/healthz')
+def healthz():
+    """Liveness check: the process is up and the model build has not failed"""
+    recommender = current_recommender()
+    if recommender is None:
+        return jsonify({"status": "failed", "error": "Recommendation system not initialized"}), 500
+    components = recommender.readiness()
+    if components['error'] is not None:
+        return jsonify({"status": "failed", "components": components}), 500
+    return jsonify({"status": "ok", "components": components})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness check: 200 once every model component is built, 503 before"""
+    recommender = current_recommender()
+    if recommender is None:
+        return jsonify({"status": "failed", "error": "Recommendation system not initialized"}), 503
+    components = recommender.readiness()
+    if not components['ready']:
+        return jsonify({"status": "initializing", "components": components}), 503
+    return jsonify({"status": "ready", "components": components})
+
 @app.route('/')
 def index():
     """Main page with web interface"""
+    recommender = current_recommender()
     if recommender is None:
         return "Error: Recommendation system not initialized", 500
     
@@ -23,8 +181,10 @@ def index():
     return render_template('index.html', popular_movies=popular_movies)
 
 @app.route('/api/movies/search')
+@cached_response(('q',))
 def search_movies():
     """API endpoint to search movies"""
+    recommender = current_recommender()
     if recommender is None:
         return jsonify({"error": "Recommendation system not initialized"}), 500
     
@@ -35,9 +195,68 @@ def search_movies():
     results = recommender.search_movies(query, 10)
     return jsonify({"results": results})
 
+@app.route('/api/movies/filter')
+@cached_response()
+def filter_movies():
+    """API endpoint to find movies by genres and release years"""
+    recommender = current_recommender()
+    if recommender is None:
+        return jsonify({"error": "Recommendation system not initialized"}), 500
+    
+    # Genre lists are comma-separated, e.g. any_genres=Action,Comedy
+    genre_lists = {}
+    for name in ('any_genres', 'all_genres'):
+        value = request.args.get(name)
+        genre_lists[name] = [genre.strip() for genre in value.split(',') if genre.strip()] if value else None
+    
+    try:
+        years = {name: int(request.args[name]) if request.args.get(name) else None
+                 for name in ('year_min', 'year_max')}
+        n_results = int(request.args.get('n', 50))
+    except ValueError:
+        return jsonify({"error": "year_min, year_max and n must be integers"}), 400
+    if n_results < 1:
+        return jsonify({"error": "n parameter must be positive"}), 400
+    
+    movies = recommender.filter_movies(genre_lists['any_genres'], genre_lists['all_genres'],
+                                       years['year_min'], years['year_max'], n_results)
+    return jsonify({"movies": movies})
+
+@app.route('/api/genres')
+@cached_response()
+def genres():
+    """API endpoint with the number of movies per genre"""
+    recommender = current_recommender()
+    if recommender is None:
+        return jsonify({"error": "Recommendation system not initialized"}), 500
+    
+    genre_counts = recommender.get_genre_counts()
+    return jsonify({"genres": [{"genre": genre, "count": count} for genre, count in genre_counts.items()]})
+
+@app.route('/api/movies/autocomplete')
+def autocomplete_movies():
+    """API endpoint for title typeahead suggestions"""
+    recommender = current_recommender()
+    if recommender is None:
+        return jsonify({"error": "Recommendation system not initialized"}), 500
+    
+    prefix = request.args.get('prefix', '')
+    n_results = request.args.get('n', 10)
+    try:
+        n_results = int(n_results)
+    except ValueError:
+        return jsonify({"error": "n parameter must be an integer"}), 400
+    if n_results < 1:
+        return jsonify({"error": "n parameter must be positive"}), 400
+    
+    results = recommender.autocomplete(prefix, n_results)
+    return jsonify({"results": results})
+
 @app.route('/api/recommendations/content-based')
+@cached_response()
 def content_based_recommendations():
     """API endpoint for content-based recommendations"""
+    recommender = current_recommender()
     if recommender is None:
         return jsonify({"error": "Recommendation system not initialized"}), 500
     
@@ -53,8 +272,10 @@ def content_based_recommendations():
         return jsonify({"error": "movie_id must be an integer"}), 400
 
 @app.route('/api/recommendations/collaborative')
+@cached_response()
 def collaborative_recommendations():
     """API endpoint for collaborative filtering recommendations"""
+    recommender = current_recommender()
     if recommender is None:
         return jsonify({"error": "Recommendation system not initialized"}), 500
     
@@ -70,8 +291,10 @@ def collaborative_recommendations():
         return jsonify({"error": "user_id must be an integer"}), 400
 
 @app.route('/api/recommendations/hybrid')
+@cached_response()
 def hybrid_recommendations():
     """API endpoint for hybrid recommendations"""
+    recommender = current_recommender()
     if recommender is None:
         return jsonify({"error": "Recommendation system not initialized"}), 500
     
@@ -84,45 +307,124 @@ def hybrid_recommendations():
     try:
         user_id = int(user_id)
         movie_id = int(movie_id) if movie_id else None
-        recommendations = recommender.hybrid_recommendations(user_id, movie_id, 5)
-        return jsonify({"recommendations": recommendations})
     except ValueError:
         return jsonify({"error": "user_id and movie_id must be integers"}), 400
+    
+    try:
+        cf_weight = float(request.args.get('cf_weight', 0.6))
+        cb_weight = float(request.args.get('cb_weight', 0.4))
+    except ValueError:
+        return jsonify({"error": "cf_weight and cb_weight must be numbers"}), 400
+    # inf would turn the scores into NaN, which is not valid JSON
+    if not all(math.isfinite(weight) and weight >= 0 for weight in (cf_weight, cb_weight)):
+        return jsonify({"error": "cf_weight and cb_weight must be finite and non-negative"}), 400
+    
+    recommendations = recommender.hybrid_recommendations(user_id, movie_id, 5, cf_weight, cb_weight)
+    return jsonify({"recommendations": recommendations})
+
+@app.route('/api/recommendations/batch', methods=['POST'])
+def batch_recommendations():
+    """API endpoint for collaborative filtering recommendations for many users"""
+    recommender = current_recommender()
+    if recommender is None:
+        return jsonify({"error": "Recommendation system not initialized"}), 500
+    
+    payload = request.get_json(silent=True) or {}
+    user_ids = payload.get('user_ids')
+    if not isinstance(user_ids, list) or not user_ids:
+        return jsonify({"error": "user_ids must be a non-empty list"}), 400
+    
+    try:
+        user_ids = [int(user_id) for user_id in user_ids]
+        n_recommendations = int(payload.get('n', 5))
+        block_size = int(payload.get('block_size', 1024))
+    except (TypeError, ValueError):
+        return jsonify({"error": "user_ids, n and block_size must be integers"}), 400
+    
+    if n_recommendations < 1 or block_size < 1:
+        return jsonify({"error": "n and block_size must be positive"}), 400
+    
+    movie_ids, scores = recommender.recommend_batch(user_ids, n_recommendations, block_size)
+    results = []
+    for user_id, user_movie_ids, user_scores in zip(user_ids, movie_ids, scores):
+        found = user_movie_ids >= 0
+        results.append({
+            "userId": user_id,
+            "movieIds": user_movie_ids[found].tolist(),
+            "scores": [round(score, 4) for score in user_scores[found].astype(float).tolist()]
+        })
+    return jsonify({"results": results})
 
 @app.route('/api/movies/popular')
+@cached_response()
 def popular_movies():
     """API endpoint to get popular movies"""
+    recommender = current_recommender()
     if recommender is None:
         return jsonify({"error": "Recommendation system not initialized"}), 500
     
     n_movies = request.args.get('n', 10)
+    ranking = request.args.get('ranking', 'count')
+    if ranking not in ('count', 'bayesian'):
+        return jsonify({"error": "ranking must be 'count' or 'bayesian'"}), 400
+    
     try:
         n_movies = int(n_movies)
-        movies = recommender.get_popular_movies(n_movies)
-        return jsonify({"movies": movies})
     except ValueError:
         return jsonify({"error": "n parameter must be an integer"}), 400
+    if n_movies < 1:
+        return jsonify({"error": "n parameter must be positive"}), 400
+    
+    movies = recommender.get_popular_movies(n_movies, ranking)
+    return jsonify({"movies": movies})
+
+@app.route('/api/cache/stats')
+def cache_stats():
+    """API endpoint with response cache hit/miss counters"""
+    return jsonify(response_cache.stats())
+
+@app.route('/api/model')
+def model_status():
+    """API endpoint with the serving model's version, build time and retraining state"""
+    recommender = current_recommender()
+    if recommender is None:
+        return jsonify({"error": "Recommendation system not initialized"}), 500
+    
+    status = model_refresher.status()
+    status['components'] = recommender.readiness()
+    return jsonify(status)
+
+@app.route('/api/model/retrain', methods=['POST'])
+def retrain_model():
+    """API endpoint asking the scheduler for a rebuild (throttled by RETRAIN_MIN_INTERVAL)"""
+    if model_refresher is None or not model_refresher.running:
+        return jsonify({"error": "Background retraining is disabled"}), 409
+    
+    not_before = model_refresher.request_retrain()
+    return jsonify({"status": "scheduled", "not_before": not_before}), 202
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Latency histograms per endpoint and per stage in Prometheus text format"""
+    return app.response_class(metrics.render_prometheus(),
+                              content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/api/movies/<int:movie_id>')
 def get_movie(movie_id):
     """API endpoint to get movie information by ID"""
+    recommender = current_recommender()
     if recommender is None:
         return jsonify({"error": "Recommendation system not initialized"}), 500
     
-    try:
-        movie = recommender.get_movie_by_id(movie_id)
-        return jsonify({
-            "movieId": movie['movieId'],
-            "title": movie['title'],
-            "genres": movie['genres'],
-            "year": movie['year']
-        })
-    except IndexError:
+    movie = recommender.get_movie(movie_id)
+    if movie is None:
         return jsonify({"error": "Movie not found"}), 404
+    return jsonify(movie)
 
 @app.route('/recommendations')
 def recommendations_page():
     """Page for getting recommendations"""
+    recommender = current_recommender()
     if recommender is None:
         return "Error: Recommendation system not initialized", 500
     
@@ -131,6 +433,7 @@ def recommendations_page():
 @app.route('/search')
 def search_page():
     """Page for searching movies"""
+    recommender = current_recommender()
     if recommender is None:
         return "Error: Recommendation system not initialized", 500
     
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from recommendation_system import MovieRecommendationSystem
+
+MOVIES_PATH = os.path.join(ROOT, 'data', 'movies.csv')
+RATINGS_PATH = os.path.join(ROOT, 'data', 'ratings.csv')
+
+
+@pytest.fixture(scope='session')
+def movies_df():
+    return pd.read_csv(MOVIES_PATH)
+
+
+@pytest.fixture(scope='session')
+def ratings_df():
+    return pd.read_csv(RATINGS_PATH)
+
+
+@pytest.fixture(scope='session')
+def recommender():
+    """Model fitted on the sample data; tests must not modify it"""
+    return MovieRecommendationSystem(MOVIES_PATH, RATINGS_PATH)
+
+
+@pytest.fixture(scope='session')
+def client():
+    """Flask test client serving the sample data without background work"""
+    os.environ.setdefault('MODEL_INIT', 'eager')
+    os.environ.setdefault('RETRAIN_CHECK_INTERVAL', '0')
+    os.environ.pop('MODEL_PATH', None)
+    os.environ.pop('TOPK_STORE_PATH', None)
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        import streamlit_app
+    finally:
+        os.chdir(cwd)
+    return streamlit_app.app.test_client()
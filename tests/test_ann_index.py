@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ann_index import IVFIndex
+from recommendation_system import MovieRecommendationSystem
+
+
+def clustered_vectors(n_items=6000, dim=16, n_clusters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    vectors = centers[rng.integers(0, n_clusters, n_items)] + 0.3 * rng.normal(size=(n_items, dim))
+    return vectors.astype(np.float32), rng
+
+
+def recall(index, queries, k, n_probe):
+    hits = 0
+    for query in queries:
+        exact, _ = index.search_exact(query, k)
+        approximate, _ = index.search(query, k, n_probe=n_probe)
+        hits += len(np.intersect1d(exact, approximate))
+    return hits / (len(queries) * k)
+
+
+def test_recall_is_high_and_grows_with_n_probe():
+    vectors, rng = clustered_vectors()
+    index = IVFIndex(n_lists=64, n_probe=8).fit(vectors)
+    queries = vectors[rng.integers(0, len(vectors), 50)]
+
+    low, high = recall(index, queries, 10, 2), recall(index, queries, 10, 16)
+    assert high >= 0.9
+    assert high >= low
+    assert recall(index, queries, 10, 64) == 1.0
+
+
+def test_exact_search_matches_brute_force_and_honours_exclusions():
+    vectors, rng = clustered_vectors(n_items=500)
+    index = IVFIndex().fit(vectors)  # below brute_force_below
+    query = rng.normal(size=vectors.shape[1])
+    exclude = np.array([3, 7, 11])
+
+    positions, scores = index.search(query, 20, exclude=exclude)
+    expected = vectors @ query.astype(np.float32)
+    expected[exclude] = -np.inf
+    assert positions.tolist() == np.argsort(-expected, kind='stable')[:20].tolist()
+    np.testing.assert_allclose(scores, expected[positions], rtol=1e-5)
+
+
+def test_approximate_search_excludes_positions():
+    vectors, rng = clustered_vectors()
+    index = IVFIndex(n_lists=64, n_probe=8).fit(vectors)
+    query = vectors[0]
+    exact, _ = index.search_exact(query, 5)
+    positions, _ = index.search(query, 5, exclude=exact)
+    assert not set(positions) & set(exact)
+
+
+def test_added_items_are_searchable_and_out_of_range_exclusions_ignored():
+    vectors, rng = clustered_vectors()
+    index = IVFIndex(n_lists=64, n_probe=8).fit(vectors[:-10])
+    index.add(10 * vectors[-10:])
+    query = vectors[-1]
+
+    positions, _ = index.search(query, 5, n_probe=63, exclude=[len(vectors) + 5])
+    assert positions.tolist() == index.search_exact(query, 5)[0].tolist()
+    assert len(vectors) - 1 in positions.tolist()
+    positions, _ = index.search_exact(query, 3, exclude=[len(vectors) - 1, len(vectors) + 5])
+    assert len(vectors) - 1 not in positions.tolist()
+
+
+def test_recommender_ann_index_follows_added_movies(movies_df, ratings_df):
+    model = MovieRecommendationSystem.from_dataframes(movies_df, ratings_df)
+    model.build_ann_indexes()
+    unrated = movies_df.loc[~movies_df['movieId'].isin(ratings_df['movieId']), 'movieId'].iloc[0]
+
+    model.add_ratings(pd.DataFrame({'userId': [1], 'movieId': [unrated], 'rating': [4.0]}))
+    assert len(model.cf_ann_index.vectors) == model.movie_features.shape[1]
+
+    approximate = model.collaborative_filtering_recommendations(1, 5)
+    exact = model.collaborative_filtering_recommendations(1, 5, approximate=False)
+    assert [movie['movieId'] for movie in approximate] == [movie['movieId'] for movie in exact]
+
+
+def test_approximate_without_index_raises(recommender):
+    with pytest.raises(ValueError, match='build_ann_indexes'):
+        recommender.collaborative_filtering_recommendations(1, 5, approximate=True)
+    with pytest.raises(ValueError, match='build_ann_indexes'):
+        recommender.content_based_recommendations(1, 5, approximate=True)
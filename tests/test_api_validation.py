@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.mark.parametrize('n', ['0', '-3'])
+def test_popular_rejects_non_positive_n(client, n):
+    assert client.get(f'/api/movies/popular?n={n}').status_code == 400
+
+
+def test_popular_returns_n_movies(client):
+    assert len(client.get('/api/movies/popular?n=3').get_json()['movies']) == 3
+
+
+@pytest.mark.parametrize('n', ['0', '-1'])
+def test_autocomplete_rejects_non_positive_n(client, n):
+    assert client.get(f'/api/movies/autocomplete?prefix=to&n={n}').status_code == 400
+
+
+@pytest.mark.parametrize('n', ['0', '-2'])
+def test_filter_rejects_non_positive_n(client, n):
+    assert client.get(f'/api/movies/filter?any_genres=Drama&n={n}').status_code == 400
+
+
+def test_filter_matches_genres_exactly(client):
+    movies = client.get('/api/movies/filter?any_genres=Music&n=100').get_json()['movies']
+    assert movies
+    assert all('Music' in movie['genres'].split('|') for movie in movies)
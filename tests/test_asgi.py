@@ -0,0 +1,24 @@
+import asyncio
+import json
+
+import pytest
+
+from asgi_app import AsyncServer
+
+
+def test_error_body_is_valid_json_for_any_message():
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    error = 'Internal server error: bad "quote" and back\\slash'
+    asyncio.run(AsyncServer._send_error(send, 500, error))
+    assert messages[0]['status'] == 500
+    assert json.loads(messages[1]['body']) == {'error': error}
+
+
+def test_process_executor_requires_saved_model(monkeypatch):
+    monkeypatch.delenv('MODEL_PATH', raising=False)
+    with pytest.raises(RuntimeError):
+        AsyncServer(executor='process').start()
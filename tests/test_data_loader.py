@@ -0,0 +1,32 @@
+import os
+
+import numpy as np
+import pytest
+
+from data_loader import load_ratings, ratings_cache_path
+from model_artifacts import save_artifact
+from conftest import RATINGS_PATH
+
+
+def test_cache_leaves_unrelated_files_in_cache_dir(tmp_path, ratings_df):
+    (tmp_path / 'movies.csv').write_text('keep me')
+    (tmp_path / 'notes').mkdir()
+
+    first = load_ratings(RATINGS_PATH, cache_dir=str(tmp_path))
+    cached = load_ratings(RATINGS_PATH, cache_dir=str(tmp_path))
+
+    assert (tmp_path / 'movies.csv').read_text() == 'keep me'
+    assert (tmp_path / 'notes').is_dir()
+    assert os.path.isdir(ratings_cache_path(str(tmp_path), RATINGS_PATH))
+    assert len(cached) == len(first) == len(ratings_df.drop_duplicates(['userId', 'movieId']))
+    np.testing.assert_array_equal(cached['rating'], first['rating'])
+
+
+def test_save_artifact_refuses_to_replace_unrelated_directory(tmp_path):
+    (tmp_path / 'data.csv').write_text('keep me')
+    with pytest.raises(ValueError):
+        save_artifact(str(tmp_path), {'x': np.arange(3)})
+    assert (tmp_path / 'data.csv').read_text() == 'keep me'
+
+    save_artifact(str(tmp_path / 'artifact'), {'x': np.arange(3)})
+    save_artifact(str(tmp_path / 'artifact'), {'x': np.arange(4)})
@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+
+from evaluation import time_split
+
+
+def test_time_split_uses_the_higher_quantile_as_cutoff():
+    timestamps = np.array([50, 10, 40, 20, 30, 30, 60, 70, 80, 90])
+    ratings = pd.DataFrame({'timestamp': timestamps, 'rating': 4.0})
+
+    train, test, cutoff = time_split(ratings, test_fraction=0.25)
+
+    # 0.75 * (10 - 1) = 6.75 rounds up to the 8th smallest timestamp
+    assert cutoff == np.sort(timestamps)[7] == 70
+    assert (test['timestamp'] >= cutoff).all() and (train['timestamp'] < cutoff).all()
+    assert len(train) + len(test) == len(ratings)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import nnls
+from scipy.sparse import csr_matrix
+
+from cf_engines import ALSEngine, fold_in_nonnegative
+from recommendation_system import MovieRecommendationSystem
+
+
+@pytest.fixture
+def model(movies_df, ratings_df):
+    """A fresh model per test, since adding ratings modifies it"""
+    return MovieRecommendationSystem.from_dataframes(movies_df, ratings_df)
+
+
+def test_nonnegative_fold_in_matches_exact_nnls(recommender):
+    ratings = recommender.sparse_matrix[:20]
+    item_factors = recommender.movie_features.astype(np.float64)
+    factors = fold_in_nonnegative(ratings, item_factors, n_iter=500)
+
+    assert (factors >= 0).all()
+    for row, user_factors in zip(ratings.toarray(), factors):
+        expected, _ = nnls(item_factors.T, row)
+        assert np.linalg.norm(row - user_factors @ item_factors) == pytest.approx(
+            np.linalg.norm(row - expected @ item_factors), rel=1e-4, abs=1e-6)
+
+
+def test_als_fold_in_solves_the_regularised_system():
+    rng = np.random.default_rng(0)
+    ratings = csr_matrix(np.where(rng.random((6, 30)) < 0.3, rng.integers(1, 6, (6, 30)), 0).astype(float))
+    item_factors = rng.normal(size=(4, 30)).astype(np.float32)
+    engine = ALSEngine(n_components=4, regularization=0.1)
+    factors = engine.fold_in(ratings, item_factors)
+
+    for row in range(ratings.shape[0]):
+        rated = ratings[row].indices
+        vectors = item_factors[:, rated].T.astype(np.float64)
+        system = vectors.T @ vectors + 0.1 * len(rated) * np.eye(4)
+        expected = np.linalg.solve(system, vectors.T @ ratings[row].data)
+        np.testing.assert_allclose(factors[row], expected, rtol=1e-4, atol=1e-5)
+
+
+def test_existing_user_fold_in_is_close_to_fitted_factors(model):
+    # NMF's own transform minimises the same objective, so re-folding a user
+    # in without new ratings must not make their reconstruction worse
+    user_idx = 0
+    row = model.sparse_matrix[user_idx].toarray().ravel()
+    fitted = model.user_features[user_idx]
+    folded = fold_in_nonnegative(model.sparse_matrix[user_idx], model.movie_features,
+                                 init=fitted[None, :])[0]
+    fitted_error = np.linalg.norm(row - fitted @ model.movie_features)
+    assert np.linalg.norm(row - folded @ model.movie_features) <= fitted_error * (1 + 1e-3)
+
+
+def test_new_user_is_folded_in_and_recommended(model):
+    rated = model.user_movie_matrix.columns[:5].tolist()
+    new_user = int(model.user_movie_matrix.index.max()) + 1
+    version = model.model_version
+    summary = model.add_ratings(pd.DataFrame({
+        'userId': [new_user] * len(rated), 'movieId': rated, 'rating': [5.0] * len(rated)
+    }))
+
+    assert summary == {'users_updated': 1, 'new_users': 1, 'new_movies': 0}
+    assert model.model_version != version
+    recommendations = model.collaborative_filtering_recommendations(new_user, 5)
+    assert len(recommendations) == 5
+    assert not {movie['movieId'] for movie in recommendations} & set(rated)
+
+
+def test_fold_in_agrees_with_refit_on_seen_movies(model):
+    # A user who copies another user's ratings gets that user's predictions
+    source = int(model.user_movie_matrix.index[0])
+    source_ratings = model.ratings_df[model.ratings_df['userId'] == source]
+    copy = int(model.user_movie_matrix.index.max()) + 1
+    model.add_ratings(source_ratings.assign(userId=copy)[['userId', 'movieId', 'rating']])
+
+    folded = model.recommend_batch([copy], 5)[0][0]
+    model.refit()
+    refitted = model.recommend_batch([source], 5)[0][0]
+    assert len(set(folded) & set(refitted)) >= 3
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from recommendation_system import _scale_to_weight
+
+
+def test_scale_to_weight_uses_fixed_range_and_clips():
+    scores = np.array([-1.0, 0.0, 2.5, 5.0, 6.0])
+    np.testing.assert_allclose(_scale_to_weight(scores, 0.0, 5.0, 0.6), [0.0, 0.0, 0.3, 0.6, 0.6])
+
+
+def test_scale_to_weight_keeps_near_equal_scores_near_equal():
+    scores = _scale_to_weight(np.array([0.0010, 0.0026]), 0.0, 5.0, 0.6)
+    assert scores.max() - scores.min() < 1e-3
+
+
+@pytest.mark.parametrize('weights', [(float('inf'), 0.4), (0.6, float('nan')), (-0.1, 0.4)])
+def test_hybrid_rejects_invalid_weights(recommender, weights):
+    with pytest.raises(ValueError):
+        recommender.hybrid_recommendations(1, 1, 5, *weights)
+
+
+def test_hybrid_score_is_weighted_sum_on_fixed_scales(recommender):
+    low, high = recommender.cf_score_range
+    for movie in recommender.hybrid_recommendations(1, 1, 10, cf_weight=0.6, cb_weight=0.4):
+        expected = 0.6 * np.clip((movie['cf_score'] - low) / (high - low), 0, 1) + 0.4 * movie['cb_score']
+        assert movie['hybrid_score'] == pytest.approx(expected, abs=2e-3)
+
+
+def test_near_equal_cf_predictions_do_not_override_content(recommender):
+    # User 1's predictions differ by about 0.002 stars, so content decides
+    user_idx = recommender.user_movie_matrix.index.get_loc(1)
+    predictions = recommender.user_features[user_idx] @ recommender.movie_features
+    unseen = np.ones(len(predictions), dtype=bool)
+    unseen[recommender.user_movie_matrix.seen(user_idx)] = False
+    assert np.ptp(predictions[unseen]) < 0.01
+
+    hybrid = recommender.hybrid_recommendations(1, 1, 5)
+    content = recommender.content_based_recommendations(1, 5)
+    assert hybrid[0]['movieId'] == content[0]['movieId']
+    assert [movie['cb_score'] for movie in hybrid] == sorted((movie['cb_score'] for movie in hybrid), reverse=True)
+
+
+@pytest.mark.parametrize('query', ['cf_weight=inf', 'cb_weight=nan', 'cf_weight=-1', 'cf_weight=abc'])
+def test_hybrid_route_rejects_invalid_weights(client, query):
+    response = client.get(f'/api/recommendations/hybrid?user_id=1&movie_id=1&{query}')
+    assert response.status_code == 400
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from popularity import PopularityStats
+from recommendation_system import MovieRecommendationSystem
+
+
+def make_stats():
+    # Movie 0: 1 x 5.0, movie 1: 6 x 4.5, movie 2: unrated, movie 3: 2 x 2.0
+    positions = np.array([0, 1, 1, 1, 1, 1, 1, 3, 3, -1])
+    ratings = np.array([5.0, 4.5, 4.5, 4.5, 4.5, 4.5, 4.5, 2.0, 2.0, 1.0])
+    return PopularityStats.from_positions(4, positions, ratings)
+
+
+def test_aggregates_ignore_unknown_movies():
+    stats = make_stats()
+    assert stats.rating_count.tolist() == [1, 6, 0, 2]
+    assert stats.rating_sum.tolist() == [5.0, 27.0, 0.0, 4.0]
+
+
+def test_bayesian_average_shrinks_towards_the_global_mean():
+    stats = make_stats()
+    global_mean = 36.0 / 9
+    prior = 3.0  # mean count of the rated movies
+    expected = (prior * global_mean + stats.rating_sum) / (prior + stats.rating_count)
+    np.testing.assert_allclose(stats.bayesian_average(), expected)
+    np.testing.assert_allclose(stats.bayesian_average(positions=np.array([3, 0])), expected[[3, 0]])
+
+    # One 5-star vote does not outrank six 4.5-star votes
+    assert stats.ranked('bayesian').tolist() == [1, 0, 3]
+    assert stats.ranked('count').tolist() == [1, 3, 0]
+
+
+def test_updates_match_a_rebuild():
+    stats = make_stats()
+    stats.ranked('bayesian')  # cached orders must be invalidated
+    stats.update(np.array([2, 0, -1]), np.array([1, 1, 1]), np.array([3.0, 5.0, 1.0]))
+
+    rebuilt = PopularityStats.from_positions(
+        4, np.array([0, 1, 1, 1, 1, 1, 1, 3, 3, 2, 0]),
+        np.array([5.0, 4.5, 4.5, 4.5, 4.5, 4.5, 4.5, 2.0, 2.0, 3.0, 5.0]))
+    np.testing.assert_array_equal(stats.rating_count, rebuilt.rating_count)
+    np.testing.assert_allclose(stats.rating_sum, rebuilt.rating_sum)
+    assert stats.ranked('bayesian').tolist() == rebuilt.ranked('bayesian').tolist()
+
+
+def test_unknown_ranking_is_rejected():
+    with pytest.raises(ValueError):
+        make_stats().ranked('rating')
+
+
+def test_model_popularity_follows_added_ratings(movies_df, ratings_df):
+    model = MovieRecommendationSystem.from_dataframes(movies_df, ratings_df)
+    movie_id = int(movies_df['movieId'].iloc[-1])
+    new_users = np.arange(100) + int(ratings_df['userId'].max()) + 1
+    model.add_ratings(pd.DataFrame({'userId': new_users, 'movieId': movie_id, 'rating': 5.0}))
+
+    top = model.get_popular_movies(1)[0]
+    assert top['movieId'] == movie_id
+    expected_count = int((ratings_df['movieId'] == movie_id).sum()) + 100
+    assert top['rating_count'] == expected_count
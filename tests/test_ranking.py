@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from ranking import top_k
+
+
+def test_returns_best_first():
+    scores = np.array([0.1, 0.9, 0.5, 0.7, 0.3])
+    assert top_k(scores, 3).tolist() == [1, 3, 2]
+
+
+def test_ties_are_broken_by_position():
+    scores = np.array([1.0, 2.0, 2.0, 1.0, 2.0])
+    assert top_k(scores, 5).tolist() == [1, 2, 4, 0, 3]
+    assert top_k(scores, 2).tolist() == [1, 2]
+
+
+@pytest.mark.parametrize('k', [0, -1])
+def test_non_positive_k_is_empty(k):
+    assert top_k(np.arange(5.0), k).shape == (0,)
+
+
+def test_k_larger_than_scores_returns_all():
+    assert top_k(np.array([2.0, 3.0, 1.0]), 10).tolist() == [1, 0, 2]
+
+
+def test_excluded_scores_come_last():
+    scores = np.array([0.5, -np.inf, 0.8])
+    assert top_k(scores, 2).tolist() == [2, 0]
+
+
+def test_matches_full_sort_on_random_scores():
+    rng = np.random.default_rng(0)
+    scores = np.round(rng.random(1000), 2)  # many ties
+    expected = np.argsort(-scores, kind='stable')[:25]
+    assert top_k(scores, 25).tolist() == expected.tolist()
+
+
+def test_rows_of_a_block_are_ranked_independently():
+    rng = np.random.default_rng(1)
+    block = rng.random((4, 50))
+    top = top_k(block, 5)
+    assert top.shape == (4, 5)
+    for row, positions in zip(block, top):
+        assert positions.tolist() == top_k(row, 5).tolist()
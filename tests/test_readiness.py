@@ -0,0 +1,31 @@
+import pytest
+
+from recommendation_system import MovieRecommendationSystem, ModelNotReadyError
+
+
+@pytest.fixture
+def initializing_model():
+    """A model whose components are not built yet, as during a background build"""
+    model = MovieRecommendationSystem.__new__(MovieRecommendationSystem)
+    model._init_readiness()
+    return model
+
+
+def test_get_movie_waits_for_catalogue(initializing_model):
+    with pytest.raises(ModelNotReadyError) as error:
+        initializing_model.get_movie(1)
+    assert error.value.components == ['catalogue']
+
+
+def test_get_movie_route_answers_503_while_initializing(client, initializing_model, monkeypatch):
+    import streamlit_app
+    monkeypatch.setattr(streamlit_app, 'model_refresher', None)
+    monkeypatch.setattr(streamlit_app, 'recommender', initializing_model)
+    response = client.get('/api/movies/1')
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+
+
+def test_get_movie_route(client):
+    assert client.get('/api/movies/1').get_json()['movieId'] == 1
+    assert client.get('/api/movies/999999').status_code == 404
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from recommendation_system import MovieRecommendationSystem
+from search_index import TitleAutocomplete, tokenize
+
+
+def brute_force_complete(titles, popularity, prefix, n):
+    prefix = ' '.join(tokenize(prefix))
+    matches = {
+        position for position, title in enumerate(titles)
+        for start in range(len(tokenize(title)))
+        if ' '.join(tokenize(title)[start:]).startswith(prefix)
+    }
+    return sorted(matches, key=lambda position: (-popularity[position], position))[:n]
+
+
+def test_autocomplete_matches_brute_force_for_short_and_long_prefixes():
+    titles = ['The Matrix (1999)', 'The Matrix Reloaded (2003)', 'Matrimony (1990)',
+              'A Very Long Title About Extraordinary Things (2001)', 'Amélie (2001)']
+    popularity = np.array([5, 9, 1, 3, 7])
+    index = TitleAutocomplete(titles, popularity, cache_depth=2, cache_size=2)
+
+    for prefix in ['m', 'ma', 'mat', 'the matrix r', 'amel', 'very long title about extra',
+                   'a very long title about extraordinary things 2001', 'x']:
+        for n in (1, 2, 5):
+            assert index.complete(prefix, n).tolist() == brute_force_complete(titles, popularity, prefix, n)
+    assert index.complete(' ', 5).tolist() == []
+
+
+def test_saved_model_reuses_search_indexes(recommender, tmp_path):
+    recommender.save(str(tmp_path / 'model'))
+    loaded = MovieRecommendationSystem.load(str(tmp_path / 'model'), mmap=True)
+
+    assert isinstance(loaded.search_index.title_positions, np.memmap)
+    assert isinstance(loaded.title_autocomplete.key_blob, np.memmap)
+    for query in ['toy', 'the', 'action com', 'heat', 'zzz']:
+        assert loaded.search_movies(query) == recommender.search_movies(query)
+        assert loaded.autocomplete(query) == recommender.autocomplete(query)
+
+
+def test_autocomplete_ranking_follows_added_ratings(movies_df, ratings_df):
+    model = MovieRecommendationSystem.from_dataframes(movies_df, ratings_df)
+    suggestions = [movie['movieId'] for movie in model.autocomplete('the', 10)]
+    last = suggestions[-1]
+    top_count = model.popularity.rating_count[model.catalogue.position(suggestions[0])]
+
+    new_users = ratings_df['userId'].max() + 1 + np.arange(top_count + 1)
+    model.add_ratings(pd.DataFrame({'userId': new_users, 'movieId': last, 'rating': 4.0}))
+
+    assert model.autocomplete('the', 1)[0]['movieId'] == last
+    assert model.title_autocomplete.complete('the', 20)[0] == model.catalogue.position(last)
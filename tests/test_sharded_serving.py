@@ -0,0 +1,37 @@
+import pytest
+
+from sharded_serving import ShardedRecommender, build_shards
+
+
+@pytest.fixture(scope='module')
+def sharded(recommender, tmp_path_factory):
+    shard_dir = tmp_path_factory.mktemp('shards')
+    build_shards(recommender, 3, str(shard_dir))
+    with ShardedRecommender.start_local(str(shard_dir)) as sharded_recommender:
+        yield sharded_recommender
+
+
+def assert_same_results(expected, actual, score):
+    assert [movie[score] for movie in actual] == [movie[score] for movie in expected]
+    assert [movie['movieId'] for movie in actual] == [movie['movieId'] for movie in expected]
+    for got, want in zip(actual, expected):
+        assert (got['title'], got['genres']) == (want['title'], want['genres'])
+
+
+def test_collaborative_filtering_matches_single_process(recommender, sharded):
+    for user_id in recommender.user_movie_matrix.index[:30]:
+        assert_same_results(recommender.collaborative_filtering_recommendations(int(user_id), 8),
+                            sharded.collaborative_filtering_recommendations(int(user_id), 8),
+                            'predicted_rating')
+
+
+def test_content_based_matches_single_process(recommender, sharded):
+    for movie_id in recommender.catalogue.movie_ids[:30]:
+        assert_same_results(recommender.content_based_recommendations(int(movie_id), 8),
+                            sharded.content_based_recommendations(int(movie_id), 8),
+                            'similarity_score')
+
+
+def test_unknown_ids_return_nothing(sharded):
+    assert sharded.collaborative_filtering_recommendations(10 ** 9, 5) == []
+    assert sharded.content_based_recommendations(10 ** 9, 5) == []
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recommendation_system import MovieRecommendationSystem
+from topk_store import TopKStore, build_topk_store
+
+
+@pytest.fixture
+def model(movies_df, ratings_df):
+    """A fresh model per test, since attaching a store modifies it"""
+    return MovieRecommendationSystem.from_dataframes(movies_df, ratings_df)
+
+
+@pytest.fixture
+def store_path(model, tmp_path):
+    path = str(tmp_path / 'topk')
+    build_topk_store(model, path, k=10, n_jobs=2, chunk_size=7)
+    return path
+
+
+def live_and_stored(model, store, user_id, n):
+    live = model.collaborative_filtering_recommendations(user_id, n)
+    model.attach_topk_store(store)
+    stored = model.collaborative_filtering_recommendations(user_id, n)
+    model.attach_topk_store(None)
+    return live, stored
+
+
+def assert_close_results(live, stored):
+    assert [movie['movieId'] for movie in stored] == [movie['movieId'] for movie in live]
+    for got, want in zip(stored, live):
+        # Scores are stored as float16
+        assert got['predicted_rating'] == pytest.approx(want['predicted_rating'], abs=0.011)
+        assert got.keys() == want.keys()
+
+
+def test_stored_lists_match_live_scoring(model, store_path):
+    store = TopKStore.load(store_path)
+    assert store.row_of_user is not None
+    for user_id in model.user_movie_matrix.index:
+        assert_close_results(*live_and_stored(model, store, int(user_id), 10))
+
+
+def test_lookup_by_binary_search_without_row_table(model, store_path):
+    loaded = TopKStore.load(store_path)
+    store = TopKStore(loaded.user_ids, loaded.movie_ids, loaded.scores, loaded.fitted_at)
+    for user_id in model.user_movie_matrix.index[::5]:
+        assert store.row(int(user_id)) == loaded.row(int(user_id))
+        assert_close_results(*live_and_stored(model, store, int(user_id), 5))
+
+
+def test_falls_back_to_live_scoring(model, store_path):
+    store = TopKStore.load(store_path)
+    fitted_at = model.fit_stats['fitted_at']
+    user_id = int(model.user_movie_matrix.index[0])
+
+    assert store.lookup(user_id, 10, fitted_at) is not None
+    assert store.lookup(user_id, 11, fitted_at) is None  # more than K
+    assert store.lookup(10 ** 9, 5, fitted_at) is None  # unknown user
+    assert store.lookup(user_id, 5, fitted_at + 1) is None  # another fit
+
+    live, stored = live_and_stored(model, store, user_id, 15)
+    assert stored == live
+
+
+def test_users_with_new_ratings_are_served_live(model, store_path):
+    store = TopKStore.load(store_path)
+    model.attach_topk_store(store)
+    user_id = int(model.user_movie_matrix.index[0])
+    top_movie = model.collaborative_filtering_recommendations(user_id, 1)[0]['movieId']
+
+    model.add_ratings(pd.DataFrame({'userId': [user_id], 'movieId': [top_movie], 'rating': [1.0]}))
+    assert store.lookup(user_id, 5) is None
+    recommendations = model.collaborative_filtering_recommendations(user_id, 5)
+    assert top_movie not in [movie['movieId'] for movie in recommendations]
+
+
+def test_store_is_ignored_after_refit(model, store_path):
+    store = TopKStore.load(store_path)
+    model.attach_topk_store(store)
+    model.refit()
+    user_id = int(model.user_movie_matrix.index[0])
+    assert store.lookup(user_id, 5, model.fit_stats['fitted_at']) is None
+
+
+def test_arrays_are_compact_and_padded(model, store_path):
+    store = TopKStore.load(store_path)
+    assert store.movie_ids.dtype == np.int32
+    assert store.scores.dtype == np.float16
+    assert store.movie_ids.shape == (len(model.user_movie_matrix.index), 10)
+    assert np.array_equal(store.movie_ids < 0, np.isnan(store.scores))
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Precomputed per-user top-K recommendations
+
+An offline job scores every user in parallel blocks and writes the best K
+movie IDs (int32) and scores (float16) into fixed-width users x K arrays.
+The server memory-maps them, so a lookup is one row read: a direct-indexed
+user -> row table gives the row in O(1) and the pages are shared by every
+worker process.
+
+Lists go stale when the model changes. A store remembers the fit it was
+computed from and is ignored after a refit, and users whose ratings were
+added since are served live until the next build.
+
+    python topk_store.py --model models/latest --output models/latest-topk --k 20
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from model_artifacts import save_artifact, load_artifact
+
+# A dense user ID -> row table is used while it is at most this many times
+# larger than the number of users; otherwise rows are found by binary search
+MAX_ROW_TABLE_RATIO = 4
+
+
+def build_topk_store(recommender, path, k=20, n_jobs=None, chunk_size=4096, block_size=1024):
+    """
+    Compute every user's top-K collaborative recommendations and save them
+
+    Args:
+        recommender (MovieRecommendationSystem): Fitted model
+        path (str): Artifact directory to write
+        k (int): Recommendations stored per user
+        n_jobs (int): Worker threads (default: number of CPUs)
+        chunk_size (int): Users per parallel task
+        block_size (int): Users per matrix product within a task
+
+    Returns:
+        dict: The written manifest
+    """
+    # Users appended by add_ratings break the ID order binary search relies on
+    user_ids = np.sort(recommender.user_movie_matrix.index.to_numpy())
+    k = min(k, len(recommender.user_movie_matrix.columns))
+    movie_ids = np.full((len(user_ids), k), -1, dtype=np.int32)
+    scores = np.full((len(user_ids), k), np.nan, dtype=np.float16)
+
+    def score_chunk(start):
+        stop = min(start + chunk_size, len(user_ids))
+        chunk_ids, chunk_scores = recommender.recommend_batch(user_ids[start:stop], k, block_size)
+        movie_ids[start:stop] = chunk_ids
+        scores[start:stop] = chunk_scores
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as pool:
+        list(pool.map(score_chunk, range(0, len(user_ids), chunk_size)))
+    build_seconds = time.perf_counter() - start_time
+
+    arrays = {'user_ids': user_ids, 'movie_ids': movie_ids, 'scores': scores}
+    if len(user_ids) and user_ids.min() >= 0 and user_ids.max() < MAX_ROW_TABLE_RATIO * len(user_ids) + 1024:
+        row_of_user = np.full(int(user_ids.max()) + 1, -1, dtype=np.int32)
+        row_of_user[user_ids] = np.arange(len(user_ids), dtype=np.int32)
+        arrays['row_of_user'] = row_of_user
+
+    return save_artifact(path, arrays, {
+        'kind': 'topk',
+        'k': k,
+        'fitted_at': recommender.fit_stats['fitted_at'],
+        'model_version': recommender.model_version,
+        'build_seconds': build_seconds
+    })
+
+
+class TopKStore:
+    """Memory-mapped per-user top-K lists with a set of users to serve live"""
+
+    def __init__(self, user_ids, movie_ids, scores, fitted_at, row_of_user=None):
+        """
+        Wrap precomputed arrays; see load()
+
+        Args:
+            user_ids (ndarray): User ID of every row (ascending)
+            movie_ids (ndarray): users x K movie IDs, -1 for empty slots
+            scores (ndarray): users x K scores, NaN for empty slots
+            fitted_at (float): fit_stats['fitted_at'] of the model they came from
+            row_of_user (ndarray): Optional direct user ID -> row table, -1 if absent
+        """
+        self.user_ids = user_ids
+        self.movie_ids = movie_ids
+        self.scores = scores
+        self.fitted_at = fitted_at
+        self.row_of_user = row_of_user
+        self.k = movie_ids.shape[1]
+        self.stale_users = set()
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a store written by build_topk_store
+
+        Args:
+            path (str): Artifact directory
+            mmap (bool): Memory-map the arrays read-only
+
+        Returns:
+            TopKStore: The store
+        """
+        arrays, manifest = load_artifact(path, mmap_mode='r' if mmap else None)
+        metadata = manifest['metadata']
+        if metadata.get('kind') != 'topk':
+            raise ValueError(f"{path} is not a top-K recommendation store")
+        return cls(arrays['user_ids'], arrays['movie_ids'], arrays['scores'],
+                   metadata['fitted_at'], arrays.get('row_of_user'))
+
+    def row(self, user_id):
+        """Row of a user, or None if the store has no list for them"""
+        if self.row_of_user is not None:
+            if not 0 <= user_id < len(self.row_of_user):
+                return None
+            row = int(self.row_of_user[user_id])
+            return row if row >= 0 else None
+        row = int(np.searchsorted(self.user_ids, user_id))
+        return row if row < len(self.user_ids) and self.user_ids[row] == user_id else None
+
+    def mark_stale(self, user_ids):
+        """Serve these users live from now on, e.g. after they rated more movies"""
+        self.stale_users.update(int(user_id) for user_id in user_ids)
+
+    def lookup(self, user_id, n, fitted_at=None):
+        """
+        Get a user's precomputed recommendations
+
+        Args:
+            user_id (int): User ID
+            n (int): Number of recommendations wanted
+            fitted_at (float): fit_stats['fitted_at'] of the serving model;
+                a store computed from another fit is not used
+
+        Returns:
+            tuple: (movie_ids, scores) of up to n movies, or None when the
+                caller should score live (unknown, stale user or n > K)
+        """
+        if n > self.k or (fitted_at is not None and fitted_at != self.fitted_at):
+            return None
+        if user_id in self.stale_users:
+            return None
+        row = self.row(user_id)
+        if row is None:
+            return None
+        movie_ids = self.movie_ids[row, :n]
+        found = movie_ids >= 0
+        return movie_ids[found], self.scores[row, :n][found]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute every user's top-K recommendations")
+    parser.add_argument("--model", required=True,
+                        help="Saved model artifact (from build_model.py) the server will load")
+    parser.add_argument("--output", default="models/topk", help="Store directory to write")
+    parser.add_argument("--k", type=int, default=20, help="Recommendations stored per user")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker threads (default: all CPUs)")
+    args = parser.parse_args()
+
+    from recommendation_system import MovieRecommendationSystem
+    recommender = MovieRecommendationSystem.load(args.model, mmap=True)
+
+    manifest = build_topk_store(recommender, args.output, args.k, args.jobs)
+    metadata = manifest['metadata']
+    n_users = manifest['arrays']['user_ids']['shape'][0]
+    print(f"💾 Stored top-{metadata['k']} lists of {n_users:,} users in {args.output} "
+          f"({metadata['build_seconds']:.1f}s)")
+    print(f"🚀 Serve it with: MODEL_PATH={args.model} TOPK_STORE_PATH={args.output} "
+          f"gunicorn -w 4 streamlit_app:app")
+
+
+if __name__ == "__main__":
+    main()